@@ -0,0 +1,409 @@
+"""
+Замеры производительности операций кошелька на синтетических данных.
+
+Запуск из директории wallet_app:
+
+    python -m benchmarks.bench --sizes 1000 100000 --output new.json
+    python -m benchmarks.bench --compare old.json new.json
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.generators import generate_entries, generate_rows
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory
+from wallet.wallet import SearchField, Wallet
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+
+# Количество изменений в замерах add_entry и __setitem__.
+MUTATIONS = 1000
+
+# Быстрые операции повторяются в одном замере, пока не наберётся
+# это время, чтобы погрешность таймера не искажала результат.
+MIN_TIME = 0.02
+
+# Форматы Json файлов в замерах размера и скорости: суффикс имени
+# файла и запись без отступов.
+FILE_FORMATS = {
+    "json": (".json", False),
+    "json_compact": ("_compact.json", True),
+    "json_gzip": (".json.gz", True),
+    "json_lzma": (".json.xz", True),
+}
+
+SEARCHES = {
+    SearchField.Category: EntryCategory.Spend,
+    SearchField.Date: "2020-06-15",
+    SearchField.Amount: 500,
+    SearchField.DateRange: ("2020-06-01", "2020-06-30"),
+    SearchField.AmountRange: (100, 200),
+    SearchField.LargestSpends: 10,
+    SearchField.LargestIncomes: 10,
+    SearchField.Description: "кофейня",
+    SearchField.Text: "аптека 1*",
+    SearchField.Fuzzy: "pyatyorochka 42",
+}
+
+
+@dataclass
+class Context:
+    """
+    Данные, общие для замеров одного размера кошелька.
+
+    Кроме кошелька в памяти хранятся только записи для изменений,
+    остальные данные читаются из файлов или готовятся перед замером.
+    """
+    size: int
+    entries: list
+    wallet: Wallet
+    json_path: str
+    directory: str
+    data_size: int
+    # Данные, подготовленные Benchmark.prepare для текущего замера.
+    prepared: Any = None
+
+    def file_path(self, file_format: str) -> str:
+        """ Путь к файлу кошелька в указанном формате. """
+        suffix, _ = FILE_FORMATS[file_format]
+        return os.path.join(self.directory, f"wallet_{self.size}{suffix}")
+
+
+@dataclass
+class Benchmark:
+    """ Замер одной операции, run возвращает число выполненных операций. """
+    name: str
+    run: Callable[[Context], int]
+    mutates: bool = False
+    # Формат файла, размер которого добавляется к результату.
+    file_format: Optional[str] = None
+    # Подготовка данных перед каждым повтором, не входит в замер.
+    prepare: Optional[Callable[[Context], Any]] = None
+
+
+def _find(search_field: SearchField) -> Callable[[Context], int]:
+    def run(context: Context) -> int:
+        context.wallet.find_entries(search_field, SEARCHES[search_field])
+        return 1
+    return run
+
+
+def _load_wallet(context: Context) -> Wallet:
+    """ Загрузить кошелёк из Json файла и построить его индексы. """
+    wallet = Wallet.from_entries(
+        JsonHandler(context.json_path).stream_entries(),
+    )
+    _warm_up(wallet)
+    return wallet
+
+
+def _warm_up(wallet: Wallet) -> None:
+    """
+    Выполнить каждый поиск один раз, чтобы индексы, которые строятся
+    при первом поиске, не попадали в замеры.
+    """
+    for search_field, value in SEARCHES.items():
+        wallet.find_entries(search_field, value)
+
+
+def _add_entry(context: Context) -> int:
+    for entry in context.entries:
+        context.prepared.add_entry(entry)
+    return len(context.entries)
+
+
+def _set_item(context: Context) -> int:
+    rng = random.Random(context.size)
+    wallet = context.prepared
+    size = len(wallet)
+    for entry in context.entries:
+        wallet[rng.randrange(size)] = entry
+    return len(context.entries)
+
+
+def _slice_page(context: Context) -> int:
+    middle = len(context.wallet) // 2
+    context.wallet[middle:middle + 100]
+    return 1
+
+
+def _json_stream_load(context: Context) -> int:
+    handler = JsonHandler(context.json_path)
+    Wallet.from_entries(handler.stream_entries())
+    return 1
+
+
+def _save_file(file_format: str) -> Callable[[Context], int]:
+    def run(context: Context) -> int:
+        _, compact = FILE_FORMATS[file_format]
+        handler = JsonHandler(context.file_path(file_format), compact)
+        return handler.save_entries(context.wallet.iter_json())
+    return run
+
+
+def _load_file(file_format: str) -> Callable[[Context], int]:
+    def run(context: Context) -> int:
+        path = context.file_path(file_format)
+        return bool(Wallet.from_entries(JsonHandler(path).stream_entries()))
+    return run
+
+
+# Изменяющие кошелёк замеры получают собственный кошелёк на каждый
+# повтор и не изменяют общий.
+BENCHMARKS = [
+    Benchmark(
+        "wallet_init",
+        lambda ctx: bool(Wallet(ctx.prepared)),
+        prepare=lambda ctx: generate_entries(ctx.size),
+    ),
+    Benchmark(
+        "wallet_from_entries",
+        lambda ctx: bool(Wallet.from_entries(ctx.prepared)),
+        prepare=lambda ctx: list(generate_rows(ctx.size)),
+    ),
+    *(
+        Benchmark(f"find_{field.name}", _find(field))
+        for field in SEARCHES
+    ),
+    Benchmark("slice_all", lambda ctx: bool(ctx.wallet[0:])),
+    Benchmark("slice_page", _slice_page),
+    Benchmark("to_json", lambda ctx: bool(ctx.wallet.to_json())),
+    Benchmark(
+        "from_json",
+        lambda ctx: bool(Wallet.from_json(ctx.prepared)),
+        prepare=lambda ctx: ctx.wallet.to_json(),
+    ),
+    Benchmark("json_save", _save_file("json"), file_format="json"),
+    Benchmark(
+        "json_load",
+        lambda ctx: bool(JsonHandler(ctx.json_path).load_json()),
+        file_format="json",
+    ),
+    Benchmark("json_stream_load", _json_stream_load, file_format="json"),
+    *(
+        Benchmark(
+            f"{file_format}_{action}",
+            run(file_format),
+            file_format=file_format,
+        )
+        for file_format in ("json_compact", "json_gzip", "json_lzma")
+        for action, run in (("save", _save_file), ("load", _load_file))
+    ),
+    Benchmark("add_entry", _add_entry, mutates=True, prepare=_load_wallet),
+    Benchmark("set_item", _set_item, mutates=True, prepare=_load_wallet),
+]
+
+
+def _measure(benchmark: Benchmark, context: Context) -> Tuple[float, int]:
+    """ Время и количество операций одного замера. """
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        ops += int(benchmark.run(context)) or 1
+        elapsed = time.perf_counter() - start
+        if benchmark.mutates or elapsed >= MIN_TIME:
+            return elapsed, ops
+
+
+def run_benchmarks(
+    sizes: List[int],
+    repeat: int = DEFAULT_REPEAT,
+    pattern: str = "*",
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Выполнить замеры для кошельков указанных размеров.
+
+    Каждая операция выполняется repeat раз, в результат попадает
+    наименьшее время одной операции. Для сохранения и загрузки файлов
+    в результат также попадают размер файла в байтах и скорость
+    обработки компактного Json в байтах в секунду.
+
+    Записи генерируются потоково сразу в Json файл, из которого
+    загружается кошелёк, поэтому в памяти одновременно находятся
+    только кошелёк и данные текущего замера.
+
+    Args:
+        sizes (List[int]): количества записей в кошельках.
+        repeat (int): количество повторов каждой операции.
+        pattern (str): шаблон имён выполняемых замеров.
+        log (Callable[[str], None]): вывод хода выполнения.
+
+    Returns:
+        Dict[str, Any]: описание окружения и результаты замеров.
+    """
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            json_path = os.path.join(directory, f"wallet_{size}.json")
+            JsonHandler(json_path).save_entries(generate_rows(size))
+            context = Context(
+                size=size,
+                entries=generate_entries(min(size, MUTATIONS), seed=1),
+                wallet=Wallet(),
+                json_path=json_path,
+                directory=directory,
+                data_size=0,
+            )
+            context.wallet = _load_wallet(context)
+            for file_format in FILE_FORMATS:
+                _save_file(file_format)(context)
+            context.data_size = os.path.getsize(
+                context.file_path("json_compact"),
+            )
+
+            for benchmark in BENCHMARKS:
+                if not fnmatch.fnmatch(benchmark.name, pattern):
+                    continue
+
+                best = None
+                for _ in range(repeat):
+                    if benchmark.prepare:
+                        context.prepared = benchmark.prepare(context)
+                    elapsed, ops = _measure(benchmark, context)
+                    context.prepared = None
+                    if best is None or elapsed / ops < best:
+                        best = elapsed / ops
+
+                result = {
+                    "name": benchmark.name,
+                    "size": size,
+                    "per_op": best,
+                }
+                line = f"{benchmark.name:<24}{size:>10}{best:>12.6f}"
+                if benchmark.file_format:
+                    result["file_size"] = os.path.getsize(
+                        context.file_path(benchmark.file_format),
+                    )
+                    result["throughput"] = context.data_size / best
+                    line += "{:>14} B{:>10.1f} MB/s".format(
+                        result["file_size"],
+                        result["throughput"] / 1e6,
+                    )
+                results.append(result)
+                if log:
+                    log(line)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Tuple[str, int, float, float, float, bool]]:
+    """
+    Сравнить результаты двух запусков.
+
+    Args:
+        baseline (Dict[str, Any]): результаты предыдущего запуска.
+        current (Dict[str, Any]): результаты текущего запуска.
+        threshold (float): допустимое относительное замедление.
+
+    Returns:
+        List[Tuple[str, int, float, float, float, bool]]: имя замера,
+        размер, время до и после, отношение времён и признак регрессии
+        для замеров, присутствующих в обоих запусках.
+    """
+
+    previous = {
+        (result["name"], result["size"]): result["per_op"]
+        for result in baseline["results"]
+    }
+
+    rows = []
+    for result in current["results"]:
+        key = (result["name"], result["size"])
+        if key not in previous:
+            continue
+        before, after = previous[key], result["per_op"]
+        ratio = after / before if before else float("inf")
+        rows.append((*key, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench",
+        description="Замеры производительности операций кошелька.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="количества записей (до 10000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", default="*", help="шаблон имён замеров")
+    parser.add_argument("--output", help="файл для результатов в Json")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="сравнить два файла результатов",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="допустимое относительное замедление при сравнении",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        rows = compare(
+            _load(args.compare[0]),
+            _load(args.compare[1]),
+            args.threshold,
+        )
+        for name, size, before, after, ratio, regression in rows:
+            print(
+                f"{name:<24}{size:>10}{before:>12.6f}{after:>12.6f}"
+                f"{ratio:>8.2f}{'  РЕГРЕССИЯ' if regression else ''}"
+            )
+        return int(any(row[-1] for row in rows))
+
+    report = run_benchmarks(
+        args.sizes,
+        args.repeat,
+        args.only,
+        log=lambda line: print(line, file=sys.stderr),
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
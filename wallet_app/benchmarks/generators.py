@@ -0,0 +1,91 @@
+from array import array
+import datetime
+import math
+import random
+from typing import Dict, Iterator, List
+
+from wallet.entry import EntryCategory, WalletEntry
+
+MERCHANTS = (
+    "Пятёрочка", "Pyaterochka", "Магнит", "Перекрёсток", "ВкусВилл",
+    "Аптека", "Такси", "Кофейня", "АЗС", "Озон", "Wildberries",
+    "Кинотеатр", "Ресторан", "Коммунальные услуги", "Связь",
+)
+INCOMES = ("Зарплата", "Аванс", "Премия", "Кэшбэк", "Перевод")
+
+START_DATE = datetime.date(2015, 1, 1)
+
+
+def generate_rows(
+    count: int,
+    seed: int = 0,
+    start: datetime.date = START_DATE,
+    days: int = 365 * 10,
+) -> Iterator[Dict]:
+    """
+    Сгенерировать записи кошелька в виде словарей Json.
+
+    Даты распределены равномерно по периоду с более частыми покупками
+    в выходные, расходы имеют логнормальное распределение сумм,
+    а доходы составляют около десятой части записей и крупнее расходов.
+    Записи упорядочены по дате, как в реальном кошельке, и создаются
+    по одной: в памяти хранится только число записей на каждый день.
+
+    Args:
+        count (int): количество записей.
+        seed (int): начальное значение генератора случайных чисел.
+        start (datetime.date): первая дата периода.
+        days (int): длительность периода в днях.
+
+    Returns:
+        Iterator[Dict]
+    """
+    rng = random.Random(seed)
+    first = start.toordinal()
+    # Перенос покупки на выходные сдвигает дату не более чем на 5 дней.
+    day_counts = array("l", [0]) * (days + 5)
+    for _ in range(count):
+        ordinal = first + rng.randrange(days)
+        if ordinal % 7 < 5 and rng.random() < 0.3:
+            ordinal += 5 - ordinal % 7
+        day_counts[ordinal - first] += 1
+
+    ordinals = (
+        first + day
+        for day, day_count in enumerate(day_counts)
+        for _ in range(day_count)
+    )
+    for ordinal in ordinals:
+        if rng.random() < 0.1:
+            category = EntryCategory.Income
+            amount = round(rng.lognormvariate(math.log(30000), 0.8), 2)
+            description = rng.choice(INCOMES)
+        else:
+            category = EntryCategory.Spend
+            amount = round(rng.lognormvariate(math.log(700), 1.2), 2)
+            description = "{merchant} {number}".format(
+                merchant=rng.choice(MERCHANTS),
+                number=rng.randrange(200),
+            )
+        yield {
+            "date": datetime.date.fromordinal(ordinal).isoformat(),
+            "category": int(category),
+            "amount": amount,
+            "description": description,
+        }
+
+
+def generate_entries(count: int, seed: int = 0) -> List[WalletEntry]:
+    """
+    Сгенерировать записи кошелька, см. generate_rows.
+
+    Args:
+        count (int): количество записей.
+        seed (int): начальное значение генератора случайных чисел.
+
+    Returns:
+        List[WalletEntry]
+    """
+    return [
+        WalletEntry.from_json(row) for row in generate_rows(count, seed)
+    ]
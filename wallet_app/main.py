@@ -1,8 +1,38 @@
-from wallet.wallet_handler import WalletHandler
+import os
+import sys
+
+# Путь Json файла для статистики сеанса, её сбор включается только
+# при заданной переменной окружения.
+METRICS_ENV = "WALLET_METRICS"
+# Непустое значение дополнительно включает профилирование сеанса.
+PROFILE_ENV = "WALLET_PROFILE"
+# Непустое значение включает журнал изменений Json кошельков вместо
+# полной перезаписи файла при каждом сохранении.
+JOURNAL_ENV = "WALLET_JOURNAL"
 
 
 def main():
-    wallet_handler = WalletHandler("data/wallet.json")
+    # Модули импортируются только для выбранного режима: команды без
+    # меню не загружают модули меню, автосохранения и статистики.
+    if len(sys.argv) > 1:
+        from wallet.cli import WalletCli
+
+        sys.exit(WalletCli().run(sys.argv[1:]))
+
+    from utils.autosave import AUTOSAVE_DELAY
+    from utils.metrics import Metrics
+    from wallet.wallet_handler import WalletHandler
+
+    metrics_path = os.environ.get(METRICS_ENV, "")
+    wallet_handler = WalletHandler(
+        "data/wallet.json",
+        use_journal=bool(os.environ.get(JOURNAL_ENV)),
+        metrics=Metrics() if metrics_path else None,
+        metrics_path=metrics_path,
+        profile=bool(metrics_path and os.environ.get(PROFILE_ENV)),
+        autosave_delay=AUTOSAVE_DELAY,
+        use_cache=True,
+    )
     wallet_handler.run()
 
 
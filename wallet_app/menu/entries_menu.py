@@ -1,11 +1,26 @@
 from datetime import date
 import sys
-from typing import Any, Dict, List, Optional, TextIO, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
 
-from wallet.entry import CATEGORY, EntryCategory, WalletEntry
+from wallet.cursor import ListCursor, WalletCursor
+from wallet.entry import CATEGORY, EntryCategory, WalletEntry, amount_cents
+from wallet.text_index import parse_text_query, trigrams
 from wallet.wallet import SearchField
 
 
+SEARCH_OPTIONS = {
+    "1": SearchField.Category,
+    "2": SearchField.Date,
+    "3": SearchField.Amount,
+    "4": SearchField.DateRange,
+    "5": SearchField.AmountRange,
+    "6": SearchField.LargestSpends,
+    "7": SearchField.LargestIncomes,
+    "8": SearchField.Text,
+    "9": SearchField.Fuzzy,
+}
+
+
 class EntriesMenu:
     """
     Класс, представляющий меню для взаимодействия с пользователем
@@ -211,8 +226,7 @@ class EntriesMenu:
 
             try:
                 amount = round(float(user_input), 2)
-                if amount < 0:
-                    raise ValueError()
+                amount_cents(amount)
                 return amount
             except ValueError:
                 print("Некорректный ввод.\n")
@@ -248,30 +262,41 @@ class EntriesMenu:
 
     @staticmethod
     def show_entries(
-        entries: List[Tuple[int, WalletEntry]],
+        entries: Union[
+            List[Tuple[int, WalletEntry]], WalletCursor, ListCursor,
+        ],
         per_page: int = 5,
+        input_stream: Optional[TextIO] = sys.stdin,
     ) -> None:
         """
-        Показать пользователю список записей кошелька.
+        Показать пользователю записи кошелька постранично.
 
         Args:
-             entries (List[Tuple[int, WalletEntry]]): список записей.
-             per_page (int): количество одновременно показанных записей.
+             entries: список записей или курсор просмотра записей.
+             per_page (int): количество записей на странице для списка.
+             input_stream (Optional[TextIO]): поток ввода данных.
         """
 
-        first_index = 0
+        if isinstance(entries, list):
+            entries = ListCursor(entries, per_page)
 
-        while True:
-            for number, entry in entries[first_index: first_index + per_page]:
+        page = entries.next_page()
+        while page:
+            for number, entry in page:
                 print(f"{number}) {entry}\n")
 
-            first_index += per_page
-            if first_index >= len(entries):
+            remaining = entries.remaining
+            if not remaining:
                 break
 
-            print(f"Осталось еще {len(entries) - first_index} записей.")
-            user_input = input("Продолжить? (Y/n)\n")
-            if user_input.lower() not in ["y", "yes"]:
+            print(f"Осталось еще {remaining} записей.")
+            print("Продолжить? (Y/n, p - предыдущая страница)")
+            user_input = input_stream.readline().rstrip('\n').lower()
+            if user_input in ["y", "yes"]:
+                page = entries.next_page()
+            elif user_input == "p":
+                page = entries.previous_page() or page
+            else:
                 break
 
     @staticmethod
@@ -291,15 +316,17 @@ class EntriesMenu:
         search_field = None
         while not search_field:
             print(
-                "Выберите критерий поиска:\n1) Категория\n2) Дата\n3) Сумма\n",
+                "Выберите критерий поиска:\n1) Категория\n2) Дата\n3) Сумма\n"
+                "4) Период\n5) Диапазон сумм\n6) Крупнейшие расходы\n"
+                "7) Крупнейшие доходы\n8) Слова описания\n"
+                "9) Похожее описание\n",
             )
             user_input = input_stream.readline().rstrip('\n')
             if not user_input:
                 return
 
-            try:
-                search_field = SearchField(int(user_input))
-            except ValueError:
+            search_field = SEARCH_OPTIONS.get(user_input)
+            if not search_field:
                 print("Неверный ввод.")
 
         search_value = EntriesMenu._get_search_value(
@@ -325,3 +352,161 @@ class EntriesMenu:
 
         if search_field == SearchField.Amount:
             return EntriesMenu._get_amount(input_stream=input_stream)
+
+        if search_field == SearchField.DateRange:
+            return EntriesMenu._get_date_range(input_stream=input_stream)
+
+        if search_field == SearchField.AmountRange:
+            return EntriesMenu._get_amount_range(input_stream=input_stream)
+
+        if search_field in (
+            SearchField.LargestSpends,
+            SearchField.LargestIncomes,
+        ):
+            return EntriesMenu._get_count(input_stream=input_stream)
+
+        if search_field == SearchField.Text:
+            return EntriesMenu._get_text_query(input_stream=input_stream)
+
+        if search_field == SearchField.Fuzzy:
+            return EntriesMenu._get_similar_text(input_stream=input_stream)
+
+    @staticmethod
+    def _get_date_range(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[Tuple[date, date]]:
+        """
+        Запросить у пользователя период дат.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            Tuple[date, date] или None в случае отмены.
+        """
+
+        print("Начало периода:")
+        start = EntriesMenu._get_date(input_stream=input_stream)
+        if not start:
+            return
+
+        print("Конец периода:")
+        end = EntriesMenu._get_date(input_stream=input_stream)
+        if not end:
+            return
+
+        if end < start:
+            start, end = end, start
+
+        return start, end
+
+    @staticmethod
+    def _get_amount_range(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Запросить у пользователя диапазон сумм.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            Tuple[float, float] или None в случае отмены.
+        """
+
+        print("Минимальная сумма:")
+        minimum = EntriesMenu._get_amount(input_stream=input_stream)
+        if minimum is None:
+            return
+
+        print("Максимальная сумма:")
+        maximum = EntriesMenu._get_amount(input_stream=input_stream)
+        if maximum is None:
+            return
+
+        if maximum < minimum:
+            minimum, maximum = maximum, minimum
+
+        return minimum, maximum
+
+    @staticmethod
+    def _get_count(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[int]:
+        """
+        Запросить у пользователя количество записей.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            int или None в случае отмены.
+        """
+
+        while True:
+            print("Введите количество записей:")
+            print("(пустой ввод - отмена)")
+            user_input = input_stream.readline().rstrip('\n')
+            if not user_input:
+                return
+
+            try:
+                count = int(user_input)
+                if count <= 0:
+                    raise ValueError
+                return count
+            except ValueError:
+                print("Некорректный ввод.\n")
+
+    @staticmethod
+    def _get_text_query(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[str]:
+        """
+        Запросить у пользователя слова для поиска по описанию.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            str или None в случае отмены.
+        """
+
+        while True:
+            print(
+                "Введите слова описания через пробел "
+                "(* в конце слова - поиск по началу слова):"
+            )
+            print("(пустой ввод - отмена)")
+            user_input = input_stream.readline().rstrip('\n')
+            if not user_input:
+                return
+
+            if parse_text_query(user_input):
+                return user_input
+            print("Некорректный ввод.\n")
+
+    @staticmethod
+    def _get_similar_text(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[str]:
+        """
+        Запросить у пользователя текст для поиска похожих описаний.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            str или None в случае отмены.
+        """
+
+        while True:
+            print("Введите описание (допускаются опечатки):")
+            print("(пустой ввод - отмена)")
+            user_input = input_stream.readline().rstrip('\n')
+            if not user_input:
+                return
+
+            if trigrams(user_input):
+                return user_input
+            print("Некорректный ввод.\n")
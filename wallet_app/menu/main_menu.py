@@ -1,6 +1,11 @@
 from enum import Enum
 import sys
-from typing import Optional, TextIO
+from typing import List, Optional, TextIO, Tuple
+
+from wallet.rollups import RollupPeriod
+
+# Наибольшее количество показываемых ошибок записей при загрузке.
+MAX_SHOWN_ERRORS = 10
 
 
 class MenuOptions(Enum):
@@ -14,7 +19,18 @@ class MenuOptions(Enum):
     LoadDefault = "8"
     LoadSelected = "9"
     New = "10"
+    ShowRollups = "11"
     Quit = "q"
+    # Скрытый пункт, не отображается в меню.
+    Stats = "stats"
+
+
+# Пункты сокращённого меню, доступного до загрузки кошелька.
+TRUNCATED_OPTIONS = (
+    MenuOptions.LoadDefault,
+    MenuOptions.LoadSelected,
+    MenuOptions.New,
+)
 
 
 class MainMenu:
@@ -44,6 +60,7 @@ class MainMenu:
             print("8) Загрузить кошелёк")
             print("9) Загрузить кошелёк (выбор файла)")
             print("10) Новый кошелёк")
+            print("\n11) Отчёт по периодам")
         print("\nq - Выход")
 
     @staticmethod
@@ -68,7 +85,9 @@ class MainMenu:
             try:
                 choice = input_stream.readline().rstrip('\n')
                 if truncated and choice.isnumeric():
-                    choice = str(int(choice) + 7)
+                    number = int(choice)
+                    choice = TRUNCATED_OPTIONS[number - 1].value \
+                        if 0 < number <= len(TRUNCATED_OPTIONS) else ""
                 choice = MenuOptions(choice)
             except ValueError:
                 sys.stdout
@@ -109,3 +128,95 @@ class MainMenu:
             print("Введите путь и имя файла для сохранения.")
         print("(пустой ввод - использование значения по умолчанию)")
         return input_stream.readline().rstrip('\n')
+
+    @staticmethod
+    def confirm_skip_invalid(
+        errors: List[Tuple[int, str]],
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> bool:
+        """
+        Показать ошибки записей файла и спросить, загрузить ли кошелёк
+        без некорректных записей.
+
+        Args:
+            errors (List[Tuple[int, str]]): номера и ошибки записей.
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            bool: согласился ли пользователь.
+        """
+
+        print(f"Некорректных записей в файле: {len(errors)}")
+        for row_number, message in errors[:MAX_SHOWN_ERRORS]:
+            print(f"Запись {row_number}: {message}")
+        if len(errors) > MAX_SHOWN_ERRORS:
+            print(f"... и ещё {len(errors) - MAX_SHOWN_ERRORS}")
+        print("Загрузить кошелёк без этих записей? (y/N)")
+        user_input = input_stream.readline().rstrip('\n').lower()
+        return user_input in ["y", "yes"]
+
+    @staticmethod
+    def get_export_path(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> str:
+        """
+        Запросить у пользователя путь для сохранения статистики.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+        Return:
+            str: путь или пустая строка, если сохранять не нужно.
+        """
+
+        print("Введите путь и имя файла для сохранения статистики.")
+        print("(пустой ввод - не сохранять)")
+        return input_stream.readline().rstrip('\n')
+
+    @staticmethod
+    def get_rollup_period(
+        input_stream: Optional[TextIO] = sys.stdin,
+    ) -> Optional[RollupPeriod]:
+        """
+        Запросить у пользователя период группировки отчёта.
+
+        Args:
+            input_stream (Optional[TextIO]): поток ввода данных.
+
+        Returns:
+            RollupPeriod или None в случае отмены.
+        """
+
+        while True:
+            print(
+                "Выберите период:\n1) День\n2) Неделя\n3) Месяц\n4) Год\n"
+                "(пустой ввод - отмена)",
+            )
+            user_input = input_stream.readline().rstrip('\n')
+            if not user_input:
+                return
+
+            try:
+                return RollupPeriod(int(user_input))
+            except ValueError:
+                print("Неверный ввод.")
+
+    @staticmethod
+    def show_rollup(rows: List[Tuple[str, float, float]]) -> None:
+        """
+        Показать пользователю отчёт по периодам.
+
+        Args:
+            rows (List[Tuple[str, float, float]]): подпись периода,
+                                                   доходы и расходы.
+        """
+
+        for label, income, spending in rows:
+            print(
+                "{label}: доход {inc}, расход {spend}, итог {bal}".format(
+                    label=label,
+                    inc=income,
+                    spend=spending,
+                    bal=round(income - spending, 2),
+                )
+            )
+        print()
@@ -72,3 +72,44 @@ class TestEntriesMenu(unittest.TestCase):
         )
         expected = (SearchField.Amount, 123.45)
         self.assertEqual(search_query, expected)
+
+    def test_search_query_date_range(self):
+        search_query = EntriesMenu.get_search_query(
+            input_stream=StringIO("4\n2024-05-31\n2024-05-01"),
+        )
+        expected = (
+            SearchField.DateRange,
+            (
+                date.fromisoformat("2024-05-01"),
+                date.fromisoformat("2024-05-31"),
+            ),
+        )
+        self.assertEqual(search_query, expected)
+
+    def test_search_query_amount_range(self):
+        search_query = EntriesMenu.get_search_query(
+            input_stream=StringIO("5\n100\n50.5"),
+        )
+        expected = (SearchField.AmountRange, (50.5, 100.0))
+        self.assertEqual(search_query, expected)
+
+    def test_search_query_largest_spends(self):
+        search_query = EntriesMenu.get_search_query(
+            input_stream=StringIO("6\n0\n3"),
+        )
+        expected = (SearchField.LargestSpends, 3)
+        self.assertEqual(search_query, expected)
+
+    def test_search_query_text(self):
+        search_query = EntriesMenu.get_search_query(
+            input_stream=StringIO("0\n8\n*\nпятёр* продукты"),
+        )
+        expected = (SearchField.Text, "пятёр* продукты")
+        self.assertEqual(search_query, expected)
+
+    def test_search_query_fuzzy(self):
+        search_query = EntriesMenu.get_search_query(
+            input_stream=StringIO("9\n!!\nPyatyorochka"),
+        )
+        expected = (SearchField.Fuzzy, "Pyatyorochka")
+        self.assertEqual(search_query, expected)
@@ -4,6 +4,7 @@ import sys
 sys.path.append("..")
 
 from wallet_app.menu.main_menu import MainMenu, MenuOptions
+from wallet_app.wallet.rollups import RollupPeriod
 
 
 class TestMainMenu(unittest.TestCase):
@@ -27,7 +28,18 @@ class TestMainMenu(unittest.TestCase):
         expected = MenuOptions("9")
         self.assertEqual(option, expected)
 
+    def test_truncated_menu_hides_wallet_options(self):
+        option = MainMenu.get_user_menu_choice(
+            truncated=True,
+            input_stream=StringIO("4\n0\n3"),
+        )
+        self.assertEqual(option, MenuOptions.New)
+
     def test_get_filepath(self):
         path = "data/wallet.json"
         received_path = MainMenu.get_filepath(input_stream=StringIO(path))
         self.assertEqual(received_path, path)
+
+    def test_get_rollup_period(self):
+        period = MainMenu.get_rollup_period(input_stream=StringIO("7\n3"))
+        self.assertEqual(period, RollupPeriod.Month)
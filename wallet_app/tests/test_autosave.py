@@ -0,0 +1,105 @@
+from datetime import date
+import os
+import tempfile
+import threading
+import time
+import unittest
+import sys
+sys.path.append("..")
+
+from menu.main_menu import MenuOptions
+from utils.autosave import WalletAutosaver
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.wallet import Wallet
+from wallet.wallet_handler import WalletHandler
+
+
+def make_entry(amount: float) -> WalletEntry:
+    return WalletEntry(
+        date=date(2024, 5, 2),
+        category=EntryCategory.Spend,
+        amount=amount,
+        description="Кофе",
+    )
+
+
+class TestWalletAutosaver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+        self.json_handler = JsonHandler(self.path)
+        self.saves = []
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def save(self, wallet: Wallet, path: str) -> bool:
+        self.saves.append(len(wallet))
+        return self.json_handler.save_json(wallet.to_json(), path)
+
+    def load_count(self) -> int:
+        return len(self.json_handler.load_json()["entries"])
+
+    def test_debounced_save(self):
+        wallet = Wallet()
+        autosaver = WalletAutosaver(self.save, delay=0.05)
+        autosaver.attach(wallet, self.path)
+
+        for amount in range(1, 6):
+            with autosaver.lock:
+                wallet.add_entry(make_entry(amount))
+        self.assertTrue(autosaver.dirty)
+
+        deadline = time.monotonic() + 5
+        while autosaver.dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(autosaver.dirty)
+        self.assertEqual(self.saves, [5])
+        self.assertEqual(self.load_count(), 5)
+
+        with autosaver.lock:
+            wallet[0] = make_entry(100)
+        self.assertTrue(autosaver.detach())
+        self.assertEqual(self.saves, [5, 5])
+        self.assertEqual(
+            self.json_handler.load_json()["entries"][0]["amount"],
+            100,
+        )
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_concurrent_changes(self):
+        wallet = Wallet()
+        autosaver = WalletAutosaver(self.save, delay=0)
+        autosaver.attach(wallet, self.path)
+
+        def add_entries():
+            for amount in range(1, 301):
+                with autosaver.lock:
+                    wallet.add_entry(make_entry(amount))
+
+        writer = threading.Thread(target=add_entries)
+        writer.start()
+        writer.join()
+        autosaver.detach()
+
+        self.assertEqual(self.load_count(), 300)
+        self.assertEqual(self.saves, sorted(self.saves))
+
+    def test_handler_flushes_on_quit(self):
+        self.json_handler.save_json(Wallet([make_entry(1)]).to_json())
+        handler = WalletHandler(self.path, autosave_delay=60)
+        handler.actions[MenuOptions.LoadDefault]()
+        with handler._wallet_lock():
+            handler.wallet.add_entry(make_entry(2))
+        self.assertEqual(self.load_count(), 1)
+
+        handler._stop_autosave()
+        self.assertEqual(self.load_count(), 2)
+
+        handler.actions[MenuOptions.New]()
+        self.assertIsNone(handler.autosaver.wallet)
+
+
+if __name__ == '__main__':
+    unittest.main()
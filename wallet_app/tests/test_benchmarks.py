@@ -0,0 +1,52 @@
+import unittest
+import sys
+sys.path.append("..")
+
+from benchmarks.bench import compare, run_benchmarks
+from benchmarks.generators import generate_entries, generate_rows
+from wallet.wallet import Wallet
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generate_rows(self):
+        rows = list(generate_rows(500, seed=3))
+        self.assertEqual(rows, list(generate_rows(500, seed=3)))
+        self.assertEqual(
+            [row["date"] for row in rows],
+            sorted(row["date"] for row in rows),
+        )
+        self.assertEqual(len(Wallet.from_entries(rows)), 500)
+        self.assertEqual(len(generate_entries(10)), 10)
+
+    def test_run_and_compare(self):
+        report = run_benchmarks([50], repeat=1, pattern="find_*")
+        names = [result["name"] for result in report["results"]]
+        self.assertIn("find_Text", names)
+
+        slower = {
+            "results": [
+                {**result, "per_op": result["per_op"] * 2}
+                for result in report["results"]
+            ]
+        }
+        rows = compare(report, slower, threshold=0.5)
+        self.assertEqual(len(rows), len(names))
+        self.assertTrue(all(row[-1] for row in rows))
+        self.assertFalse(any(row[-1] for row in compare(slower, report)))
+
+    def test_file_formats(self):
+        report = run_benchmarks([50], repeat=1, pattern="json_*")
+        sizes = {
+            result["name"]: result["file_size"]
+            for result in report["results"]
+        }
+        self.assertLess(sizes["json_compact_save"], sizes["json_save"])
+        self.assertLess(sizes["json_gzip_save"], sizes["json_compact_save"])
+        self.assertEqual(sizes["json_lzma_load"], sizes["json_lzma_save"])
+        self.assertTrue(
+            all(result["throughput"] > 0 for result in report["results"])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
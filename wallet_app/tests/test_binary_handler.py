@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from datetime import date
+
+from utils.binary_handler import BinaryHandler
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.rollups import RollupPeriod
+from wallet.storage import MappedStorage
+from wallet.wallet import SearchField, Wallet
+
+
+class TestBinaryHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.wbin")
+        self.binary_handler = BinaryHandler(self.path)
+        self.entries = [
+            WalletEntry(
+                date=date.fromisoformat("2024-05-0{}".format(idx % 9 + 1)),
+                category=EntryCategory(idx % 2 + 1),
+                amount=idx * 10.25,
+                description="Запись {}".format(idx % 5),
+            )
+            for idx in range(20)
+        ]
+        self.wallet = Wallet(self.entries)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        self.assertTrue(self.binary_handler.save_wallet(self.wallet))
+        wallet = self.binary_handler.load_wallet()
+        self.assertIsInstance(wallet.storage, MappedStorage)
+        self.assertEqual(len(wallet), len(self.entries))
+        self.assertEqual(wallet.balance, self.wallet.balance)
+        self.assertEqual(wallet[3], (3, self.entries[3]))
+        self.assertEqual(wallet[5:9], self.wallet[5:9])
+        self.assertEqual(
+            wallet.find_entries(SearchField.Date, "2024-05-03"),
+            self.wallet.find_entries(SearchField.Date, "2024-05-03"),
+        )
+        self.assertEqual(
+            wallet.rollup(RollupPeriod.Day),
+            self.wallet.rollup(RollupPeriod.Day),
+        )
+
+    def test_empty_wallet(self):
+        self.assertTrue(self.binary_handler.save_wallet(Wallet()))
+        wallet = self.binary_handler.load_wallet()
+        self.assertEqual(len(wallet), 0)
+        self.assertEqual(wallet.balance, 0)
+
+    def test_update_loaded_wallet(self):
+        self.binary_handler.save_wallet(self.wallet)
+        wallet = self.binary_handler.load_wallet()
+        wallet.add_entry(self.entries[0])
+        wallet[1] = self.entries[2]
+        self.assertNotIsInstance(wallet.storage, MappedStorage)
+        self.assertEqual(wallet[20], (20, self.entries[0]))
+        self.assertEqual(wallet[1], (1, self.entries[2]))
+
+        self.assertTrue(self.binary_handler.save_wallet(wallet))
+        reloaded = self.binary_handler.load_wallet()
+        self.assertEqual(reloaded[0:], wallet[0:])
+        self.assertEqual(reloaded.balance, wallet.balance)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a wallet")
+        self.assertIsNone(self.binary_handler.load_wallet())
+        self.assertIsNone(self.binary_handler.load_wallet(self.path + "x"))
+
+    def test_json_conversion(self):
+        json_path = os.path.join(self.directory.name, "wallet.json")
+        json_handler = JsonHandler(json_path)
+        json_handler.save_json(self.wallet.to_json())
+
+        self.assertTrue(self.binary_handler.json_to_binary(json_handler))
+        converted_path = os.path.join(self.directory.name, "converted.json")
+        self.assertTrue(
+            self.binary_handler.binary_to_json(
+                json_handler,
+                json_path=converted_path,
+            )
+        )
+        self.assertEqual(
+            json_handler.load_json(converted_path),
+            self.wallet.to_json(),
+        )
@@ -0,0 +1,231 @@
+from io import StringIO
+import json
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from utils.json_handler import JsonHandler
+from wallet.cli import WalletCli
+
+
+class TestWalletCli(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def run_cli(self, *argv: str) -> tuple:
+        out, err = StringIO(), StringIO()
+        code = WalletCli(out, err).run(list(argv))
+        return code, out.getvalue(), err.getvalue()
+
+    def test_add_and_balance(self):
+        code, _, _ = self.run_cli(
+            "add", self.path, "--date", "2024-05-02", "--category", "income",
+            "--amount", "100.5", "--description", "Зарплата",
+        )
+        self.assertEqual(code, 0)
+        self.run_cli(
+            "add", self.path, "--date", "2024-05-03", "--category", "2",
+            "--amount", "20.25", "--description", "Кофе",
+        )
+
+        code, out, _ = self.run_cli("balance", self.path, "--json")
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            json.loads(out),
+            {"income": 100.5, "spending": 20.25, "balance": 80.25},
+        )
+
+        _, out, _ = self.run_cli("find", self.path, "--text", "коф*")
+        self.assertEqual(out, "1\t2024-05-03\tРасход\t20.25\tКофе\n")
+
+    def test_batch(self):
+        batch_path = os.path.join(self.directory.name, "ops.txt")
+        export_path = os.path.join(self.directory.name, "wallet.wbin")
+        with open(batch_path, "w", encoding="utf-8") as file:
+            file.write(
+                "# пакет\n"
+                f"add {self.path} --date 2024-05-02 --category spend "
+                "--amount 10 --description 'Пятёрочка'\n"
+                f"add {self.path} --category unknown --amount 10\n"
+                f"add {self.path} --date 2024-06-02 --category spend "
+                "--amount 5\n"
+                f"export {self.path} {export_path}\n"
+            )
+
+        code, _, err = self.run_cli("--batch", batch_path)
+        self.assertEqual(code, 1)
+        self.assertIn("строке 3", err)
+
+        wallet_data = JsonHandler(self.path).load_json()
+        self.assertEqual(len(wallet_data["entries"]), 2)
+
+        code, out, _ = self.run_cli(
+            "report", export_path, "--period", "month", "--json",
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(
+            [row["period"] for row in json.loads(out)],
+            ["2024-05", "2024-06"],
+        )
+
+    def test_import_and_errors(self):
+        source = os.path.join(self.directory.name, "source.json")
+        JsonHandler(source).save_json({
+            "entries": [
+                {
+                    "date": "2024-05-02",
+                    "category": 1,
+                    "amount": 10,
+                    "description": "",
+                },
+                {"amount": 1},
+            ]
+        })
+        code, out, err = self.run_cli("import", self.path, source)
+        self.assertEqual(code, 0)
+        self.assertIn("Добавлено записей: 1", out)
+        self.assertIn("Запись 1", err)
+
+        code, _, err = self.run_cli("balance", self.path + "x")
+        self.assertEqual(code, 1)
+        self.assertIn("не найден", err)
+        code, _, _ = self.run_cli()
+        self.assertEqual(code, 1)
+
+        for amount in ("inf", "nan", "1e17"):
+            code, _, err = self.run_cli(
+                "add", self.path, "--date", "2024-05-02", "--category", "1",
+                "--amount", amount,
+            )
+            self.assertEqual(code, 1)
+            self.assertNotIn("Traceback", err)
+
+    def test_skip_invalid(self):
+        JsonHandler(self.path).save_json({
+            "entries": [
+                {
+                    "date": "2024-05-02",
+                    "category": 1,
+                    "amount": 10,
+                    "description": "",
+                },
+                {"amount": 1},
+            ]
+        })
+        code, _, err = self.run_cli("balance", self.path)
+        self.assertEqual(code, 1)
+        self.assertIn("не удалось загрузить", err)
+
+        code, out, err = self.run_cli(
+            "--skip-invalid", "balance", self.path, "--json",
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["income"], 10)
+        self.assertIn("пропущена запись 1", err)
+
+    def test_journal(self):
+        for amount in ("10", "20"):
+            code, _, _ = self.run_cli(
+                "--journal", "add", self.path, "--date", "2024-05-02",
+                "--category", "income", "--amount", amount,
+            )
+            self.assertEqual(code, 0)
+
+        wallet_data = JsonHandler(self.path).load_json()
+        self.assertEqual(len(wallet_data["entries"]), 1)
+        self.assertTrue(os.path.exists(self.path + ".journal"))
+
+        code, out, _ = self.run_cli(
+            "--journal", "balance", self.path, "--json",
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["income"], 30)
+
+    def test_consolidate(self):
+        other = os.path.join(self.directory.name, "other.json")
+        for path, amount in ((self.path, "10"), (other, "2.5")):
+            self.run_cli(
+                "add", path, "--date", "2024-05-02", "--category", "spend",
+                "--amount", amount, "--description", "Кофе",
+            )
+        self.run_cli(
+            "add", other, "--date", "2024-06-02", "--category", "income",
+            "--amount", "100",
+        )
+
+        code, out, _ = self.run_cli("consolidate", self.path, other, "--json")
+        self.assertEqual(code, 0)
+        report = json.loads(out)
+        self.assertEqual(report["balance"], 87.5)
+        self.assertEqual(len(report["wallets"]), 2)
+
+        _, out, _ = self.run_cli(
+            "consolidate", self.path, other, "--to", "2024-05-31",
+        )
+        self.assertEqual(out.splitlines()[-1], "Итого\t0.00\t12.50\t-12.50")
+
+        _, out, _ = self.run_cli(
+            "consolidate", self.path, other, "--text", "кофе", "--json",
+        )
+        self.assertEqual(
+            [(row["path"], row["amount"]) for row in json.loads(out)],
+            [(self.path, 10), (other, 2.5)],
+        )
+
+
+    def test_largest_with_filters(self):
+        source = os.path.join(self.directory.name, "source.json")
+        entries = [
+            {
+                "date": "2024-06-0{}".format(idx + 1),
+                "category": 2,
+                "amount": 1000 + idx,
+                "description": "Аренда",
+            }
+            for idx in range(3)
+        ] + [
+            {
+                "date": "2024-05-0{}".format(idx + 1),
+                "category": 2,
+                "amount": 10 + idx,
+                "description": "Кофе",
+            }
+            for idx in range(4)
+        ] + [
+            {
+                "date": "2024-05-05",
+                "category": 1,
+                "amount": 500,
+                "description": "Кофе",
+            },
+        ]
+        JsonHandler(source).save_json({"entries": entries})
+        self.run_cli("import", self.path, source)
+
+        _, out, _ = self.run_cli(
+            "find", self.path, "--largest-spends", "2",
+            "--from", "2024-05-01", "--to", "2024-05-31", "--json",
+        )
+        self.assertEqual(
+            [(row["index"], row["amount"]) for row in json.loads(out)],
+            [(6, 13), (5, 12)],
+        )
+
+        _, out, _ = self.run_cli(
+            "consolidate", self.path, "--largest-spends", "3",
+            "--text", "кофе", "--json",
+        )
+        self.assertEqual(
+            [row["amount"] for row in json.loads(out)],
+            [13, 12, 11],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+sys.path.append("..")
+
+from unittest import mock
+
+from wallet.indexes import MAX_DENSE_DAYS, DatePrefixSums
+
+
+class TestDatePrefixSums(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sums = DatePrefixSums([1, 2])
+
+    def test_sequential_days_resize_geometrically(self):
+        resize = DatePrefixSums._resize
+        with mock.patch.object(
+            DatePrefixSums,
+            "_resize",
+            autospec=True,
+            side_effect=resize,
+        ) as patched:
+            for day in range(3000):
+                self.sums.add(730000 + day, 1, 100)
+                self.sums.add(730000 - day, 2, 1)
+
+        self.assertLess(patched.call_count, 30)
+        self.assertEqual(self.sums.total(1), 300000)
+        self.assertEqual(self.sums.total(2), 3000)
+        self.assertEqual(self.sums.total(1, 730000, 730009), 1000)
+        self.assertEqual(self.sums.total(2, 729991, 730000), 10)
+
+    def test_extend_outside_range(self):
+        self.sums.add(730000, 1, 5)
+        self.sums.extend([720000, 740000], [1, 2], [7, 11])
+
+        self.assertEqual(self.sums.total(1), 12)
+        self.assertEqual(self.sums.total(1, None, 729999), 7)
+        self.assertEqual(self.sums.total(2, 730001), 11)
+
+
+    def test_outlier_dates_kept_out_of_trees(self):
+        self.sums.extend(
+            [739000, 739001, 739002, 1, 3652059],
+            [1, 2, 1, 2, 1],
+            [10, 20, 30, 40, 50],
+        )
+        self.sums.add(2, 1, 7)
+        self.sums.add(739003, 2, 5)
+        self.sums.add(1, 2, -40)
+
+        self.assertLessEqual(self.sums._size, MAX_DENSE_DAYS)
+        self.assertEqual(self.sums.total(1), 10 + 30 + 50 + 7)
+        self.assertEqual(self.sums.total(2), 20 + 5)
+        self.assertEqual(self.sums.total(1, None, 739001), 10 + 7)
+        self.assertEqual(self.sums.total(1, 739001), 30 + 50)
+        self.assertEqual(self.sums.total(2, 739003, 739003), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
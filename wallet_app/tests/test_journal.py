@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from datetime import date
+
+from utils.journal import WalletJournal
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.wallet import Wallet
+
+
+class TestWalletJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+        self.json_handler = JsonHandler(self.path)
+        self.entries = [
+            WalletEntry(
+                date=date.fromisoformat("2024-05-0{}".format(idx + 1)),
+                category=EntryCategory(idx % 2 + 1),
+                amount=10.5 * (idx + 1),
+                description="Запись {}".format(idx),
+            )
+            for idx in range(4)
+        ]
+        self.json_handler.save_json(Wallet(self.entries[:2]).to_json())
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _load(self) -> Wallet:
+        wallet = Wallet.from_entries(self.json_handler.stream_entries())
+        journal = WalletJournal(self.json_handler)
+        self.assertTrue(journal.replay(wallet))
+        return wallet
+
+    def test_changes_replayed_on_load(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[2])
+        wallet[0] = self.entries[3]
+        wallet.add_entries([self.entries[1]])
+        journal.detach()
+
+        with open(self.path + ".journal") as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+        loaded = self._load()
+        self.assertEqual(loaded[0:], wallet[0:])
+        self.assertEqual(loaded.balance, wallet.balance)
+
+    def test_append_after_replay(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[2])
+        journal.detach()
+
+        wallet = Wallet.from_entries(self.json_handler.stream_entries())
+        journal = WalletJournal(self.json_handler)
+        journal.replay(wallet)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[3])
+        journal.detach()
+
+        self.assertEqual(len(self._load()), 4)
+
+    def test_compaction(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler, compact_every=2)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[2])
+        wallet.add_entry(self.entries[3])
+        self.assertEqual(journal.records, 0)
+        journal.detach()
+
+        snapshot = Wallet.from_entries(self.json_handler.stream_entries())
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(self._load()[0:], wallet[0:])
+
+    def test_compaction_during_batch(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler, compact_every=5)
+        journal.attach(wallet)
+        wallet.add_entries(self.entries * 2)
+        journal.detach()
+
+        loaded = self._load()
+        self.assertEqual(len(loaded), 2 + 8)
+        self.assertEqual(loaded.balance, wallet.balance)
+        self.assertEqual(loaded[0:], wallet[0:])
+
+    def test_stale_journal_ignored(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[2])
+        journal.detach()
+        self.json_handler.save_json(wallet.to_json())
+
+        self.assertEqual(len(self._load()), 3)
+
+    def test_torn_record_truncated(self):
+        wallet = self._load()
+        journal = WalletJournal(self.json_handler)
+        journal.attach(wallet)
+        wallet.add_entry(self.entries[2])
+        journal.detach()
+        with open(self.path + ".journal", "a") as file:
+            file.write('{"op":"add","entry":{"date":"2024-')
+
+        loaded = self._load()
+        self.assertEqual(len(loaded), 3)
+        with open(self.path + ".journal") as file:
+            self.assertEqual(len(file.readlines()), 2)
@@ -0,0 +1,145 @@
+import gzip
+import json
+import lzma
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from utils.json_handler import JsonHandler
+from wallet.wallet import Wallet
+
+
+class TestJsonHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+        self.json_handler = JsonHandler(self.path)
+        self.entries = [
+            {
+                "date": "2024-05-0{}".format(idx % 9 + 1),
+                "category": idx % 2 + 1,
+                "amount": idx * 1.25,
+                "description": "entry {} \\u00ab{}\\u00bb".format(idx, idx),
+            }
+            for idx in range(50)
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, text: str) -> None:
+        with open(self.path, "w") as file:
+            file.write(text)
+
+    def test_stream_entries(self):
+        self.json_handler.save_json({"entries": self.entries})
+        for chunk_size in (1, 7, 4096):
+            entries = list(
+                self.json_handler.stream_entries(chunk_size=chunk_size)
+            )
+            self.assertEqual(entries, self.entries)
+
+    def test_stream_entries_skips_other_keys(self):
+        self._write(json.dumps({
+            "version": 12345,
+            "meta": {"entries": [1, 2]},
+            "entries": self.entries[:2],
+            "tail": [1.5, "x"],
+        }))
+        entries = list(self.json_handler.stream_entries(chunk_size=3))
+        self.assertEqual(entries, self.entries[:2])
+
+    def test_stream_entries_empty(self):
+        self._write("{}")
+        self.assertEqual(list(self.json_handler.stream_entries()), [])
+        self._write('{"entries": []}')
+        self.assertEqual(list(self.json_handler.stream_entries()), [])
+        self._write('{"entries": null}')
+        self.assertEqual(list(self.json_handler.stream_entries()), [])
+        self._write('{"entries": 1}')
+        with self.assertRaises(ValueError):
+            list(self.json_handler.stream_entries())
+
+    def test_stream_entries_missing_file(self):
+        self.assertIsNone(
+            self.json_handler.stream_entries(self.path + ".missing"),
+        )
+
+    def test_stream_entries_invalid(self):
+        self._write('{"entries": [{"date": "2024-05-02"}, ')
+        with self.assertRaises(ValueError):
+            list(self.json_handler.stream_entries(chunk_size=5))
+
+    def test_wallet_from_stream(self):
+        self.json_handler.save_json({"entries": self.entries})
+        wallet = Wallet.from_entries(
+            self.json_handler.stream_entries(chunk_size=64),
+            batch_size=8,
+        )
+        self.assertEqual(wallet.to_json(), {"entries": self.entries})
+
+    def test_wallet_from_stream_invalid(self):
+        self._write('{"entries": [{"date": "2024-05-02"}]}')
+        wallet = Wallet.from_entries(self.json_handler.stream_entries())
+        self.assertIsNone(wallet)
+
+    def test_compressed_round_trip(self):
+        for extension, codec in ((".gz", gzip), (".xz", lzma)):
+            path = self.path + extension
+            self.assertTrue(
+                self.json_handler.save_json({"entries": self.entries}, path)
+            )
+            with codec.open(path, "rt", encoding="utf-8") as file:
+                self.assertEqual(json.load(file), {"entries": self.entries})
+
+            self.assertEqual(
+                self.json_handler.load_json(path),
+                {"entries": self.entries},
+            )
+            self.assertEqual(
+                list(self.json_handler.stream_entries(path, chunk_size=7)),
+                self.entries,
+            )
+
+    def test_compressed_invalid(self):
+        path = self.path + ".gz"
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(json.dumps({"entries": self.entries}))
+        with open(path, "rb") as file:
+            data = file.read()
+        with open(path, "wb") as file:
+            file.write(data[:len(data) // 2])
+
+        self.assertIsNone(self.json_handler.load_json(path))
+        with self.assertRaises(ValueError):
+            list(self.json_handler.stream_entries(path))
+
+    def test_compact(self):
+        JsonHandler(self.path, compact=True).save_json(
+            {"entries": self.entries},
+        )
+        with open(self.path, "r") as file:
+            text = file.read()
+        self.assertNotIn("\n", text)
+        self.assertNotIn(", ", text)
+        self.assertEqual(
+            list(self.json_handler.stream_entries()),
+            self.entries,
+        )
+
+    def test_save_entries(self):
+        for compact in (False, True):
+            for path in (self.path, self.path + ".gz"):
+                for entries in (self.entries, []):
+                    handler = JsonHandler(path, compact)
+                    self.assertTrue(handler.save_entries(iter(entries)))
+                    self.assertEqual(
+                        handler.load_json(),
+                        {"entries": entries},
+                    )
+                    self.assertEqual(
+                        list(handler.stream_entries()),
+                        entries,
+                    )
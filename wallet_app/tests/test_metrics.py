@@ -0,0 +1,79 @@
+from datetime import date
+import json
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from menu.main_menu import MenuOptions
+from utils.metrics import Metrics, Profiler
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.wallet import SearchField
+from wallet.wallet_handler import WalletHandler
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_handler_metrics(self):
+        metrics = Metrics()
+        handler = WalletHandler(self.path, metrics=metrics)
+        handler.actions[MenuOptions.New]()
+        for amount in (10, 20, 30):
+            handler.wallet.add_entry(
+                WalletEntry(
+                    date=date(2024, 5, 2),
+                    category=EntryCategory.Spend,
+                    amount=amount,
+                    description="Кофе",
+                )
+            )
+        handler.wallet.find_entries(SearchField.Amount, 20)
+        handler.wallet.find_entries(SearchField.Description, "коф")
+        handler.actions[MenuOptions.Save]()
+        handler.json_handler.load_json()
+
+        self.assertEqual(metrics.calls["action.New"], 1)
+        self.assertEqual(metrics.calls["wallet.add_entry"], 3)
+        self.assertEqual(metrics.calls["wallet.find_entries"], 2)
+        self.assertEqual(metrics.index_searches, 1)
+        self.assertEqual(metrics.filter_scanned, 3)
+        self.assertEqual(metrics.returned, 1 + 3)
+
+        size = os.path.getsize(self.path)
+        self.assertEqual(metrics.bytes_written, size)
+        self.assertEqual(metrics.bytes_read, size)
+
+        histogram = metrics.to_json()["latency"]["wallet.add_entry"]
+        self.assertEqual(sum(histogram["buckets"].values()), 3)
+
+    def test_save_with_profile(self):
+        profiler = Profiler()
+        profiler.start()
+        sorted(range(1000), key=lambda value: -value)
+        metrics = Metrics()
+        metrics.record("action.ShowBalance", 0.5)
+
+        report_path = os.path.join(self.directory.name, "stats.json")
+        saved = metrics.save(report_path, {"profile": profiler.stop()})
+        self.assertTrue(saved)
+        with open(report_path, encoding="utf-8") as file:
+            report = json.load(file)
+
+        self.assertEqual(report["calls"], {"action.ShowBalance": 1})
+        self.assertEqual(
+            report["latency"]["action.ShowBalance"]["buckets"]["<=1.0"],
+            1,
+        )
+        self.assertGreater(report["profile"]["memory_peak"], 0)
+        self.assertTrue(report["profile"]["functions"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from datetime import date
+
+from utils.wallet_files import load_wallet_file, save_wallet_file
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.partitioned_wallet import PartitionError, PartitionedWallet
+from wallet.rollups import RollupPeriod
+from wallet.wallet import SearchField, Wallet
+
+
+class TestPartitionedWallet(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.wparts")
+        self.entries = [
+            WalletEntry(
+                date=date(2024, idx % 4 + 3, idx % 9 + 1),
+                category=EntryCategory(idx % 2 + 1),
+                amount=idx % 7 * 10.25,
+                description="Запись {}".format(idx % 5),
+            )
+            for idx in range(40)
+        ]
+        self.expected = Wallet(self.entries)
+        PartitionedWallet.create(self.path, self.entries)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _partition(self, month: str) -> str:
+        return os.path.join(self.path, month + ".json")
+
+    def test_open_reads_manifest_only(self):
+        wallet = PartitionedWallet.open(self.path)
+
+        self.assertEqual(len(wallet), len(self.expected))
+        self.assertEqual(wallet.balance, self.expected.balance)
+        self.assertEqual(wallet.total_income, self.expected.total_income)
+        self.assertEqual(
+            wallet.rollup(RollupPeriod.Month),
+            self.expected.rollup(RollupPeriod.Month),
+        )
+        self.assertEqual(
+            wallet.income_between(date(2024, 4, 1), date(2024, 5, 31)),
+            self.expected.income_between(date(2024, 4, 1), date(2024, 5, 31)),
+        )
+        self.assertEqual(len(wallet._storage), 0)
+
+    def test_date_search_loads_overlapping_partitions(self):
+        wallet = PartitionedWallet.open(self.path)
+        start, end = date(2024, 4, 3), date(2024, 4, 20)
+
+        found = [entry for _, entry in wallet.find_by_date_range(start, end)]
+        expected = [
+            entry for _, entry in self.expected.find_by_date_range(start, end)
+        ]
+
+        self.assertEqual(found, expected)
+        self.assertEqual(len(wallet._storage), 10)
+        self.assertEqual(len(wallet), len(self.expected))
+
+    def test_save_rewrites_changed_partitions_only(self):
+        wallet = PartitionedWallet.open(self.path)
+        mtimes = {
+            month: os.stat(self._partition(month)).st_mtime_ns
+            for month in ("2024-03", "2024-04", "2024-05", "2024-06")
+        }
+        os.remove(self._partition("2024-03"))
+
+        wallet.add_entry(WalletEntry(
+            date=date(2024, 5, 10),
+            category=EntryCategory.Income,
+            amount=100,
+            description="Премия",
+        ))
+        self.assertTrue(wallet.save())
+
+        self.assertFalse(os.path.exists(self._partition("2024-03")))
+        self.assertEqual(
+            os.stat(self._partition("2024-04")).st_mtime_ns,
+            mtimes["2024-04"],
+        )
+        self.assertNotEqual(
+            os.stat(self._partition("2024-05")).st_mtime_ns,
+            mtimes["2024-05"],
+        )
+
+        reopened = PartitionedWallet.open(self.path)
+        self.assertEqual(reopened.balance, self.expected.balance + 100)
+        self.assertEqual(
+            len(reopened.find_entries(SearchField.Date, "2024-05-10")),
+            1,
+        )
+
+    def test_edit_moves_entry_between_partitions(self):
+        wallet = PartitionedWallet.open(self.path)
+        entry_index, entry = wallet.find_by_date_range(
+            date(2024, 3, 1),
+            date(2024, 3, 31),
+        )[0]
+        moved = WalletEntry(
+            date=date(2024, 7, 1),
+            category=entry.category,
+            amount=entry.amount,
+            description=entry.description,
+        )
+        wallet[entry_index] = moved
+        self.assertTrue(wallet.save())
+
+        reopened = PartitionedWallet.open(self.path)
+        self.assertEqual(len(reopened), len(self.expected))
+        self.assertEqual(reopened.balance, self.expected.balance)
+        self.assertEqual(
+            reopened.find_by_date_range(date(2024, 7, 1))[0][1],
+            moved,
+        )
+        self.assertTrue(os.path.exists(self._partition("2024-07")))
+
+    def test_create_replaces_existing_wallet(self):
+        entries = self.entries[:3]
+        wallet = PartitionedWallet.create(self.path, entries)
+
+        self.assertEqual(len(wallet), 3)
+        self.assertEqual(
+            sorted(os.listdir(self.path)),
+            ["2024-03.json", "2024-04.json", "2024-05.json", "manifest.json"],
+        )
+        self.assertEqual(
+            PartitionedWallet.open(self.path).balance,
+            Wallet(entries).balance,
+        )
+
+    def test_failed_load_keeps_wallet(self):
+        wallet = PartitionedWallet.open(self.path)
+        with open(self._partition("2024-04"), "w") as file:
+            file.write('{"entries": [{"date": ')
+
+        with self.assertRaises(PartitionError):
+            wallet.to_json()
+        self.assertEqual(len(wallet), len(self.expected))
+        self.assertEqual(wallet.balance, self.expected.balance)
+        self.assertEqual(len(wallet._storage), 0)
+
+        with self.assertRaises(PartitionError):
+            wallet.add_entry(WalletEntry(
+                date=date(2024, 4, 10),
+                category=EntryCategory.Income,
+                amount=1,
+                description="",
+            ))
+        self.assertTrue(wallet.save())
+        self.assertEqual(
+            PartitionedWallet.open(self.path).balance,
+            self.expected.balance,
+        )
+
+    def test_wallet_files_round_trip(self):
+        export_path = os.path.join(self.directory.name, "copy.wparts")
+
+        self.assertTrue(save_wallet_file(self.expected, export_path))
+        wallet = load_wallet_file(export_path)
+
+        self.assertIsInstance(wallet, PartitionedWallet)
+        self.assertEqual(wallet.balance, self.expected.balance)
+        self.assertCountEqual(
+            [entry for _, entry in wallet[0:]],
+            [entry for _, entry in self.expected[0:]],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+sys.path.append("..")
+
+from datetime import date
+
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.query import And, Condition, Or, Query
+from wallet.wallet import SearchField, Wallet
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.entries = [
+            WalletEntry(
+                date=date.fromisoformat("2024-05-0{}".format(day)),
+                category=category,
+                amount=amount,
+                description=description,
+            )
+            for day, category, amount, description in [
+                (2, EntryCategory.Income, 123.45, "Salary"),
+                (2, EntryCategory.Spend, 67.89, "Groceries"),
+                (3, EntryCategory.Income, 384.99, "Bonus"),
+                (3, EntryCategory.Spend, 12.95, "Coffee"),
+                (4, EntryCategory.Income, 512.0, "Salary"),
+                (4, EntryCategory.Spend, 59.99, "Groceries"),
+            ]
+        ]
+        self.wallet = Wallet(self.entries)
+
+    def test_and_query(self):
+        query = Condition(SearchField.Category, EntryCategory.Spend) \
+            & Condition(SearchField.DateRange, ("2024-05-03", "2024-05-04"))
+        found = self.wallet.query(query)
+        self.assertEqual([idx for idx, _ in found], [3, 5])
+
+    def test_or_query(self):
+        query = Condition(SearchField.Amount, 12.95) \
+            | Condition(SearchField.Date, "2024-05-04")
+        found = self.wallet.query(query)
+        self.assertEqual([idx for idx, _ in found], [3, 4, 5])
+
+    def test_description_query(self):
+        query = Condition(SearchField.Description, "salary") \
+            & Condition(SearchField.AmountRange, (200, None))
+        found = self.wallet.query(query)
+        self.assertEqual(found, [(4, self.entries[4])])
+
+    def test_nested_query(self):
+        query = And(
+            Or(
+                Condition(SearchField.Description, "groceries"),
+                Condition(SearchField.Description, "coffee"),
+            ),
+            Condition(SearchField.AmountRange, (None, 60)),
+        )
+        found = self.wallet.query(query)
+        self.assertEqual([idx for idx, _ in found], [3, 5])
+
+    def test_explain_picks_most_selective_index(self):
+        query = Condition(SearchField.Category, EntryCategory.Spend) \
+            & Condition(SearchField.Date, "2024-05-02")
+        plan = self.wallet.explain(query).splitlines()
+        self.assertEqual(len(plan), 3)
+        self.assertNotIn("ведущее условие", plan[1])
+        self.assertIn("Date", plan[2])
+        self.assertIn("ведущее условие", plan[2])
+
+    def test_explain_full_scan(self):
+        query = Condition(SearchField.Description, "salary")
+        self.assertIn("фильтр", self.wallet.explain(query))
+
+    def test_text_query_uses_index(self):
+        query = Condition(SearchField.Text, "sal*") \
+            & Condition(SearchField.Category, EntryCategory.Income)
+        found = self.wallet.query(query)
+        self.assertEqual([idx for idx, _ in found], [0, 4])
+        self.assertIn("ведущее условие", self.wallet.explain(query))
+
+    def test_unsupported_field(self):
+        with self.assertRaises(ValueError):
+            Condition(SearchField.LargestSpends, 3)
+
+    def test_index_slices_computed_once(self):
+        calls = []
+        index_slices = self.wallet.index_slices
+        self.wallet.index_slices = lambda *args: \
+            calls.append(args) or index_slices(*args)
+        query = Condition(SearchField.Text, "sal*") & (
+            Condition(SearchField.Category, EntryCategory.Income)
+            | Condition(SearchField.Fuzzy, "bonus")
+        )
+
+        self.assertEqual([idx for idx, _ in self.wallet.query(query)], [0, 4])
+        self.assertEqual(len(calls), 3)
+        calls.clear()
+        self.wallet.explain(query)
+        self.assertEqual(len(calls), 3)
+
+    def test_query_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Query()
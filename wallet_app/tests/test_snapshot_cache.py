@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from utils.json_handler import JsonHandler
+from utils.snapshot_cache import SnapshotCache
+from utils.wallet_files import load_json_wallet, save_json_wallet
+from wallet.wallet import Wallet
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+        self.json_handler = JsonHandler(self.path)
+        self.cache = SnapshotCache()
+        self.wallet_data = {
+            "entries": [
+                {
+                    "date": "2024-05-0{}".format(idx % 9 + 1),
+                    "category": idx % 2 + 1,
+                    "amount": idx * 1.25,
+                    "description": "entry {}".format(idx),
+                }
+                for idx in range(20)
+            ]
+        }
+        self.json_handler.save_json(self.wallet_data)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def load(self) -> Wallet:
+        return load_json_wallet(self.json_handler, self.path, self.cache)
+
+    def test_load_from_cache(self):
+        self.assertIsNone(self.cache.load(self.path))
+        wallet = self.load()
+        self.assertTrue(os.path.exists(self.cache.cache_path(self.path)))
+
+        cached = self.cache.load(self.path)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.to_json(), wallet.to_json())
+        self.assertEqual(cached.balance, wallet.balance)
+
+        # Изменилось только время изменения файла.
+        os.utime(self.path, ns=(1, 1))
+        self.assertIsNotNone(self.cache.load(self.path))
+        self.assertIsNotNone(self.cache.load(self.path))
+
+    def test_stale_cache(self):
+        self.load()
+        self.wallet_data["entries"][0]["amount"] = 7.5
+        self.json_handler.save_json(self.wallet_data)
+        self.assertIsNone(self.cache.load(self.path))
+
+        wallet = self.load()
+        self.assertEqual(wallet[0][1].amount, 7.5)
+        self.assertEqual(self.cache.load(self.path)[0][1].amount, 7.5)
+
+        with open(self.cache.key_path(self.path), "w") as file:
+            file.write("{")
+        self.assertIsNone(self.cache.load(self.path))
+        self.assertEqual(len(self.load()), 20)
+
+    def test_save_invalidates_cache(self):
+        wallet = self.load()
+        wallet.add_entries(self.wallet_data["entries"][:2])
+        self.assertTrue(
+            save_json_wallet(self.json_handler, wallet, self.path, self.cache)
+        )
+        self.assertFalse(os.path.exists(self.cache.key_path(self.path)))
+        self.assertFalse(os.path.exists(self.cache.cache_path(self.path)))
+
+        self.assertEqual(len(self.load()), 22)
+        cached = self.cache.load(self.path)
+        self.assertEqual(len(cached), 22)
+        self.cache.invalidate(self.path)
+        self.assertFalse(os.path.exists(self.cache.cache_path(self.path)))
+        self.assertIsNone(self.cache.load(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from datetime import date
+
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.query import Condition
+from wallet.rollups import RollupPeriod
+from wallet.sqlite_wallet import SqliteWallet
+from wallet.wallet import PageOrder, SearchField, Wallet
+
+
+class TestSqliteWallet(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.sqlite")
+        self.entries = [
+            WalletEntry(
+                date=date.fromisoformat("2024-05-0{}".format(idx % 9 + 1)),
+                category=EntryCategory(idx % 2 + 1),
+                amount=idx % 7 * 10.25,
+                description="Запись {}".format(idx % 5),
+            )
+            for idx in range(30)
+        ]
+        self.expected = Wallet(self.entries)
+        self.wallet = SqliteWallet.create(self.path, self.entries)
+
+    def tearDown(self) -> None:
+        self.wallet.close()
+        self.directory.cleanup()
+
+    def test_matches_in_memory_wallet(self):
+        self.assertEqual(len(self.wallet), len(self.expected))
+        self.assertEqual(self.wallet.balance, self.expected.balance)
+        self.assertEqual(self.wallet[4], self.expected[4])
+        self.assertIsNone(self.wallet[30])
+        self.assertEqual(self.wallet[0:], self.expected[0:])
+        self.assertEqual(self.wallet[25:3:-4], self.expected[25:3:-4])
+        self.assertEqual(self.wallet.to_json(), self.expected.to_json())
+
+        searches = [
+            (SearchField.Category, 2),
+            (SearchField.Date, "2024-05-03"),
+            (SearchField.Amount, 20.5),
+            (SearchField.DateRange, ("2024-05-02", "")),
+            (SearchField.AmountRange, (10, 41)),
+            (SearchField.LargestSpends, 4),
+            (SearchField.LargestIncomes, 3),
+            (SearchField.Description, "ЗАПИСЬ 3"),
+            (SearchField.Text, "зап* 4"),
+            (SearchField.Fuzzy, "zapis 2"),
+            (SearchField.Date, "не дата"),
+        ]
+        for search in searches:
+            self.assertEqual(
+                self.wallet.find_entries(*search),
+                self.expected.find_entries(*search),
+            )
+
+    def test_totals_and_rollups(self):
+        start = date(2024, 5, 3)
+        end = date(2024, 5, 6)
+        self.assertEqual(
+            self.wallet.balance_between(start, end),
+            self.expected.balance_between(start, end),
+        )
+        self.assertEqual(
+            self.wallet.spending_as_of(end),
+            self.expected.spending_as_of(end),
+        )
+        for period in RollupPeriod:
+            self.assertEqual(
+                self.wallet.rollup(period),
+                self.expected.rollup(period),
+            )
+
+    def test_query(self):
+        query = Condition(SearchField.Category, 1) & (
+            Condition(SearchField.Date, "2024-05-01")
+            | Condition(SearchField.AmountRange, (60, None))
+        )
+        self.assertEqual(
+            self.wallet.query(query),
+            self.expected.query(query),
+        )
+        self.assertIn("entries", self.wallet.explain(query))
+
+    def test_page(self):
+        for order in PageOrder:
+            after = self.expected.page(order, limit=7)[-1]
+            key = after[0] if order == PageOrder.Id else \
+                (after[1].date.toordinal(), after[0])
+            self.assertEqual(
+                self.wallet.page(order, after=key, limit=7),
+                self.expected.page(order, after=key, limit=7),
+            )
+            self.assertEqual(
+                self.wallet.page(order, before=key, limit=4),
+                self.expected.page(order, before=key, limit=4),
+            )
+            self.assertEqual(
+                self.wallet.count_after(order, key),
+                self.expected.count_after(order, key),
+            )
+
+    def test_changes_are_persisted(self):
+        created = []
+        self.wallet.find_similar("Запись 2")
+        self.wallet.add_listener(lambda idx, new: created.append((idx, new)))
+        self.wallet.add_entry(self.entries[0])
+        self.wallet[1] = self.entries[2]
+        report = self.wallet.add_entries([self.entries[3], {"amount": -1}])
+        self.assertEqual(report.added, 1)
+        self.assertEqual(len(report.errors), 1)
+        self.assertEqual(created, [(30, True), (1, False), (31, True)])
+
+        self.expected.add_entry(self.entries[0])
+        self.expected[1] = self.entries[2]
+        self.expected.add_entry(self.entries[3])
+        self.assertEqual(
+            self.wallet.find_similar("Запись 2"),
+            self.expected.find_similar("Запись 2"),
+        )
+        self.wallet.close()
+        self.wallet = SqliteWallet.open(self.path)
+        self.assertEqual(self.wallet[0:], self.expected[0:])
+        self.assertEqual(self.wallet.balance, self.expected.balance)
+
+    def test_create_replaces_wal_database(self):
+        for suffix in ("-wal", "-shm"):
+            with open(self.path + suffix, "wb") as file:
+                file.write(b"stale")
+        self.wallet.close()
+
+        entries = self.entries[:3]
+        self.wallet = SqliteWallet.create(self.path, entries)
+        self.assertEqual(self.wallet[0:], Wallet(entries)[0:])
+
+    def test_fuzzy_many_descriptions(self):
+        entries = [
+            WalletEntry(
+                date=date(2024, 5, 1),
+                category=EntryCategory.Spend,
+                amount=1,
+                description="Запись {}".format(idx),
+            )
+            for idx in range(1500)
+        ]
+        expected = Wallet(entries)
+        self.wallet.close()
+        self.wallet = SqliteWallet.create(self.path, entries)
+        self.wallet._connection.setlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999
+        )
+        query = Condition(SearchField.Fuzzy, "zapis")
+        self.assertEqual(self.wallet.query(query), expected.query(query))
+
+    def test_migrate_json(self):
+        json_path = os.path.join(self.directory.name, "wallet.json")
+        json_handler = JsonHandler(json_path)
+        json_handler.save_json(self.expected.to_json())
+        db_path = os.path.join(self.directory.name, "migrated.db")
+        wallet = SqliteWallet.migrate_json(json_handler, json_path, db_path)
+        self.assertEqual(wallet[0:], self.expected[0:])
+        wallet.close()
+
+        json_handler.save_json({"entries": [{"amount": 1}]})
+        self.assertIsNone(
+            SqliteWallet.migrate_json(json_handler, json_path, db_path)
+        )
+        self.assertIsNone(SqliteWallet.open(db_path + "x"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from typing import Dict, List
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Допустимая доля времени импорта команды без меню от времени импорта
+# всех модулей приложения на той же машине. Переменная окружения
+# WALLET_STARTUP_RATIO позволяет изменить её для медленных окружений.
+STARTUP_RATIO = float(os.environ.get("WALLET_STARTUP_RATIO", "0.9"))
+
+# Количество запусков, из которых берётся наименьшее время.
+STARTUP_RUNS = 3
+
+# Модули, которые не должны импортироваться командами без меню.
+INTERACTIVE_MODULES = (
+    "menu.main_menu",
+    "menu.entries_menu",
+    "wallet.wallet_handler",
+    "utils.autosave",
+    "utils.metrics",
+    "wallet.workspace",
+    "multiprocessing",
+    "cProfile",
+    "tracemalloc",
+)
+
+# Модули других форматов файлов, не нужные для Json файла без сжатия.
+FORMAT_MODULES = ("sqlite3", "gzip", "lzma")
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "wallet.json")
+        with open(self.path, "w") as file:
+            file.write('{"entries": []}')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def import_times(self, args: List[str]) -> Dict[str, int]:
+        """
+        Запустить интерпретатор с -X importtime в директории приложения.
+
+        Returns:
+            Dict[str, int]: собственное время импорта модулей
+            в микросекундах.
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=APP_DIRECTORY,
+            capture_output=True,
+            text=True,
+        )
+        times = {}
+        errors = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:"):
+                errors.append(line)
+            elif "self [us]" not in line:
+                self_time, _, name = line[len("import time:"):].split("|")
+                times[name.strip()] = int(self_time)
+        self.assertEqual(result.returncode, 0, "\n".join(errors))
+        return times
+
+    def best_total(self, args: List[str]) -> int:
+        """ Наименьшее суммарное время импорта из нескольких запусков. """
+        return min(
+            sum(self.import_times(args).values())
+            for _ in range(STARTUP_RUNS)
+        )
+
+    def test_command_skips_interactive_modules(self):
+        times = self.import_times(["main.py", "balance", self.path])
+
+        self.assertIn("wallet.cli", times)
+        for module in (*INTERACTIVE_MODULES, *FORMAT_MODULES):
+            self.assertNotIn(module, times)
+
+    def test_command_startup_budget(self):
+        command = self.best_total(["main.py", "balance", self.path])
+        everything = self.best_total([
+            "-c",
+            "import " + ", ".join(("wallet.cli", *INTERACTIVE_MODULES)),
+        ])
+
+        self.assertLess(command, STARTUP_RATIO * everything)
+
+
+if __name__ == '__main__':
+    unittest.main()
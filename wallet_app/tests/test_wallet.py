@@ -5,7 +5,9 @@ sys.path.append("..")
 from datetime import date
 
 from wallet.entry import EntryCategory, WalletEntry
-from wallet.wallet import SearchField, Wallet
+from wallet.rollups import RollupPeriod
+from wallet.cursor import WalletCursor
+from wallet.wallet import PageOrder, SearchField, Wallet
 
 
 class TestWallet(unittest.TestCase):
@@ -102,6 +104,48 @@ class TestWallet(unittest.TestCase):
         self.assertEqual(len(wallet), 1)
         self.assertEqual(wallet[0], (0, self.entries[4]))
 
+    def test_wallet_from_json_errors(self):
+        rows = [entry.to_json() for entry in self.entries]
+        rows[1] = {**rows[1], "date": "2024-13-01"}
+        rows.insert(3, {**rows[0], "category": True})
+        rows.append({"date": rows[0]["date"], "amount": 1.0})
+        wallet_data = {"entries": rows}
+
+        self.assertIsNone(Wallet.from_json(wallet_data))
+
+        wallet = Wallet.from_json(wallet_data, strict=False)
+        self.assertEqual(len(wallet), len(self.entries) - 1)
+        self.assertEqual(wallet[1], (1, self.entries[2]))
+
+        wallet, report = Wallet.load_entries(rows, batch_size=2)
+        self.assertEqual(report.added, len(self.entries) - 1)
+        self.assertEqual(
+            [row_number for row_number, _ in report.errors],
+            [1, 3, len(rows) - 1],
+        )
+        self.assertEqual(wallet.balance, Wallet.from_json(
+            {"entries": rows[:1] + rows[2:3] + rows[4:-1]},
+        ).balance)
+
+        wallet, report = Wallet.load_entries(rows, strict=True)
+        self.assertIsNone(wallet)
+        self.assertTrue(report.errors)
+
+    def test_wallet_load_entries_bad_amounts(self):
+        row = self.entries[0].to_json()
+        rows = [row] + [
+            {**row, "amount": amount}
+            for amount in (float("inf"), float("nan"), 1e17)
+        ]
+
+        wallet, report = Wallet.load_entries(rows)
+        self.assertEqual(report.added, 1)
+        self.assertEqual(
+            [row_number for row_number, _ in report.errors],
+            [1, 2, 3],
+        )
+        self.assertEqual(wallet[0:], [(0, self.entries[0])])
+
     def test_wallet_balance(self):
         initial_balance = self.blank_wallet.balance
         initial_total_income = self.blank_wallet.total_income
@@ -170,3 +214,399 @@ class TestWallet(unittest.TestCase):
         expected = []
         self.assertEqual(found, expected)
 
+
+    def test_wallet_set_item(self):
+        updated_entry = WalletEntry(
+            date=date.fromisoformat("2024-05-05"),
+            category=EntryCategory.Spend,
+            amount=100.0,
+            description="test entry 1",
+        )
+        self.wallet[0] = updated_entry
+        self.assertEqual(self.wallet[0], (0, updated_entry))
+        self.assertAlmostEqual(self.wallet.total_income, 896.99)
+        self.assertAlmostEqual(self.wallet.total_spending, 240.83)
+
+    def test_wallet_set_item_out_of_range(self):
+        self.wallet[10] = self.entries[0]
+        self.assertEqual(len(self.wallet), len(self.entries))
+        self.assertIsNone(self.wallet[10])
+
+    def test_wallet_to_json_round_trip(self):
+        wallet = Wallet.from_json(self.wallet.to_json())
+        self.assertEqual(wallet[0:], self.wallet[0:])
+        self.assertEqual(wallet.balance, self.wallet.balance)
+
+    def test_search_entries_by_date_range(self):
+        found = self.wallet.find_entries(
+            SearchField.DateRange,
+            ("2024-05-03", "2024-05-04"),
+        )
+        expected = [(idx, self.entries[idx]) for idx in range(2, 6)]
+        self.assertEqual(found, expected)
+
+    def test_search_entries_by_date_range_open(self):
+        found = self.wallet.find_entries(
+            SearchField.DateRange,
+            (None, date.fromisoformat("2024-05-02")),
+        )
+        expected = [(idx, self.entries[idx]) for idx in range(2)]
+        self.assertEqual(found, expected)
+
+    def test_date_index_follows_set_item(self):
+        self.wallet[0] = WalletEntry(
+            date=date.fromisoformat("2024-05-04"),
+            category=EntryCategory.Income,
+            amount=123.45,
+            description="test entry 1",
+        )
+        found = self.wallet.find_entries(SearchField.Date, "2024-05-04")
+        self.assertEqual([idx for idx, _ in found], [0, 4, 5])
+        found = self.wallet.find_entries(SearchField.Date, "2024-05-02")
+        self.assertEqual([idx for idx, _ in found], [1])
+
+    def test_search_entries_by_amount(self):
+        found = self.wallet.find_entries(SearchField.Amount, "67.89")
+        self.assertEqual(found, [(1, self.entries[1])])
+
+    def test_search_entries_by_amount_range(self):
+        found = self.wallet.find_entries(
+            SearchField.AmountRange,
+            (50, 130),
+        )
+        self.assertEqual([idx for idx, _ in found], [5, 1, 0])
+
+    def test_search_largest_spends(self):
+        found = self.wallet.find_entries(SearchField.LargestSpends, 2)
+        self.assertEqual(found, [(1, self.entries[1]), (5, self.entries[5])])
+
+    def test_search_largest_incomes_after_set_item(self):
+        self.wallet[4] = WalletEntry(
+            date=date.fromisoformat("2024-05-04"),
+            category=EntryCategory.Spend,
+            amount=512.0,
+            description="test entry 5",
+        )
+        found = self.wallet.find_entries(SearchField.LargestIncomes, 5)
+        self.assertEqual([idx for idx, _ in found], [2, 0])
+        found = self.wallet.find_entries(SearchField.LargestSpends, 1)
+        self.assertEqual([idx for idx, _ in found], [4])
+
+    def test_wallet_balance_as_of(self):
+        self.assertAlmostEqual(
+            self.wallet.balance_as_of(date.fromisoformat("2024-05-02")),
+            55.56,
+        )
+        self.assertAlmostEqual(
+            self.wallet.income_as_of(date.fromisoformat("2024-05-03")),
+            508.44,
+        )
+        self.assertAlmostEqual(
+            self.wallet.spending_as_of(date.fromisoformat("2024-05-01")),
+            0,
+        )
+        self.assertAlmostEqual(
+            self.wallet.balance_as_of(date.fromisoformat("2030-01-01")),
+            self.wallet.balance,
+        )
+
+    def test_wallet_balance_between(self):
+        start = date.fromisoformat("2024-05-03")
+        end = date.fromisoformat("2024-05-04")
+        self.assertAlmostEqual(
+            self.wallet.income_between(start, end),
+            896.99,
+        )
+        self.assertAlmostEqual(
+            self.wallet.spending_between(start, end),
+            72.94,
+        )
+        self.assertAlmostEqual(
+            self.wallet.balance_between(start, end),
+            824.05,
+        )
+
+    def test_wallet_balance_with_outlier_date(self):
+        self.wallet.add_entry(WalletEntry(
+            date=date(1, 1, 1),
+            category=EntryCategory.Spend,
+            amount=10,
+            description="опечатка в дате",
+        ))
+        self.assertLess(self.wallet._date_totals._size, 100000)
+        self.assertAlmostEqual(
+            self.wallet.spending_as_of(date.fromisoformat("2024-05-01")),
+            10,
+        )
+        self.assertAlmostEqual(
+            self.wallet.spending_between(
+                date.fromisoformat("2024-05-03"),
+                date.fromisoformat("2024-05-04"),
+            ),
+            72.94,
+        )
+
+    def test_wallet_balance_as_of_backdated_edit(self):
+        self.wallet[5] = WalletEntry(
+            date=date.fromisoformat("2020-01-01"),
+            category=EntryCategory.Spend,
+            amount=59.99,
+            description="test entry 6",
+        )
+        self.wallet.add_entry(
+            WalletEntry(
+                date=date.fromisoformat("2010-06-30"),
+                category=EntryCategory.Income,
+                amount=10.0,
+                description="test entry 7",
+            )
+        )
+        self.assertAlmostEqual(
+            self.wallet.balance_as_of(date.fromisoformat("2020-01-01")),
+            -49.99,
+        )
+        self.assertAlmostEqual(
+            self.wallet.spending_between(
+                date.fromisoformat("2024-05-04"),
+                date.fromisoformat("2024-05-04"),
+            ),
+            0,
+        )
+        self.assertAlmostEqual(
+            self.wallet.balance_as_of(date.fromisoformat("2024-12-31")),
+            self.wallet.balance,
+        )
+
+    def test_wallet_rollup(self):
+        self.assertEqual(
+            self.wallet.rollup(RollupPeriod.Day),
+            [
+                ("2024-05-02", 123.45, 67.89),
+                ("2024-05-03", 384.99, 12.95),
+                ("2024-05-04", 512.0, 59.99),
+            ],
+        )
+        self.assertEqual(
+            self.wallet.rollup(RollupPeriod.Month),
+            [("2024-05", 1020.44, 140.83)],
+        )
+
+    def test_wallet_rollup_after_set_item(self):
+        self.wallet[0] = WalletEntry(
+            date=date.fromisoformat("2023-12-31"),
+            category=EntryCategory.Income,
+            amount=123.45,
+            description="test entry 1",
+        )
+        self.assertEqual(
+            self.wallet.rollup(RollupPeriod.Week),
+            [("2023-W52", 123.45, 0), ("2024-W18", 896.99, 140.83)],
+        )
+        self.assertEqual(
+            self.wallet.rollup(RollupPeriod.Year),
+            [("2023", 123.45, 0), ("2024", 896.99, 140.83)],
+        )
+
+    def test_wallet_add_entries(self):
+        report = self.wallet.add_entries([
+            self.entries[0],
+            {
+                "date": "2024-04-30",
+                "category": 2,
+                "amount": 10,
+                "description": "test entry 8",
+            },
+            {
+                "date": "2024-04-30",
+                "category": 3,
+                "amount": 10,
+                "description": "bad category",
+            },
+            {"date": "2024-04-30"},
+            {
+                "date": "2024-04-30",
+                "category": 1,
+                "amount": -5,
+                "description": "negative amount",
+            },
+        ])
+        self.assertEqual(report.first_index, 6)
+        self.assertEqual(report.added, 2)
+        self.assertEqual([row for row, _ in report.errors], [2, 3, 4])
+        self.assertEqual(len(self.wallet), 8)
+        self.assertEqual(self.wallet[6], (6, self.entries[0]))
+        self.assertAlmostEqual(self.wallet.total_income, 1143.89)
+        self.assertAlmostEqual(self.wallet.total_spending, 150.83)
+        found = self.wallet.find_entries(SearchField.Date, "2024-04-30")
+        self.assertEqual([idx for idx, _ in found], [7])
+        found = self.wallet.find_entries(SearchField.Amount, 123.45)
+        self.assertEqual([idx for idx, _ in found], [0, 6])
+        self.assertAlmostEqual(
+            self.wallet.balance_as_of(date.fromisoformat("2024-04-30")),
+            -10,
+        )
+        self.assertEqual(
+            self.wallet.rollup(RollupPeriod.Month),
+            [("2024-04", 0, 10.0), ("2024-05", 1143.89, 140.83)],
+        )
+
+    def test_wallet_extend_matches_add_entry(self):
+        wallet = Wallet()
+        for entry in self.entries:
+            wallet.add_entry(entry)
+        self.blank_wallet.extend(self.entries)
+        self.assertEqual(self.blank_wallet[0:], wallet[0:])
+        self.assertEqual(self.blank_wallet.balance, wallet.balance)
+
+    def test_entry_amount_in_cents(self):
+        entry = WalletEntry(
+            date=date.fromisoformat("2024-05-02"),
+            category=EntryCategory.Spend,
+            amount=0.1,
+            description="test entry",
+        )
+        self.assertEqual(entry.cents, 10)
+        self.assertFalse(hasattr(entry, "__dict__"))
+        with self.assertRaises(AttributeError):
+            entry.amount = 1
+
+        for _ in range(10):
+            self.blank_wallet.add_entry(entry)
+        self.assertEqual(self.blank_wallet.total_spending, 1.0)
+        row = entry.date.toordinal(), 2, 10, "test entry"
+        self.assertEqual(WalletEntry.from_row(row), entry)
+
+    def test_amount_out_of_range(self):
+        for amount in (1e17, float("inf"), float("nan")):
+            with self.assertRaises(ValueError):
+                WalletEntry(
+                    date=date.fromisoformat("2024-05-02"),
+                    category=EntryCategory.Spend,
+                    amount=amount,
+                    description="test entry",
+                )
+        self.assertEqual(
+            self.wallet.find_entries(SearchField.Amount, "inf"),
+            [],
+        )
+
+        report = self.blank_wallet.add_entries([{
+            "date": "2024-05-02",
+            "category": 2,
+            "amount": 1e17,
+            "description": "test entry",
+        }])
+        self.assertEqual([row for row, _ in report.errors], [0])
+        self.assertEqual(len(self.blank_wallet), 0)
+
+    def test_wallet_cursor_by_id(self):
+        cursor = WalletCursor(self.wallet, per_page=2)
+        self.assertEqual(cursor.next_page(), self.wallet[0:2])
+        self.assertEqual(cursor.next_page(), self.wallet[2:4])
+        self.assertEqual(cursor.remaining, len(self.wallet) - 4)
+        self.assertTrue(cursor.has_previous)
+        self.assertEqual(cursor.previous_page(), self.wallet[0:2])
+        self.assertFalse(cursor.has_previous)
+        self.assertEqual(cursor.previous_page(), [])
+
+    def test_wallet_cursor_by_date(self):
+        by_date = sorted(
+            self.wallet[0:],
+            key=lambda entry: (entry[1].date, entry[0]),
+        )
+        cursor = WalletCursor(self.wallet, PageOrder.Date, per_page=3)
+        pages = []
+        page = cursor.next_page()
+        while page:
+            pages.extend(page)
+            page = cursor.next_page()
+        self.assertEqual(pages, by_date)
+        self.assertEqual(cursor.remaining, 0)
+        number, entry = by_date[4]
+        key = entry.date.toordinal(), number
+        self.assertEqual(
+            self.wallet.page(PageOrder.Date, before=key, limit=2),
+            by_date[2:4],
+        )
+
+    def test_search_entries_by_text(self):
+        entries = self.wallet.find_entries(SearchField.Text, "Entry 5")
+        self.assertEqual(entries, [(4, self.entries[4])])
+        entries = self.wallet.find_entries(SearchField.Text, "ent* TEST")
+        self.assertEqual(entries, self.wallet[0:])
+        entries = self.wallet.find_entries(SearchField.Text, "entry 7")
+        self.assertEqual(entries, [])
+
+    def test_text_index_follows_set_item(self):
+        updated = WalletEntry(
+            date=date.fromisoformat("2024-05-04"),
+            category=EntryCategory.Spend,
+            amount=59.99,
+            description="Пятёрочка, продукты",
+        )
+        self.wallet[1] = updated
+        self.wallet.add_entry(updated)
+        self.assertEqual(
+            self.wallet.find_entries(SearchField.Text, "пятёр* ПРОДУКТЫ"),
+            [(1, updated), (6, updated)],
+        )
+        self.assertEqual(
+            self.wallet.find_entries(SearchField.Text, "2"),
+            [],
+        )
+
+    def test_text_index_built_on_first_text_search(self):
+        self.assertIsNone(self.wallet._text_index)
+        self.wallet.find_entries(SearchField.Fuzzy, "entry")
+        self.assertIsNone(self.wallet._text_index)
+
+        self.wallet.find_entries(SearchField.Text, "entry")
+        self.assertIsNotNone(self.wallet._text_index)
+        self.wallet.add_entry(self.entries[0])
+        self.assertEqual(
+            len(self.wallet.find_entries(SearchField.Text, "entry 1")),
+            2,
+        )
+
+    def test_fuzzy_index_built_on_first_fuzzy_search(self):
+        self.assertIsNone(self.wallet._fuzzy_index)
+        self.wallet.find_entries(SearchField.Description, "Entry 1")
+        self.assertIsNone(self.wallet._fuzzy_index)
+
+        self.wallet.find_similar("entry")
+        self.assertIsNotNone(self.wallet._fuzzy_index)
+        self.wallet.add_entry(self.entries[0])
+        self.assertEqual(
+            self.wallet.find_similar(self.entries[0].description, 1)[-1],
+            (len(self.wallet) - 1, self.entries[0]),
+        )
+
+    def test_find_similar(self):
+        descriptions = [
+            "Pyaterochka", "Пятёрочка", "pyaterochka 123", "Магнит",
+        ]
+        for description in descriptions:
+            self.blank_wallet.add_entry(
+                WalletEntry(
+                    date=date.fromisoformat("2024-05-02"),
+                    category=EntryCategory.Spend,
+                    amount=10,
+                    description=description,
+                )
+            )
+        found = self.blank_wallet.find_entries(
+            SearchField.Fuzzy,
+            "пятерочка",
+        )
+        self.assertEqual([idx for idx, _ in found], [0, 1, 2])
+        self.assertEqual(
+            [idx for idx, _ in self.blank_wallet.find_similar("Pyatyorochka")],
+            [0, 1, 2],
+        )
+
+        self.blank_wallet[1] = self.blank_wallet[3][1]
+        found = self.blank_wallet.find_similar("магнит")
+        self.assertEqual([idx for idx, _ in found], [1, 3])
+        self.assertEqual(self.blank_wallet.find_similar("Пятёрочка", 0.9), [
+            (0, self.blank_wallet[0][1]),
+        ])
@@ -0,0 +1,91 @@
+from datetime import date
+import os
+import tempfile
+import unittest
+import sys
+sys.path.append("..")
+
+from utils.wallet_files import save_wallet_file
+from wallet.entry import EntryCategory, WalletEntry
+from wallet.query import Condition
+from wallet.rollups import RollupPeriod
+from wallet.wallet import SearchField, Wallet
+from wallet.workspace import WalletWorkspace
+
+
+class TestWalletWorkspace(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for number in range(3):
+            wallet = Wallet([
+                WalletEntry(
+                    date=date(2024, 5 + idx % 2, number + 1),
+                    category=EntryCategory.Spend if idx else
+                    EntryCategory.Income,
+                    amount=number * 100 + idx + 1,
+                    description=f"Кофе {number}" if idx == 1 else "Обед",
+                )
+                for idx in range(4)
+            ])
+            path = os.path.join(self.directory.name, f"wallet{number}.json")
+            save_wallet_file(wallet, path)
+            self.paths.append(path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_consolidated_totals(self):
+        with WalletWorkspace(self.paths, processes=2) as workspace:
+            self.assertEqual(workspace.errors, [])
+            self.assertEqual(workspace.total_income, 1 + 101 + 201)
+            self.assertEqual(workspace.total_spending, 9 + 309 + 609)
+            self.assertEqual(workspace.balance, 303 - 927)
+
+            balances = workspace.balances(date(2024, 6, 1), None)
+            self.assertEqual(
+                balances[os.path.abspath(self.paths[1])],
+                (0, 102 + 104),
+            )
+            self.assertEqual(
+                workspace.rollup(RollupPeriod.Month),
+                [("2024-05", 303, 3 + 103 + 203), ("2024-06", 0, 618)],
+            )
+
+    def test_failed_worker_load(self):
+        broken = os.path.join(self.directory.name, "broken.json")
+        os.mkdir(broken)
+        with WalletWorkspace(self.paths + [broken]) as workspace:
+            self.assertEqual(workspace.errors, [broken])
+            self.assertEqual(workspace.total_income, 1 + 101 + 201)
+
+    def test_searches(self):
+        missing = os.path.join(self.directory.name, "missing.json")
+        with WalletWorkspace(self.paths + [missing]) as workspace:
+            self.assertEqual(workspace.errors, [missing])
+
+            found = workspace.find_entries(SearchField.Text, "кофе")
+            self.assertEqual(
+                [(os.path.basename(path), idx) for path, idx, _ in found],
+                [
+                    ("wallet0.json", 1),
+                    ("wallet1.json", 1),
+                    ("wallet2.json", 1),
+                ],
+            )
+            self.assertEqual(found[2][2].amount, 202)
+
+            largest = workspace.find_entries(SearchField.LargestSpends, 2)
+            self.assertEqual(
+                [entry.amount for _, _, entry in largest],
+                [204, 203],
+            )
+
+            found = workspace.query(
+                Condition(SearchField.Date, date(2024, 5, 2))
+            )
+            self.assertEqual([idx for _, idx, _ in found], [0, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
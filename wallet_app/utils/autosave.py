@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from wallet.wallet import Wallet
+
+# Пауза после последнего изменения кошелька перед автосохранением.
+AUTOSAVE_DELAY = 2.0
+
+
+class WalletAutosaver:
+    """
+    Фоновое автосохранение кошелька.
+
+    Изменения кошелька отмечаются слушателем, а фоновый поток
+    сохраняет кошелёк, когда изменения прекращаются на delay секунд.
+    Сохраняется снимок колонок кошелька, сделанный под блокировкой
+    lock, поэтому запись файла не задерживает меню. Изменения кошелька
+    должны выполняться под той же блокировкой. Записи файла
+    выполняются по одной, и устаревший снимок не перезаписывает более
+    новый.
+    """
+    save: Callable[[Wallet, str], bool]
+    delay: float
+    lock: threading.Lock
+    wallet: Optional[Wallet]
+    path: str
+    _condition: threading.Condition
+    _write_lock: threading.Lock
+    _thread: Optional[threading.Thread]
+    _version: int
+    _saved_version: int
+    _changed_at: float
+    _stopping: bool
+
+    def __init__(
+        self,
+        save: Callable[[Wallet, str], bool],
+        delay: float = AUTOSAVE_DELAY,
+    ):
+        """
+        Args:
+            save (Callable[[Wallet, str], bool]): запись снимка кошелька
+                                                  в файл по пути.
+            delay (float): пауза после изменения перед сохранением
+                           в секундах.
+        """
+        self.save = save
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.wallet = None
+        self.path = ""
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._version = 0
+        self._saved_version = 0
+        self._changed_at = 0.0
+        self._stopping = False
+
+    @property
+    def dirty(self) -> bool:
+        """ Есть ли несохранённые изменения. """
+        with self._condition:
+            return self._version != self._saved_version
+
+    def attach(self, wallet: Wallet, path: str) -> None:
+        """
+        Начать автосохранение кошелька, совпадающего с файлом.
+
+        Args:
+            wallet (Wallet): кошелёк.
+            path (str): путь к файлу кошелька.
+        """
+
+        self.detach()
+        self.wallet = wallet
+        self.path = path
+        self._version = self._saved_version = 0
+        self._stopping = False
+        wallet.add_listener(self._record)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="wallet-autosave",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def detach(self) -> bool:
+        """
+        Остановить фоновый поток, сохранить оставшиеся изменения
+        и прекратить автосохранение.
+
+        Returns:
+            bool: были ли сохранены все изменения.
+        """
+
+        if self.wallet is None:
+            return True
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+
+        saved = self.flush()
+        self.wallet.remove_listener(self._record)
+        self.wallet = None
+        return saved
+
+    def flush(self, force: bool = False) -> bool:
+        """
+        Сохранить изменения кошелька в вызывающем потоке.
+
+        Args:
+            force (bool): сохранить, даже если изменений нет.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+
+        if self.wallet is None:
+            return False
+
+        with self._write_lock:
+            with self.lock:
+                with self._condition:
+                    version = self._version
+                    if not force and version == self._saved_version:
+                        return True
+                snapshot = Wallet.from_storage(
+                    self.wallet.storage.snapshot(),
+                    self.wallet.totals,
+                )
+
+            saved = self.save(snapshot, self.path)
+            with self._condition:
+                if saved:
+                    self._saved_version = max(self._saved_version, version)
+                else:
+                    # Повторить попытку после следующей паузы.
+                    self._changed_at = time.monotonic()
+        return saved
+
+    def _record(self, entry_index: int, created: bool) -> None:
+        """ Отметить изменение кошелька. """
+        with self._condition:
+            self._version += 1
+            self._changed_at = time.monotonic()
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """ Цикл фонового потока. """
+        while True:
+            with self._condition:
+                while not self._stopping and \
+                        self._version == self._saved_version:
+                    self._condition.wait()
+
+                # Ждать, пока изменения не прекратятся на delay секунд.
+                while not self._stopping:
+                    remaining = self._changed_at + self.delay - \
+                        time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                if self._stopping:
+                    return
+
+            self.flush()
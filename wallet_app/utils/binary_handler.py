@@ -0,0 +1,290 @@
+from array import array
+import mmap
+import os.path
+import struct
+import sys
+from typing import Dict, Optional, Sequence
+
+from utils.json_handler import JsonHandler
+from wallet.entry import EntryCategory
+from wallet.storage import MappedStorage
+from wallet.wallet import Wallet
+
+BINARY_EXTENSION = ".wbin"
+MAGIC = b"WLTB"
+VERSION = 1
+
+# Заголовок: сигнатура, версия, флаги, число записей, число строк,
+# сумма доходов и сумма расходов в копейках.
+HEADER = struct.Struct("<4sHHQQqq")
+
+# Колонки файла: формат элемента array/memoryview и размер элемента.
+COLUMNS = (
+    ("dates", "i", 4),
+    ("categories", "B", 1),
+    ("amounts", "q", 8),
+    ("descriptions", "I", 4),
+)
+
+
+def is_binary_path(file_path: Optional[str]) -> bool:
+    """ Является ли путь путём к файлу кошелька в двоичном формате. """
+    return bool(file_path) and file_path.endswith(BINARY_EXTENSION)
+
+
+def _align(offset: int) -> int:
+    """ Выровнять смещение по границе 8 байт. """
+    return (offset + 7) & ~7
+
+
+def _layout(count: int, string_count: int) -> Dict[str, int]:
+    """
+    Смещения разделов файла.
+
+    Args:
+        count (int): число записей.
+        string_count (int): число строк в куче описаний.
+
+    Returns:
+        Dict[str, int]: смещение каждой колонки, таблицы смещений строк
+                        ("offsets") и кучи строк ("heap").
+    """
+    layout = {}
+    offset = _align(HEADER.size)
+    for name, _, size in COLUMNS:
+        layout[name] = offset
+        offset = _align(offset + count * size)
+    layout["offsets"] = offset
+    layout["heap"] = offset + (string_count + 1) * 8
+    return layout
+
+
+class _MappedStrings(Sequence):
+    """ Таблица строк, декодируемых из кучи при обращении. """
+
+    def __init__(self, offsets: Sequence[int], heap: memoryview):
+        self._offsets = offsets
+        self._heap = heap
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, string_id):
+        if isinstance(string_id, slice):
+            return [self[idx] for idx in range(len(self))[string_id]]
+        start = self._offsets[string_id]
+        end = self._offsets[string_id + 1]
+        return str(self._heap[start:end], "utf-8")
+
+
+class BinaryHandler:
+    """
+    Класс, отвечающий за сохранение/загрузку кошелька в двоичном формате.
+
+    Файл содержит заголовок с итогами, колонки записей фиксированной
+    ширины (дата, категория, сумма в копейках, номер описания) и кучу
+    строк описаний. Загрузка отображает файл в память и не читает
+    записи до обращения к ним.
+    """
+    default_path: str
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): пусть для сохранения/загрузки файла по умолчанию.
+        """
+        self.default_path = os.path.abspath(file_path)
+
+    def save_wallet(
+        self,
+        wallet: Wallet,
+        file_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Сохранить кошелёк в двоичный файл.
+
+        Файл записывается во временный и затем подменяет исходный,
+        поэтому кошелёк, отображённый из того же файла, остаётся валидным.
+
+        Args:
+            wallet (Wallet): кошелёк для сохранения.
+            file_path (str): путь к файлу.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+
+        if not file_path:
+            file_path = self.default_path
+
+        storage = wallet.storage
+        strings = [string.encode("utf-8") for string in storage.strings]
+        count = len(storage)
+        layout = _layout(count, len(strings))
+        totals = wallet.totals
+
+        temp_path = file_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(
+                    HEADER.pack(
+                        MAGIC,
+                        VERSION,
+                        0,
+                        count,
+                        len(strings),
+                        totals[EntryCategory.Income],
+                        totals[EntryCategory.Spend],
+                    )
+                )
+
+                for name, typecode, _ in COLUMNS:
+                    column = array(typecode, getattr(storage, name))
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    file.write(bytes(layout[name] - file.tell()))
+                    file.write(column.tobytes())
+
+                offsets = array("Q", [0])
+                for string in strings:
+                    offsets.append(offsets[-1] + len(string))
+                if sys.byteorder == "big":
+                    offsets.byteswap()
+                file.write(bytes(layout["offsets"] - file.tell()))
+                file.write(offsets.tobytes())
+                file.write(b"".join(strings))
+
+            os.replace(temp_path, file_path)
+            return True
+        except (OSError, TypeError, OverflowError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def load_wallet(self, file_path: Optional[str] = None) -> Optional[Wallet]:
+        """
+        Открыть кошелёк из двоичного файла.
+
+        Args:
+            file_path (str): путь к файлу.
+
+        Returns:
+            Wallet или None
+        """
+
+        if not file_path:
+            file_path = self.default_path
+
+        if not os.path.exists(file_path):
+            return
+
+        with open(file_path, "rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return
+
+        if len(buffer) < HEADER.size:
+            return
+
+        magic, version, _, count, string_count, income, spend = \
+            HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            return
+
+        layout = _layout(count, string_count)
+        if len(buffer) < layout["heap"]:
+            return
+
+        view = memoryview(buffer)
+        columns = {}
+        for name, typecode, size in COLUMNS:
+            start = layout[name]
+            columns[name] = self._column(
+                view[start:start + count * size],
+                typecode,
+            )
+
+        offsets = self._column(
+            view[layout["offsets"]:layout["heap"]],
+            "Q",
+        )
+        if len(buffer) < layout["heap"] + offsets[-1]:
+            return
+
+        storage = MappedStorage(
+            strings=_MappedStrings(offsets, view[layout["heap"]:]),
+            **columns,
+        )
+        return Wallet.from_storage(
+            storage,
+            {
+                EntryCategory.Income: income,
+                EntryCategory.Spend: spend,
+            },
+        )
+
+    @staticmethod
+    def _column(view: memoryview, typecode: str) -> Sequence[int]:
+        """
+        Колонка файла без копирования, либо копия с изменённым порядком
+        байт на платформах с обратным порядком байт.
+        """
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+
+        column = array(typecode, bytes(view))
+        column.byteswap()
+        return column
+
+    def json_to_binary(
+        self,
+        json_handler: JsonHandler,
+        json_path: Optional[str] = None,
+        binary_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Преобразовать Json файл кошелька в двоичный.
+
+        Args:
+            json_handler (JsonHandler): обработчик Json файлов.
+            json_path (str): путь к Json файлу.
+            binary_path (str): путь к двоичному файлу.
+
+        Returns:
+            bool: было ли преобразование успешным.
+        """
+
+        entries = json_handler.stream_entries(json_path)
+        if entries is None:
+            return False
+
+        wallet = Wallet.from_entries(entries)
+        if wallet is None:
+            return False
+
+        return self.save_wallet(wallet, binary_path)
+
+    def binary_to_json(
+        self,
+        json_handler: JsonHandler,
+        binary_path: Optional[str] = None,
+        json_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Преобразовать двоичный файл кошелька в Json.
+
+        Args:
+            json_handler (JsonHandler): обработчик Json файлов.
+            binary_path (str): путь к двоичному файлу.
+            json_path (str): путь к Json файлу.
+
+        Returns:
+            bool: было ли преобразование успешным.
+        """
+
+        wallet = self.load_wallet(binary_path)
+        if wallet is None:
+            return False
+
+        return json_handler.save_entries(wallet.iter_json(), json_path)
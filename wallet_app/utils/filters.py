@@ -1,17 +1,28 @@
 import datetime
-from typing import Any, Callable, Tuple
+import math
+from typing import Any, Callable, Optional, Tuple
 
-from wallet.entry import EntryCategory, WalletEntry
+from wallet.entry import EntryCategory, WalletEntry, to_cents
+from wallet.text_index import (
+    FUZZY_THRESHOLD, parse_text_query, text_matches, trigrams,
+)
+
+
+def parse_category(value: Any) -> Optional[EntryCategory]:
+    """
+    Привести значение к категории, None в случае некорректного значения.
+    """
+    if isinstance(value, EntryCategory):
+        return value
+    try:
+        return EntryCategory(int(value))
+    except (TypeError, ValueError):
+        return
 
 
 def category_filter(value: Any) -> Callable:
     """ Функция для фильтрования записей кошелька по категории. """
-    category = value if isinstance(value, EntryCategory) else None
-    if not category:
-        try:
-            category = EntryCategory(int(value))
-        except ValueError:
-            pass
+    category = parse_category(value)
 
     def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
         if not category:
@@ -21,29 +32,128 @@ def category_filter(value: Any) -> Callable:
     return filter_func
 
 
+def parse_amount(value: Any) -> Optional[float]:
+    """ Привести значение к сумме, None в случае некорректного значения. """
+    try:
+        amount = round(float(value), 2)
+    except (TypeError, ValueError):
+        return
+    return amount if math.isfinite(amount) else None
+
+
+def parse_amount_range(
+    value: Any,
+) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    """
+    Привести значение к диапазону сумм (минимум, максимум).
+
+    Пустая граница диапазона означает отсутствие ограничения.
+    None в случае некорректного значения.
+    """
+    try:
+        minimum, maximum = value
+    except (TypeError, ValueError):
+        return
+
+    bounds = []
+    for bound in (minimum, maximum):
+        if bound is None or bound == "":
+            bounds.append(None)
+            continue
+        bound = parse_amount(bound)
+        if bound is None:
+            return
+        bounds.append(bound)
+
+    return bounds[0], bounds[1]
+
+
+def parse_count(value: Any) -> Optional[int]:
+    """
+    Привести значение к положительному количеству записей,
+    None в случае некорректного значения.
+    """
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return
+    return count if count > 0 else None
+
+
 def amount_filter(value: Any) -> Callable:
     """ Функция для фильтрования записей кошелька по сумме. """
-    try:
-        value = round(float(value), 2)
-    except ValueError:
-        value = None
+    value = parse_amount(value)
+    cents = None if value is None else to_cents(value)
 
     def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
-        if value is None:
+        if cents is None:
+            return False
+        return entry[1].cents == cents
+
+    return filter_func
+
+
+def amount_range_filter(value: Any) -> Callable:
+    """ Функция для фильтрования записей кошелька по диапазону сумм. """
+    amount_range = parse_amount_range(value)
+    if amount_range is not None:
+        amount_range = tuple(
+            None if bound is None else to_cents(bound)
+            for bound in amount_range
+        )
+
+    def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
+        if amount_range is None:
             return False
-        return abs(round(entry[1].amount, 2) - value) <= 0.001
+        minimum, maximum = amount_range
+        cents = entry[1].cents
+        if minimum is not None and cents < minimum:
+            return False
+        return maximum is None or cents <= maximum
 
     return filter_func
 
 
+def parse_date(value: Any) -> Optional[datetime.date]:
+    """ Привести значение к дате, None в случае некорректного значения. """
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return
+
+
+def parse_date_range(
+    value: Any,
+) -> Optional[Tuple[Optional[datetime.date], Optional[datetime.date]]]:
+    """
+    Привести значение к периоду (начало, конец).
+
+    Пустая граница периода означает отсутствие ограничения.
+    None в случае некорректного значения.
+    """
+    try:
+        start, end = value
+    except (TypeError, ValueError):
+        return
+
+    bounds = []
+    for bound in (start, end):
+        if bound is None or bound == "":
+            bounds.append(None)
+            continue
+        bound = parse_date(bound)
+        if bound is None:
+            return
+        bounds.append(bound)
+
+    return bounds[0], bounds[1]
+
+
 def date_filter(value: Any) -> Callable:
     """ Функция для фильтрования записей кошелька по дате. """
-    date = value if isinstance(value, datetime.date) else None
-    if not date:
-        try:
-            date = datetime.date.fromisoformat(value)
-        except ValueError:
-            pass
+    date = parse_date(value)
 
     def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
         if value is None:
@@ -51,3 +161,67 @@ def date_filter(value: Any) -> Callable:
         return entry[1].date == date
 
     return filter_func
+
+
+def date_range_filter(value: Any) -> Callable:
+    """ Функция для фильтрования записей кошелька по периоду дат. """
+    date_range = parse_date_range(value)
+
+    def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
+        if date_range is None:
+            return False
+        start, end = date_range
+        if start is not None and entry[1].date < start:
+            return False
+        return end is None or entry[1].date <= end
+
+    return filter_func
+
+
+def description_filter(value: Any) -> Callable:
+    """
+    Функция для фильтрования записей кошелька по вхождению подстроки
+    в описание без учёта регистра.
+    """
+    substring = value.casefold() if isinstance(value, str) else None
+
+    def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
+        if not substring:
+            return False
+        return substring in entry[1].description.casefold()
+
+    return filter_func
+
+
+def text_filter(value: Any) -> Callable:
+    """
+    Функция для фильтрования записей кошелька по словам описания.
+
+    Запись подходит, если её описание содержит все слова запроса,
+    слово с "*" на конце ищется как префикс.
+    """
+    terms = parse_text_query(value) if isinstance(value, str) else []
+
+    def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
+        if not terms:
+            return False
+        return text_matches(entry[1].description, terms)
+
+    return filter_func
+
+
+def fuzzy_filter(value: Any) -> Callable:
+    """
+    Функция для фильтрования записей кошелька по сходству описания
+    с текстом не ниже порога FUZZY_THRESHOLD.
+    """
+    grams = trigrams(value) if isinstance(value, str) else set()
+
+    def filter_func(entry: Tuple[int, WalletEntry]) -> bool:
+        if not grams:
+            return False
+        entry_grams = trigrams(entry[1].description)
+        common = len(grams & entry_grams)
+        return common / len(grams | entry_grams) >= FUZZY_THRESHOLD
+
+    return filter_func
@@ -0,0 +1,237 @@
+import json
+from itertools import islice
+import os
+from typing import Optional, TextIO, TYPE_CHECKING
+
+from utils.json_handler import JsonHandler
+from wallet.entry import WalletEntry
+
+if TYPE_CHECKING:
+    from wallet.wallet import Wallet
+
+JOURNAL_SUFFIX = ".journal"
+SYNC_EVERY = 32
+COMPACT_EVERY = 10000
+
+
+class WalletJournal:
+    """
+    Журнал изменений кошелька рядом с файлом снимка.
+
+    Каждое добавление или изменение записи дописывается в журнал одной
+    компактной строкой Json. Загрузка кошелька применяет журнал поверх
+    последнего снимка, а уплотнение сохраняет новый снимок и очищает
+    журнал. Первая строка журнала хранит число записей в снимке, на
+    который он опирается, чтобы не применить журнал к уже
+    уплотнённому снимку повторно.
+    """
+    json_handler: JsonHandler
+    snapshot_path: str
+    path: str
+    sync_every: int
+    compact_every: int
+    wallet: Optional["Wallet"]
+    records: int
+    _applied: bool
+    _file: Optional[TextIO]
+    _pending: int
+
+    def __init__(
+        self,
+        json_handler: JsonHandler,
+        snapshot_path: Optional[str] = None,
+        sync_every: int = SYNC_EVERY,
+        compact_every: int = COMPACT_EVERY,
+    ):
+        """
+        Args:
+            json_handler (JsonHandler): обработчик файлов снимков.
+            snapshot_path (str): путь к файлу снимка.
+            sync_every (int): количество записей между сбросами на диск.
+            compact_every (int): количество записей журнала,
+                                 после которого выполняется уплотнение.
+        """
+        self.json_handler = json_handler
+        self.snapshot_path = snapshot_path or json_handler.default_path
+        self.path = self.snapshot_path + JOURNAL_SUFFIX
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self.wallet = None
+        self.records = 0
+        self._applied = False
+        self._file = None
+        self._pending = 0
+
+    def replay(self, wallet: "Wallet") -> bool:
+        """
+        Применить журнал к кошельку, загруженному из снимка.
+
+        Недописанные или повреждённые строки в конце журнала (например,
+        после сбоя) пропускаются и отрезаются от файла.
+
+        Args:
+            wallet (Wallet): кошелёк, загруженный из снимка.
+
+        Returns:
+            bool: был ли журнал применён без ошибок.
+        """
+
+        self._applied = False
+        self.records = 0
+
+        if not os.path.exists(self.path):
+            return True
+
+        with open(self.path, "rb") as file:
+            lines = file.read().split(b"\n")
+
+        try:
+            header = json.loads(lines[0]) if len(lines) > 1 else None
+        except json.JSONDecodeError:
+            return False
+        if not header or header.get("base") != len(wallet):
+            return True
+
+        valid_size = len(lines[0]) + 1
+        added = []
+        try:
+            for line in lines[1:-1]:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_size += len(line) + 1
+                self.records += 1
+
+                if record["op"] == "add":
+                    added.append(record["entry"])
+                    continue
+
+                if added:
+                    wallet.add_entries(added)
+                    added = []
+                wallet[record["index"]] = WalletEntry.from_json(
+                    record["entry"],
+                )
+
+            if added:
+                wallet.add_entries(added)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        if valid_size < os.path.getsize(self.path):
+            os.truncate(self.path, valid_size)
+
+        self._applied = True
+        return True
+
+    def attach(self, wallet: "Wallet") -> None:
+        """
+        Начать запись изменений кошелька в журнал.
+
+        Если журнал был применён к кошельку через replay, новые записи
+        дописываются в него, иначе кошелёк должен совпадать со снимком
+        и журнал начинается заново.
+
+        Args:
+            wallet (Wallet): кошелёк, изменения которого записываются.
+        """
+
+        self.detach()
+        self.wallet = wallet
+        wallet.add_listener(self._record)
+
+        if self._applied:
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._start(len(wallet))
+
+    def detach(self) -> None:
+        """ Прекратить запись изменений и закрыть журнал. """
+
+        if self.wallet:
+            self.wallet.remove_listener(self._record)
+            self.wallet = None
+
+        if self._file:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def sync(self) -> None:
+        """ Сбросить накопленные записи журнала на диск. """
+
+        if self._file and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def compact(self) -> bool:
+        """
+        Сохранить снимок кошелька и очистить журнал.
+
+        Returns:
+            bool: было ли уплотнение успешным.
+        """
+
+        if not self.wallet:
+            return False
+        return self._compact(len(self.wallet))
+
+    def _compact(self, base: int) -> bool:
+        """
+        Сохранить снимок из первых base записей и очистить журнал.
+
+        Пакетное добавление сначала переносит в кошелёк все записи
+        пакета и только затем сообщает о каждой из них, поэтому при
+        уплотнении во время оповещения в снимок попадают только записи,
+        уже записанные в журнал. Остальные записи пакета дописываются
+        в новый журнал.
+        """
+
+        if not self.json_handler.save_entries(
+            islice(self.wallet.iter_json(), base),
+            self.snapshot_path,
+        ):
+            return False
+
+        if self._file:
+            self._file.close()
+        self._start(base)
+        return True
+
+    def _start(self, base: int) -> None:
+        """ Начать новый журнал для снимка из base записей. """
+
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"base": base}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records = 0
+        self._applied = True
+        self._pending = 0
+
+    def _record(self, entry_index: int, created: bool) -> None:
+        """ Записать изменение записи кошелька в журнал. """
+
+        _, entry = self.wallet[entry_index]
+        if created:
+            record = {"op": "add", "entry": entry.to_json()}
+        else:
+            record = {
+                "op": "set",
+                "index": entry_index,
+                "entry": entry.to_json(),
+            }
+
+        self._file.write(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            + "\n"
+        )
+        self.records += 1
+        self._pending += 1
+
+        if self.records >= self.compact_every:
+            self._compact(entry_index + 1 if created else len(self.wallet))
+        elif self._pending >= self.sync_every:
+            self.sync()
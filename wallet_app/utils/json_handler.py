@@ -1,17 +1,118 @@
+from contextlib import contextmanager
+import importlib
+import io
 import json
 import os.path
-from typing import Any, Dict, Optional
+import sys
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, TextIO,
+    Tuple,
+)
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Сжатые Json файлы и модули, которыми они читаются и записываются.
+# Модули импортируются только при работе со сжатым файлом.
+COMPRESSED_EXTENSIONS = {
+    ".gz": "gzip",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+
+# Ошибки чтения повреждённого сжатого файла по модулям сжатия.
+COMPRESSION_ERRORS = {
+    "gzip": "BadGzipFile",
+    "lzma": "LZMAError",
+}
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+def _codec(file_path: Optional[str]) -> Any:
+    """ Модуль сжатия файла по расширению, None - файл без сжатия. """
+    if not file_path:
+        return
+    name = COMPRESSED_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+    if name is None:
+        return
+    return importlib.import_module(name)
+
+
+def _compression_errors() -> Tuple[type, ...]:
+    """
+    Ошибки чтения повреждённого сжатого файла.
+
+    Учитываются только импортированные модули сжатия: модуль
+    импортируется при открытии сжатого файла.
+    """
+    errors = [EOFError]
+    for name, error in COMPRESSION_ERRORS.items():
+        module = sys.modules.get(name)
+        if module is not None:
+            errors.append(getattr(module, error))
+    return tuple(errors)
+
+
+def _open_text(file_path: str, mode: str) -> TextIO:
+    """
+    Открыть текстовый файл, сжатый или нет в зависимости от расширения.
+
+    Сжатый файл распаковывается потоково, по мере чтения.
+    """
+    codec = _codec(file_path)
+    if codec is None:
+        return open(file_path, mode)
+    return codec.open(file_path, mode + "t", encoding="utf-8")
+
+
+@contextmanager
+def _text_writer(raw_file: BinaryIO, file_path: str) -> Iterator[TextIO]:
+    """
+    Текстовая запись в открытый файл со сжатием по расширению пути.
+
+    Сжатие выполняется потоково, по мере записи. Файл raw_file
+    остаётся открытым, чтобы его можно было сбросить на диск.
+
+    Args:
+        raw_file (BinaryIO): открытый на запись файл.
+        file_path (str): путь, по расширению которого выбирается сжатие.
+    """
+    codec = _codec(file_path)
+    if codec is None:
+        stream = raw_file
+    elif codec.__name__ == "gzip":
+        # В заголовок gzip записывается имя файла без расширения .gz.
+        stream = codec.GzipFile(file_path, "wb", fileobj=raw_file)
+    else:
+        stream = codec.LZMAFile(raw_file, "wb")
+
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+        if stream is not raw_file:
+            stream.close()
 
 
 class JsonHandler:
-    """ Класс, отвечающий за сохранения/загрузку Json файлов. """
+    """
+    Класс, отвечающий за сохранения/загрузку Json файлов.
+
+    Файлы с расширениями .gz, .xz и .lzma прозрачно сжимаются gzip
+    или lzma.
+    """
     default_path: str
+    compact: bool
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, compact: bool = False):
         """
         Args:
             file_path (str): пусть для сохранения/загрузки файла по умолчанию.
+            compact (bool): записывать Json без отступов и пробелов.
         """
+        self.compact = compact
         if os.path.isabs(file_path):
             self.default_path = file_path
         else:
@@ -37,16 +138,93 @@ class JsonHandler:
         if not os.path.exists(file_path):
             return
 
-        with open(file_path, "r") as file:
-            try:
+        try:
+            with _open_text(file_path, "r") as file:
                 return json.load(file)
-            except json.JSONDecodeError:
+        except (
+            json.JSONDecodeError,
+            UnicodeDecodeError,
+            *_compression_errors(),
+        ):
+            return
+
+    def stream_entries(
+        self,
+        file_path: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Optional[Iterator[Dict]]:
+        """
+        Потоково прочитать записи из Json файла вида {"entries": [...]}.
+
+        Файл читается блоками, в памяти одновременно находятся только
+        текущий блок и одна запись.
+
+        Args:
+            file_path (str): путь к файлу.
+            chunk_size (int): размер читаемого блока в символах.
+
+        Returns:
+            Iterator[Dict] или None, если файл не существует.
+            При некорректном содержимом итератор выбрасывает ValueError.
+        """
+
+        if not file_path:
+            file_path = self.default_path
+
+        if not os.path.exists(file_path):
+            return
+
+        return self._iter_entries(file_path, chunk_size)
+
+    @staticmethod
+    def _iter_entries(file_path: str, chunk_size: int) -> Iterator[Dict]:
+        with _open_text(file_path, "r") as file:
+            reader = _StreamReader(file, chunk_size)
+
+            reader.expect("{")
+            if reader.peek() == "}":
+                return
+
+            while True:
+                key = reader.decode()
+                if not isinstance(key, str):
+                    raise ValueError("Ожидался ключ объекта")
+                reader.expect(":")
+
+                if key == "entries":
+                    # Пустое значение вместо массива, например null,
+                    # означает кошелёк без записей.
+                    if reader.peek() == "[":
+                        yield from JsonHandler._iter_array(reader)
+                    elif reader.decode():
+                        raise ValueError("Ожидался массив записей")
+                else:
+                    reader.decode()
+
+                if reader.expect(",}") == "}":
+                    return
+
+    @staticmethod
+    def _iter_array(reader: "_StreamReader") -> Iterator[Any]:
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.expect("]")
+            return
+
+        while True:
+            yield reader.decode()
+            if reader.expect(",]") == "]":
                 return
 
     def save_json(self, obj: Any, file_path: Optional[str] = None) -> bool:
         """
         Со[ранить объект в Json файл.
 
+        Файл записывается во временный и затем подменяет исходный,
+        поэтому при сбое во время записи исходный файл не повреждается.
+        Json записывается частями по мере кодирования, в том числе
+        через сжатие, не собираясь в памяти целиком.
+
         Args:
             obj: объект для сохранения.
             file_path (str): путь к файлу.
@@ -55,12 +233,154 @@ class JsonHandler:
             bool: было ли сохранение успешным.
         """
 
+        def write(file: TextIO) -> None:
+            if self.compact:
+                json.dump(obj, file, separators=COMPACT_SEPARATORS)
+            else:
+                json.dump(obj, file, indent=2)
+
+        return self._write(write, file_path)
+
+    def save_entries(
+        self,
+        entries: Iterable[Dict],
+        file_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Сохранить записи в Json файл вида {"entries": [...]}.
+
+        Записи кодируются и записываются по одной, по мере получения
+        из итератора, поэтому ни список записей, ни Json целиком
+        не собираются в памяти. Без сжатия Json каждая запись
+        записывается отдельной строкой.
+
+        Args:
+            entries (Iterable[Dict]): записи в виде словарей Json.
+            file_path (str): путь к файлу.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+
+        if self.compact:
+            encode = json.JSONEncoder(separators=COMPACT_SEPARATORS).encode
+            head, separator, tail = '{"entries":[', ",", "]}"
+        else:
+            encode = json.JSONEncoder().encode
+            head, separator, tail = '{\n  "entries": [', ",", "\n  ]\n}"
+
+        def write(file: TextIO) -> None:
+            file.write(head)
+            written = False
+            for entry in entries:
+                if written:
+                    file.write(separator)
+                if not self.compact:
+                    file.write("\n    ")
+                file.write(encode(entry))
+                written = True
+            file.write(tail if written or self.compact else "]\n}")
+
+        return self._write(write, file_path)
+
+    def _write(
+        self,
+        write: Callable[[TextIO], None],
+        file_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Записать Json файл через временный файл, см. save_json.
+
+        Args:
+            write (Callable[[TextIO], None]): функция записи содержимого.
+            file_path (str): путь к файлу.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+
         if not file_path:
             file_path = self.default_path
 
-        with open(file_path, "w") as file:
+        temp_path = file_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as raw_file:
+                with _text_writer(raw_file, file_path) as file:
+                    write(file)
+                raw_file.flush()
+                os.fsync(raw_file.fileno())
+            os.replace(temp_path, file_path)
+            return True
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+
+class _StreamReader:
+    """ Буферизованное чтение значений Json из текстового потока. """
+    _decoder = json.JSONDecoder()
+    _whitespace = " \t\n\r"
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _read_more(self) -> bool:
+        """ Дочитать блок из файла, False при достижении конца файла. """
+        if self._eof:
+            return False
+
+        try:
+            chunk = self._file.read(self._chunk_size)
+        except _compression_errors() as error:
+            raise ValueError(f"Повреждённый сжатый файл: {error}")
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """ Следующий значимый символ без его извлечения. """
+        while True:
+            while self._position < len(self._buffer) and \
+                    self._buffer[self._position] in self._whitespace:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                raise ValueError("Неожиданный конец файла")
+
+    def expect(self, characters: str) -> str:
+        """ Извлечь следующий значимый символ, проверив его допустимость. """
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(f"Неожиданный символ {character!r}")
+        self._position += 1
+        return character
+
+    def decode(self) -> Any:
+        """ Извлечь следующее значение Json. """
+        self.peek()
+        while True:
             try:
-                json.dump(obj, file, indent=2)
-                return True
-            except TypeError:
-                return False
+                value, end = self._decoder.raw_decode(
+                    self._buffer,
+                    self._position,
+                )
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+
+            if end == len(self._buffer) and self._read_more():
+                continue
+
+            self._position = end
+            return value
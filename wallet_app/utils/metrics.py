@@ -0,0 +1,338 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from wallet.wallet import INDEXED_SEARCHES
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Верхние границы интервалов гистограммы задержек в секундах,
+# последний интервал не ограничен сверху.
+LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+
+WALLET_OPERATIONS = (
+    "add_entry",
+    "add_entries",
+    "find_entries",
+    "find_similar",
+    "page",
+    "query",
+    "rollup",
+    "to_json",
+)
+
+# Операции с файлами и позиция аргумента пути к файлу.
+READ_OPERATIONS = {"load_json": 0, "stream_entries": 0, "load_wallet": 0}
+WRITE_OPERATIONS = {"save_json": 1, "save_entries": 1, "save_wallet": 1}
+
+PROFILE_TOP = 20
+
+
+class Histogram:
+    """ Гистограмма задержек операции. """
+    counts: List[int]
+    total: float
+    max: float
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_json(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS]
+        labels.append(f">{LATENCY_BUCKETS[-1]}")
+        return {
+            "total": self.total,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class Metrics:
+    """
+    Счётчики и задержки операций сеанса работы с кошельком.
+
+    Сбор включается явно: instrument заменяет методы конкретного
+    объекта обёртками, поэтому без него операции не замедляются.
+    Для поиска записей учитываются записи, просмотренные фильтрами,
+    число поисков по индексу и найденные записи,
+    для файловых операций - размер прочитанных и записанных файлов.
+    """
+    calls: Dict[str, int]
+    latency: Dict[str, Histogram]
+    filter_scanned: int
+    index_searches: int
+    returned: int
+    bytes_read: int
+    bytes_written: int
+
+    def __init__(self):
+        self.calls = {}
+        self.latency = {}
+        self.filter_scanned = 0
+        self.index_searches = 0
+        self.returned = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Учесть один вызов операции.
+
+        Args:
+            name (str): имя операции.
+            seconds (float): длительность вызова.
+        """
+        self.calls[name] = self.calls.get(name, 0) + 1
+        histogram = self.latency.get(name)
+        if histogram is None:
+            histogram = self.latency[name] = Histogram()
+        histogram.add(seconds)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """
+        Обернуть функцию замером её вызовов.
+
+        Args:
+            name (str): имя операции.
+            func (Callable): оборачиваемая функция.
+
+        Returns:
+            Callable
+        """
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(
+        self,
+        obj: Any,
+        names: Iterable[str],
+        prefix: str = "",
+    ) -> Any:
+        """
+        Заменить методы объекта обёртками с замером.
+
+        Args:
+            obj: объект, методы которого оборачиваются.
+            names (Iterable[str]): имена методов, отсутствующие
+                                   у объекта пропускаются.
+            prefix (str): префикс имён операций.
+
+        Returns:
+            переданный объект.
+        """
+
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is None or hasattr(method, "__wrapped__"):
+                continue
+
+            wrapper = self.timed(prefix + name, method)
+            if name == "find_entries":
+                wrapper = self._count_searched(obj, wrapper)
+            elif name in READ_OPERATIONS or name in WRITE_OPERATIONS:
+                wrapper = self._count_bytes(obj, name, wrapper)
+            setattr(obj, name, wrapper)
+        return obj
+
+    def instrument_wallet(self, wallet: Any) -> Any:
+        """ Замерять операции кошелька. """
+        return self.instrument(wallet, WALLET_OPERATIONS, "wallet.")
+
+    def instrument_handler(self, handler: Any, prefix: str) -> Any:
+        """ Замерять файловые операции обработчика. """
+        return self.instrument(
+            handler,
+            [*READ_OPERATIONS, *WRITE_OPERATIONS],
+            prefix,
+        )
+
+    def _count_searched(self, wallet: Any, find: Callable) -> Callable:
+        """
+        Учитывать просмотренные и найденные при поиске записи.
+
+        Поиск фильтром просматривает все записи кошелька. Число
+        записей, затронутых поиском по индексу, зависит от индекса,
+        поэтому для него учитывается только количество поисков.
+        """
+
+        @wraps(find)
+        def wrapper(search_field, value):
+            entries = find(search_field, value)
+            if search_field in INDEXED_SEARCHES:
+                self.index_searches += 1
+            else:
+                self.filter_scanned += len(wallet)
+            self.returned += len(entries)
+            return entries
+        return wrapper
+
+    def _count_bytes(
+        self,
+        handler: Any,
+        name: str,
+        operation: Callable,
+    ) -> Callable:
+        """ Учитывать размер прочитанного или записанного файла. """
+        reading = name in READ_OPERATIONS
+        position = READ_OPERATIONS[name] if reading \
+            else WRITE_OPERATIONS[name]
+
+        @wraps(operation)
+        def wrapper(*args, **kwargs):
+            result = operation(*args, **kwargs)
+            path = args[position] if len(args) > position \
+                else kwargs.get("file_path")
+            size = _file_size(path or handler.default_path)
+            if reading:
+                self.bytes_read += size
+            else:
+                self.bytes_written += size
+            return result
+        return wrapper
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "latency": {
+                name: histogram.to_json()
+                for name, histogram in self.latency.items()
+            },
+            "find_entries": {
+                "filter_scanned": self.filter_scanned,
+                "index_searches": self.index_searches,
+                "returned": self.returned,
+            },
+            "bytes": {
+                "read": self.bytes_read,
+                "written": self.bytes_written,
+            },
+        }
+
+    def summary(self) -> List[str]:
+        """
+        Строки краткого отчёта для отображения пользователю.
+
+        Returns:
+            List[str]
+        """
+        lines = []
+        for name in sorted(self.calls):
+            histogram = self.latency[name]
+            lines.append(
+                "{name}: вызовов {calls}, среднее {avg:.6f} с, "
+                "максимум {max:.6f} с".format(
+                    name=name,
+                    calls=self.calls[name],
+                    avg=histogram.total / self.calls[name],
+                    max=histogram.max,
+                )
+            )
+        lines.append(
+            f"Поиск: просмотрено фильтрами {self.filter_scanned}, "
+            f"поисков по индексу {self.index_searches}, "
+            f"найдено {self.returned}"
+        )
+        lines.append(
+            f"Файлы: прочитано {self.bytes_read} байт, "
+            f"записано {self.bytes_written} байт"
+        )
+        return lines
+
+    def save(self, path: str, extra: Optional[Dict] = None) -> bool:
+        """
+        Сохранить статистику в Json файл.
+
+        Args:
+            path (str): путь к файлу.
+            extra (Optional[Dict]): дополнительные разделы отчёта.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({**self.to_json(), **(extra or {})}, file, indent=2)
+            return True
+        except OSError:
+            return False
+
+
+class Profiler:
+    """
+    Профилирование сеанса с помощью cProfile и tracemalloc.
+
+    Модули профилирования импортируются при запуске профилирования,
+    чтобы не замедлять запуск приложения без него.
+    """
+    _profile: Optional["cProfile.Profile"]
+    _report: Dict[str, Any]
+
+    def __init__(self):
+        self._profile = None
+        self._report = {}
+
+    def start(self) -> None:
+        import cProfile
+        import tracemalloc
+
+        self._profile = cProfile.Profile()
+        tracemalloc.start()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Остановить профилирование.
+
+        Returns:
+            Dict[str, Any]: самые затратные функции и пиковое
+            потребление памяти.
+        """
+        if self._profile is None:
+            return self._report
+
+        import io
+        import pstats
+        import tracemalloc
+
+        self._profile.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = tracemalloc.take_snapshot().statistics("lineno")
+        tracemalloc.stop()
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+        self._profile = None
+        self._report = {
+            "functions": stream.getvalue().splitlines(),
+            "memory_peak": peak,
+            "allocations": [
+                str(statistic) for statistic in allocations[:PROFILE_TOP]
+            ],
+        }
+        return self._report
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,168 @@
+import json
+import os
+from typing import Dict, Optional
+
+from utils.binary_handler import BinaryHandler
+from wallet.wallet import Wallet
+
+CACHE_SUFFIX = ".cache.wbin"
+KEY_SUFFIX = ".cache.key"
+CACHE_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path: str) -> str:
+    """
+    Хэш содержимого файла.
+
+    Args:
+        path (str): путь к файлу.
+
+    Returns:
+        str: шестнадцатеричный хэш SHA-256.
+    """
+    # hashlib импортируется заметно дольше остальных модулей кэша
+    # и нужен только при проверке или сохранении снимка.
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+class SnapshotCache:
+    """
+    Кэш кошельков, загруженных из Json файлов.
+
+    Рядом с Json файлом сохраняется двоичный снимок кошелька и ключ:
+    путь, размер, время изменения и хэш содержимого файла. Снимок
+    отображается в память, поэтому загрузка из кэша не разбирает Json
+    и не читает записи. Если время изменения файла отличается от
+    ключа, а содержимое совпадает, ключ обновляется без пересоздания
+    снимка. Любое другое расхождение делает кэш недействительным.
+    Снимок создаётся при загрузке Json файла, сохранение файла
+    только удаляет кэш.
+    """
+    binary_handler: BinaryHandler
+
+    def __init__(self, binary_handler: Optional[BinaryHandler] = None):
+        """
+        Args:
+            binary_handler (Optional[BinaryHandler]): обработчик
+                                                      двоичных снимков.
+        """
+        self.binary_handler = binary_handler or BinaryHandler("")
+
+    @staticmethod
+    def cache_path(path: str) -> str:
+        return path + CACHE_SUFFIX
+
+    @staticmethod
+    def key_path(path: str) -> str:
+        return path + KEY_SUFFIX
+
+    def load(self, path: str) -> Optional[Wallet]:
+        """
+        Загрузить кошелёк из кэша, если кэш соответствует файлу.
+
+        Args:
+            path (str): путь к Json файлу кошелька.
+
+        Returns:
+            Wallet или None, если кэш отсутствует или устарел.
+        """
+
+        key = self._read_key(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        if key is None or key.get("version") != CACHE_VERSION or \
+                key.get("path") != os.path.abspath(path) or \
+                key.get("size") != stat.st_size:
+            return
+
+        if key.get("mtime_ns") != stat.st_mtime_ns:
+            try:
+                if file_hash(path) != key.get("sha256"):
+                    return
+            except OSError:
+                return
+            key["mtime_ns"] = stat.st_mtime_ns
+            self._write_key(path, key)
+
+        return self.binary_handler.load_wallet(self.cache_path(path))
+
+    def store(self, path: str, wallet: Wallet) -> bool:
+        """
+        Сохранить кэш кошелька, совпадающего с содержимым файла.
+
+        Args:
+            path (str): путь к Json файлу кошелька.
+            wallet (Wallet): кошелёк, загруженный из файла.
+
+        Returns:
+            bool: был ли сохранён кэш.
+        """
+
+        try:
+            stat = os.stat(path)
+            digest = file_hash(path)
+            if os.stat(path).st_mtime_ns != stat.st_mtime_ns:
+                return False
+        except OSError:
+            return False
+
+        # Ключ удаляется до записи снимка, чтобы прерванная запись
+        # не оставила действительный ключ к старому снимку.
+        self.invalidate(path, keep_snapshot=True)
+        if not self.binary_handler.save_wallet(wallet, self.cache_path(path)):
+            return False
+
+        return self._write_key(path, {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        })
+
+    def invalidate(self, path: str, keep_snapshot: bool = False) -> None:
+        """
+        Удалить кэш файла.
+
+        Args:
+            path (str): путь к Json файлу кошелька.
+            keep_snapshot (bool): удалить только ключ.
+        """
+        paths = [self.key_path(path)]
+        if not keep_snapshot:
+            paths.append(self.cache_path(path))
+        for cache_file in paths:
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+
+    def _read_key(self, path: str) -> Optional[Dict]:
+        try:
+            with open(self.key_path(path), "r", encoding="utf-8") as file:
+                key = json.load(file)
+        except (OSError, ValueError):
+            return
+        return key if isinstance(key, dict) else None
+
+    def _write_key(self, path: str, key: Dict) -> bool:
+        key_path = self.key_path(path)
+        temp_path = key_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(key, file)
+            os.replace(temp_path, key_path)
+            return True
+        except OSError:
+            return False
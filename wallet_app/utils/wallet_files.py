@@ -0,0 +1,178 @@
+import os.path
+from typing import List, Optional, Tuple
+
+from utils.binary_handler import BinaryHandler, is_binary_path
+from utils.json_handler import JsonHandler
+from utils.snapshot_cache import SnapshotCache
+from wallet.partitioned_wallet import PartitionedWallet, is_partitioned_path
+from wallet.sqlite_wallet import SqliteWallet, is_sqlite_path
+from wallet.wallet import Wallet
+
+
+def load_wallet_file(
+    path: str,
+    use_cache: bool = True,
+    errors: Optional[List[Tuple[int, str]]] = None,
+) -> Optional[Wallet]:
+    """
+    Загрузить кошелёк из файла в формате, определяемом расширением.
+
+    Args:
+        path (str): путь к файлу Json, .wbin, .sqlite или каталогу
+                    .wparts.
+        use_cache (bool): использовать кэш снимков Json файлов.
+        errors (Optional[List[Tuple[int, str]]]): см. load_json_wallet.
+
+    Returns:
+        Wallet или None в случае ошибки.
+    """
+
+    if is_binary_path(path):
+        return BinaryHandler(path).load_wallet(path)
+
+    if is_sqlite_path(path):
+        return SqliteWallet.open(path)
+
+    if is_partitioned_path(path):
+        return PartitionedWallet.open(path)
+
+    return load_json_wallet(
+        JsonHandler(path),
+        path,
+        SnapshotCache() if use_cache else None,
+        errors,
+    )
+
+
+def load_json_wallet(
+    json_handler: JsonHandler,
+    path: str,
+    cache: Optional[SnapshotCache] = None,
+    errors: Optional[List[Tuple[int, str]]] = None,
+) -> Optional[Wallet]:
+    """
+    Загрузить кошелёк из Json файла, используя кэш снимков.
+
+    Действительный кэш загружается без разбора Json, иначе файл
+    читается потоково, а кэш пересоздаётся. Кэш создаётся только
+    для файлов без некорректных записей.
+
+    Args:
+        json_handler (JsonHandler): обработчик Json файлов.
+        path (str): путь к файлу.
+        cache (Optional[SnapshotCache]): кэш снимков, None - без кэша.
+        errors (Optional[List[Tuple[int, str]]]): список для номеров
+            и ошибок некорректных записей. Если задан, такие записи
+            пропускаются, иначе кошелёк не загружается.
+
+    Returns:
+        Wallet или None в случае ошибки.
+    """
+
+    if cache:
+        wallet = cache.load(path)
+        if wallet is not None:
+            return wallet
+
+    entries = json_handler.stream_entries(path)
+    if entries is None:
+        return
+    wallet, report = Wallet.load_entries(entries, strict=errors is None)
+    if errors is not None:
+        errors.extend(report.errors)
+
+    if cache and wallet is not None and not report.errors:
+        cache.store(path, wallet)
+    return wallet
+
+
+def save_json_wallet(
+    json_handler: JsonHandler,
+    wallet: Wallet,
+    path: str,
+    cache: Optional[SnapshotCache] = None,
+) -> bool:
+    """
+    Сохранить кошелёк в Json файл и сбросить его кэш снимков.
+
+    Снимок не пересоздаётся при каждом сохранении: это потребовало бы
+    заново хэшировать файл и записывать снимок. Кэш создаётся при
+    следующей загрузке файла.
+
+    Args:
+        json_handler (JsonHandler): обработчик Json файлов.
+        wallet (Wallet): кошелёк для сохранения.
+        path (str): путь к файлу.
+        cache (Optional[SnapshotCache]): кэш снимков, None - без кэша.
+
+    Returns:
+        bool: было ли сохранение успешным.
+    """
+
+    if not json_handler.save_entries(wallet.iter_json(), path):
+        return False
+    if cache:
+        cache.invalidate(path)
+    return True
+
+
+def save_wallet_file(
+    wallet: Wallet,
+    path: str,
+    use_cache: bool = True,
+    compact: bool = False,
+) -> bool:
+    """
+    Сохранить кошелёк в файл в формате, определяемом расширением.
+
+    Args:
+        wallet (Wallet): кошелёк для сохранения.
+        path (str): путь к файлу Json, .wbin, .sqlite или каталогу
+                    .wparts.
+        use_cache (bool): сбросить кэш снимков Json файла.
+        compact (bool): записать Json файл без отступов.
+
+    Returns:
+        bool: было ли сохранение успешным.
+    """
+
+    if is_binary_path(path):
+        return BinaryHandler(path).save_wallet(wallet, path)
+
+    if is_sqlite_path(path):
+        import sqlite3
+
+        if isinstance(wallet, SqliteWallet) and \
+                os.path.abspath(wallet.path) == os.path.abspath(path):
+            return True
+        try:
+            saved = SqliteWallet.create(
+                path,
+                (entry for _, entry in wallet[0:]),
+            )
+        except (OSError, sqlite3.Error):
+            return False
+        if saved is None:
+            return False
+        saved.close()
+        return True
+
+    if is_partitioned_path(path):
+        if isinstance(wallet, PartitionedWallet) and \
+                os.path.abspath(wallet.path) == os.path.abspath(path):
+            return wallet.save()
+        try:
+            saved = PartitionedWallet.create(
+                path,
+                (entry for _, entry in wallet[0:]),
+            )
+        except ValueError:
+            return False
+        return saved is not None
+
+    return save_json_wallet(
+        JsonHandler(path, compact),
+        wallet,
+        path,
+        SnapshotCache() if use_cache else None,
+    )
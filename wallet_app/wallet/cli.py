@@ -0,0 +1,695 @@
+import argparse
+import datetime
+from functools import partial
+import heapq
+import json
+import os.path
+import shlex
+import sys
+from typing import Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+from utils import filters
+from utils.binary_handler import is_binary_path
+from utils.journal import WalletJournal
+from utils.json_handler import JsonHandler
+from utils.wallet_files import load_wallet_file, save_wallet_file
+from wallet.entry import CATEGORY, EntryCategory, WalletEntry
+from wallet.partitioned_wallet import PartitionedWallet, is_partitioned_path
+from wallet.query import And, Condition, Query
+from wallet.rollups import RollupPeriod
+from wallet.sqlite_wallet import SqliteWallet, is_sqlite_path
+from wallet.wallet import SearchField, Wallet
+
+CATEGORY_NAMES = {
+    "income": EntryCategory.Income,
+    "spend": EntryCategory.Spend,
+    "доход": EntryCategory.Income,
+    "расход": EntryCategory.Spend,
+}
+
+PERIOD_NAMES = {
+    "day": RollupPeriod.Day,
+    "week": RollupPeriod.Week,
+    "month": RollupPeriod.Month,
+    "year": RollupPeriod.Year,
+}
+
+# Команды, изменяющие кошелёк, после которых его нужно сохранить.
+CHANGING_COMMANDS = ("add", "import")
+
+
+class CliError(Exception):
+    """ Ошибка выполнения команды. """
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ Разбор аргументов, сообщающий об ошибках исключением. """
+
+    def __init__(self, *args, **kwargs):
+        # Форматирование справки по умолчанию определяет ширину
+        # терминала через shutil, который импортирует bz2 и lzma.
+        kwargs.setdefault(
+            "formatter_class",
+            partial(argparse.HelpFormatter, width=_help_width()),
+        )
+        super().__init__(*args, **kwargs)
+
+    def error(self, message: str):
+        raise CliError(message)
+
+
+def _help_width() -> int:
+    """ Ширина справки, как в argparse: по COLUMNS или терминалу. """
+    try:
+        return int(os.environ["COLUMNS"]) - 2
+    except (KeyError, ValueError):
+        pass
+    try:
+        return os.get_terminal_size().columns - 2
+    except OSError:
+        return 78
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """ Построить разбор аргументов командной строки. """
+
+    parser = _ArgumentParser(
+        prog="main.py",
+        description="Неинтерактивная работа с файлами кошельков.",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="выполнить команды из файла, по одной в строке, "
+             "и сохранить изменённые кошельки один раз в конце",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="загружать Json кошельки, пропуская некорректные записи",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="дописывать изменения Json кошельков в журнал рядом "
+             "с файлом вместо перезаписи файла",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="добавить запись")
+    add.add_argument("path", help="файл кошелька")
+    add.add_argument("--date", default="", help="дата (по умолчанию сегодня)")
+    add.add_argument("--category", required=True, help="income или spend")
+    add.add_argument("--amount", required=True, help="сумма")
+    add.add_argument("--description", default="", help="описание")
+
+    import_ = commands.add_parser("import", help="добавить записи из Json")
+    import_.add_argument("path", help="файл кошелька")
+    import_.add_argument("source", help="Json файл вида {\"entries\": [...]}")
+
+    find = commands.add_parser("find", help="найти записи")
+    find.add_argument("path", help="файл кошелька")
+    _add_filter_arguments(find)
+
+    balance = commands.add_parser("balance", help="показать баланс")
+    balance.add_argument("path", help="файл кошелька")
+    balance.add_argument("--from", dest="start", help="начало периода")
+    balance.add_argument("--to", dest="end", help="конец периода")
+    balance.add_argument("--json", action="store_true", help="вывод в Json")
+
+    report = commands.add_parser("report", help="отчёт по периодам")
+    report.add_argument("path", help="файл кошелька")
+    report.add_argument(
+        "--period",
+        choices=list(PERIOD_NAMES),
+        default="month",
+    )
+    report.add_argument("--json", action="store_true", help="вывод в Json")
+
+    export = commands.add_parser("export", help="сохранить в другой файл")
+    export.add_argument("path", help="файл кошелька")
+    export.add_argument(
+        "output",
+        help="файл Json (.json.gz и .json.xz - со сжатием), .wbin, "
+        ".sqlite или каталог .wparts",
+    )
+    export.add_argument(
+        "--compact",
+        action="store_true",
+        help="Json без отступов",
+    )
+
+    consolidate = commands.add_parser(
+        "consolidate",
+        help="итоги и поиск по нескольким кошелькам",
+        description="Без условий поиска показывает доходы и расходы "
+                    "каждого кошелька и общий итог за период --from/--to, "
+                    "с условиями - найденные во всех кошельках записи.",
+    )
+    consolidate.add_argument("paths", nargs="+", help="файлы кошельков")
+    _add_filter_arguments(consolidate)
+    consolidate.add_argument(
+        "--processes",
+        type=int,
+        help="количество процессов загрузки (по умолчанию по числу ядер)",
+    )
+
+    return parser
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """ Добавить аргументы условий поиска записей. """
+    parser.add_argument("--category", help="income или spend")
+    parser.add_argument("--date", help="дата")
+    parser.add_argument("--amount", help="сумма")
+    parser.add_argument("--from", dest="start", help="начало периода")
+    parser.add_argument("--to", dest="end", help="конец периода")
+    parser.add_argument("--min", dest="minimum", help="минимальная сумма")
+    parser.add_argument("--max", dest="maximum", help="максимальная сумма")
+    parser.add_argument("--text", help="слова описания")
+    parser.add_argument("--similar", help="похожее описание")
+    parser.add_argument("--largest-spends", type=int, metavar="N")
+    parser.add_argument("--largest-incomes", type=int, metavar="N")
+    parser.add_argument("--limit", type=int, help="максимум записей")
+    parser.add_argument("--json", action="store_true", help="вывод в Json")
+
+
+class WalletCli:
+    """
+    Класс, выполняющий команды над файлами кошельков без меню.
+
+    Кошельки загружаются один раз на всё время работы, а изменённые
+    кошельки сохраняются после выполнения всех команд.
+    """
+    out: TextIO
+    err: TextIO
+    parser: argparse.ArgumentParser
+    wallets: Dict[str, Wallet]
+    changed: Set[str]
+    skip_invalid: bool
+    use_journal: bool
+    journals: Dict[str, WalletJournal]
+    commands: Dict[str, Callable[[argparse.Namespace], None]]
+
+    def __init__(self, out: TextIO = sys.stdout, err: TextIO = sys.stderr):
+        """
+        Args:
+            out (TextIO): поток вывода результатов.
+            err (TextIO): поток вывода ошибок.
+        """
+        self.out = out
+        self.err = err
+        self.parser = build_parser()
+        self.wallets = {}
+        self.changed = set()
+        self.skip_invalid = False
+        self.use_journal = False
+        self.journals = {}
+        self.commands = {
+            "add": self._add,
+            "import": self._import,
+            "find": self._find,
+            "balance": self._balance,
+            "report": self._report,
+            "export": self._export,
+            "consolidate": self._consolidate,
+        }
+
+    def run(self, argv: List[str]) -> int:
+        """
+        Выполнить команду или пакет команд.
+
+        Args:
+            argv (List[str]): аргументы командной строки.
+
+        Returns:
+            int: код завершения, 0 - без ошибок.
+        """
+
+        try:
+            args = self.parser.parse_args(argv)
+            self.skip_invalid = args.skip_invalid
+            self.use_journal = args.journal
+            if args.batch:
+                if args.command:
+                    raise CliError("--batch не совмещается с командой")
+                failed = self._run_batch(args.batch)
+            elif not args.command:
+                raise CliError("не указана команда")
+            else:
+                self.execute(args)
+                failed = False
+        except (CliError, ValueError) as error:
+            print(f"Ошибка: {error}", file=self.err)
+            failed = True
+
+        return int(not self.save() or failed)
+
+    def execute(self, args: argparse.Namespace) -> None:
+        """
+        Выполнить разобранную команду.
+
+        Args:
+            args (argparse.Namespace): аргументы команды.
+
+        Raises:
+            CliError: при ошибке выполнения команды.
+        """
+
+        self.commands[args.command](args)
+        if args.command in CHANGING_COMMANDS:
+            self.changed.add(os.path.abspath(args.path))
+
+    def save(self) -> bool:
+        """
+        Сохранить изменённые кошельки.
+
+        Returns:
+            bool: были ли все кошельки сохранены.
+        """
+
+        saved = True
+        for path in sorted(self.changed):
+            journal = self.journals.get(path)
+            if journal is None:
+                written = save_wallet_file(self.wallets[path], path)
+            elif not os.path.exists(path):
+                # Журнал опирается на снимок, поэтому новый кошелёк
+                # сначала сохраняется целиком.
+                written = journal.compact()
+            else:
+                written = True
+            if not written:
+                print(f"Ошибка: не удалось сохранить {path}", file=self.err)
+                saved = False
+        self.changed.clear()
+
+        for journal in self.journals.values():
+            journal.detach()
+        self.journals.clear()
+        return saved
+
+    def _run_batch(self, batch_path: str) -> bool:
+        """
+        Выполнить команды из файла.
+
+        Пустые строки и строки, начинающиеся с "#", пропускаются.
+        Ошибочная команда не прерывает выполнение остальных.
+
+        Returns:
+            bool: была ли ошибка хотя бы в одной команде.
+        """
+
+        try:
+            file = open(batch_path, "r", encoding="utf-8")
+        except OSError:
+            raise CliError(f"не удалось прочитать {batch_path}")
+
+        failed = False
+        with file:
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    args = self.parser.parse_args(shlex.split(line))
+                    if args.batch or not args.command:
+                        raise CliError("ожидается команда")
+                    self.execute(args)
+                except (CliError, ValueError) as error:
+                    print(
+                        f"Ошибка в строке {line_number}: {error}",
+                        file=self.err,
+                    )
+                    failed = True
+        return failed
+
+    def _wallet(self, path: str, create: bool = False) -> Wallet:
+        """
+        Получить кошелёк из файла, загрузив его при первом обращении.
+
+        Args:
+            path (str): путь к файлу кошелька.
+            create (bool): создать пустой кошелёк, если файла нет.
+        """
+
+        key = os.path.abspath(path)
+        wallet = self.wallets.get(key)
+        if wallet is not None:
+            return wallet
+
+        if not os.path.exists(key):
+            if not create:
+                raise CliError(f"файл {path} не найден")
+            if is_sqlite_path(key):
+                wallet = SqliteWallet(key)
+            elif is_partitioned_path(key):
+                wallet = PartitionedWallet(key)
+            else:
+                wallet = Wallet()
+        else:
+            errors = [] if self.skip_invalid else None
+            wallet = load_wallet_file(key, errors=errors)
+            if wallet is None:
+                raise CliError(f"не удалось загрузить кошелёк {path}")
+            for row_number, message in errors or []:
+                print(
+                    f"{path}: пропущена запись {row_number}: {message}",
+                    file=self.err,
+                )
+
+        if self.use_journal and not is_binary_path(key) and \
+                not is_sqlite_path(key) and not is_partitioned_path(key):
+            journal = WalletJournal(JsonHandler(key), key)
+            if not journal.replay(wallet):
+                raise CliError(f"журнал изменений {path} повреждён")
+            journal.attach(wallet)
+            self.journals[key] = journal
+
+        self.wallets[key] = wallet
+        return wallet
+
+    def _add(self, args: argparse.Namespace) -> None:
+        entry = WalletEntry(
+            date=_parse_date(args.date) if args.date
+            else datetime.date.today(),
+            category=_parse_category(args.category),
+            amount=_parse_amount(args.amount),
+            description=args.description,
+        )
+        self._wallet(args.path, create=True).add_entry(entry)
+
+    def _import(self, args: argparse.Namespace) -> None:
+        entries = JsonHandler(args.source).stream_entries(args.source)
+        if entries is None:
+            raise CliError(f"файл {args.source} не найден")
+
+        wallet = self._wallet(args.path, create=True)
+        try:
+            report = wallet.add_entries(entries)
+        except ValueError:
+            raise CliError(f"некорректный Json в {args.source}")
+
+        for row_number, message in report.errors:
+            print(f"Запись {row_number}: {message}", file=self.err)
+        print(f"Добавлено записей: {report.added}", file=self.out)
+
+    def _find(self, args: argparse.Namespace) -> None:
+        wallet = self._wallet(args.path)
+        query = _build_query(args)
+
+        if args.largest_spends or args.largest_incomes:
+            search_field = SearchField.LargestSpends if args.largest_spends \
+                else SearchField.LargestIncomes
+            count = args.largest_spends or args.largest_incomes
+            if query:
+                # Наибольшие суммы отбираются среди записей, подходящих
+                # под условия, а не среди наибольших сумм кошелька.
+                entries = heapq.nlargest(
+                    count,
+                    wallet.query(And(_largest_condition(args), query)),
+                    key=lambda item: (item[1].cents, item[0]),
+                )
+            else:
+                entries = wallet.find_entries(search_field, count)
+        elif query:
+            entries = wallet.query(query)
+        else:
+            entries = wallet[0:args.limit]
+
+        if args.limit is not None:
+            entries = entries[:args.limit]
+
+        if args.json:
+            print(
+                json.dumps(
+                    [
+                        dict(index=entry_index, **entry.to_json())
+                        for entry_index, entry in entries
+                    ],
+                    ensure_ascii=False,
+                ),
+                file=self.out,
+            )
+            return
+
+        for entry_index, entry in entries:
+            print(
+                "{idx}\t{date}\t{cat}\t{amount:.2f}\t{desc}".format(
+                    idx=entry_index,
+                    date=entry.date.isoformat(),
+                    cat=CATEGORY[entry.category],
+                    amount=entry.amount,
+                    desc=entry.description,
+                ),
+                file=self.out,
+            )
+
+    def _balance(self, args: argparse.Namespace) -> None:
+        wallet = self._wallet(args.path)
+
+        if args.start or args.end:
+            start, end = _parse_date(args.start), _parse_date(args.end)
+            income = wallet.income_between(start, end)
+            spending = wallet.spending_between(start, end)
+        else:
+            income = wallet.total_income
+            spending = wallet.total_spending
+
+        if args.json:
+            print(
+                json.dumps({
+                    "income": income,
+                    "spending": spending,
+                    "balance": round(income - spending, 2),
+                }),
+                file=self.out,
+            )
+            return
+
+        print(
+            "Общий доход: {inc}\nОбщий расход: {spend}\nБаланс: {bal}".format(
+                inc=income,
+                spend=spending,
+                bal=round(income - spending, 2),
+            ),
+            file=self.out,
+        )
+
+    def _report(self, args: argparse.Namespace) -> None:
+        rows = self._wallet(args.path).rollup(PERIOD_NAMES[args.period])
+
+        if args.json:
+            print(
+                json.dumps([
+                    {"period": label, "income": income, "spending": spend}
+                    for label, income, spend in rows
+                ]),
+                file=self.out,
+            )
+            return
+
+        for label, income, spend in rows:
+            print(
+                f"{label}\t{income:.2f}\t{spend:.2f}\t{income - spend:.2f}",
+                file=self.out,
+            )
+
+    def _consolidate(self, args: argparse.Namespace) -> None:
+        paths = [os.path.abspath(path) for path in args.paths]
+        # Несохранённые изменения пакета должны попасть в файлы, которые
+        # читают процессы рабочей области.
+        if self.changed.intersection(paths) and not self.save():
+            raise CliError("не удалось сохранить изменённые кошельки")
+
+        query = _build_query(args)
+        largest = args.largest_spends or args.largest_incomes
+        period_only = not largest and all(
+            getattr(args, name) is None
+            for name in (
+                "category", "date", "amount", "minimum", "maximum",
+                "text", "similar",
+            )
+        )
+
+        # Процессы рабочей области нужны только этой команде, поэтому
+        # multiprocessing не импортируется при запуске остальных.
+        from wallet.workspace import WalletWorkspace
+
+        with WalletWorkspace(paths, args.processes) as workspace:
+            if workspace.errors:
+                raise CliError(
+                    "не удалось загрузить кошелёк {path}".format(
+                        path=workspace.errors[0],
+                    )
+                )
+
+            if period_only:
+                self._print_balances(
+                    workspace.balances(
+                        _parse_date(args.start),
+                        _parse_date(args.end),
+                    ),
+                    args.json,
+                )
+                return
+
+            if largest and query:
+                entries = heapq.nlargest(
+                    largest,
+                    workspace.query(And(_largest_condition(args), query)),
+                    key=lambda item: item[2].cents,
+                )
+            elif largest:
+                entries = workspace.find_entries(
+                    SearchField.LargestSpends if args.largest_spends
+                    else SearchField.LargestIncomes,
+                    largest,
+                )
+            else:
+                entries = workspace.query(query)
+
+        if args.limit is not None:
+            entries = entries[:args.limit]
+
+        if args.json:
+            print(
+                json.dumps(
+                    [
+                        dict(path=path, index=entry_index, **entry.to_json())
+                        for path, entry_index, entry in entries
+                    ],
+                    ensure_ascii=False,
+                ),
+                file=self.out,
+            )
+            return
+
+        for path, entry_index, entry in entries:
+            print(
+                "{path}\t{idx}\t{date}\t{cat}\t{amount:.2f}\t{desc}".format(
+                    path=path,
+                    idx=entry_index,
+                    date=entry.date.isoformat(),
+                    cat=CATEGORY[entry.category],
+                    amount=entry.amount,
+                    desc=entry.description,
+                ),
+                file=self.out,
+            )
+
+    def _print_balances(
+        self,
+        balances: Dict[str, Tuple[float, float]],
+        as_json: bool,
+    ) -> None:
+        """ Вывести доходы и расходы кошельков и общий итог. """
+        income = round(sum(inc for inc, _ in balances.values()), 2)
+        spending = round(sum(spend for _, spend in balances.values()), 2)
+
+        if as_json:
+            print(
+                json.dumps({
+                    "wallets": {
+                        path: {
+                            "income": inc,
+                            "spending": spend,
+                            "balance": round(inc - spend, 2),
+                        }
+                        for path, (inc, spend) in balances.items()
+                    },
+                    "income": income,
+                    "spending": spending,
+                    "balance": round(income - spending, 2),
+                }, ensure_ascii=False),
+                file=self.out,
+            )
+            return
+
+        rows = list(balances.items()) + [("Итого", (income, spending))]
+        for label, (inc, spend) in rows:
+            print(
+                f"{label}\t{inc:.2f}\t{spend:.2f}\t{inc - spend:.2f}",
+                file=self.out,
+            )
+
+    def _export(self, args: argparse.Namespace) -> None:
+        wallet = self._wallet(args.path)
+        if not save_wallet_file(
+            wallet,
+            os.path.abspath(args.output),
+            compact=args.compact,
+        ):
+            raise CliError(f"не удалось сохранить {args.output}")
+
+
+def _build_query(args: argparse.Namespace) -> Optional[Query]:
+    """ Составной запрос из аргументов условий поиска. """
+    conditions = []
+    if args.category is not None:
+        conditions.append(
+            Condition(SearchField.Category, _parse_category(args.category))
+        )
+    if args.date is not None:
+        conditions.append(
+            Condition(SearchField.Date, _parse_date(args.date))
+        )
+    if args.amount is not None:
+        conditions.append(
+            Condition(SearchField.Amount, _parse_amount(args.amount))
+        )
+    if args.start is not None or args.end is not None:
+        conditions.append(
+            Condition(
+                SearchField.DateRange,
+                (_parse_date(args.start), _parse_date(args.end)),
+            )
+        )
+    if args.minimum is not None or args.maximum is not None:
+        conditions.append(
+            Condition(
+                SearchField.AmountRange,
+                (_parse_amount(args.minimum), _parse_amount(args.maximum)),
+            )
+        )
+    if args.text is not None:
+        conditions.append(Condition(SearchField.Text, args.text))
+    if args.similar is not None:
+        conditions.append(Condition(SearchField.Fuzzy, args.similar))
+
+    return And(*conditions) if len(conditions) > 1 else \
+        conditions[0] if conditions else None
+
+
+def _largest_condition(args: argparse.Namespace) -> Condition:
+    """ Условие категории для поиска наибольших доходов или расходов. """
+    return Condition(
+        SearchField.Category,
+        EntryCategory.Spend if args.largest_spends else EntryCategory.Income,
+    )
+
+
+def _parse_category(value: str) -> EntryCategory:
+    category = CATEGORY_NAMES.get(value.casefold()) or \
+        filters.parse_category(value)
+    if category is None:
+        raise CliError(f"некорректная категория {value!r}")
+    return category
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime.date]:
+    if not value:
+        return
+    date = filters.parse_date(value)
+    if date is None:
+        raise CliError(f"некорректная дата {value!r}")
+    return date
+
+
+def _parse_amount(value: Optional[str]) -> Optional[float]:
+    if value is None or value == "":
+        return
+    amount = filters.parse_amount(value)
+    if amount is None or amount < 0:
+        raise CliError(f"некорректная сумма {value!r}")
+    return amount
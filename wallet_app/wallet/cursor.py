@@ -0,0 +1,144 @@
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING
+
+from wallet.entry import WalletEntry
+from wallet.wallet import PageOrder
+
+if TYPE_CHECKING:
+    from wallet.wallet import Wallet
+
+
+def page_key(order: PageOrder, entry: Tuple[int, WalletEntry]) -> Any:
+    """
+    Ключ записи в порядке просмотра.
+
+    Args:
+        order (PageOrder): порядок просмотра.
+        entry (Tuple[int, WalletEntry]): номер записи и запись.
+
+    Returns:
+        int для порядка по номерам, Tuple[int, int] для порядка по датам.
+    """
+    if order == PageOrder.Id:
+        return entry[0]
+    return entry[1].date.toordinal(), entry[0]
+
+
+class WalletCursor:
+    """
+    Курсор постраничного просмотра записей кошелька.
+
+    Курсор хранит ключи первой и последней записи текущей страницы
+    и запрашивает у кошелька соседние страницы по этим ключам,
+    поэтому записи кошелька не копируются в список целиком.
+    """
+    wallet: "Wallet"
+    order: PageOrder
+    per_page: int
+    _first: Any
+    _last: Any
+
+    def __init__(
+        self,
+        wallet: "Wallet",
+        order: PageOrder = PageOrder.Id,
+        per_page: int = 5,
+    ):
+        """
+        Args:
+            wallet (Wallet): просматриваемый кошелёк.
+            order (PageOrder): порядок просмотра.
+            per_page (int): количество записей на странице.
+        """
+        self.wallet = wallet
+        self.order = order
+        self.per_page = per_page
+        self._first = None
+        self._last = None
+
+    def next_page(self) -> List[Tuple[int, WalletEntry]]:
+        """ Перейти к следующей странице, пустой список в конце. """
+        return self._move(
+            self.wallet.page(self.order, after=self._last,
+                             limit=self.per_page)
+        )
+
+    def previous_page(self) -> List[Tuple[int, WalletEntry]]:
+        """ Перейти к предыдущей странице, пустой список в начале. """
+        if self._first is None:
+            return []
+        return self._move(
+            self.wallet.page(self.order, before=self._first,
+                             limit=self.per_page)
+        )
+
+    @property
+    def remaining(self) -> int:
+        """ Количество записей после текущей страницы. """
+        if self._last is None:
+            return len(self.wallet)
+        return self.wallet.count_after(self.order, self._last)
+
+    @property
+    def has_previous(self) -> bool:
+        """ Есть ли записи перед текущей страницей. """
+        return self._first is not None and bool(
+            self.wallet.page(self.order, before=self._first, limit=1)
+        )
+
+    def _move(
+        self,
+        page: List[Tuple[int, WalletEntry]],
+    ) -> List[Tuple[int, WalletEntry]]:
+        if page:
+            self._first = page_key(self.order, page[0])
+            self._last = page_key(self.order, page[-1])
+        return page
+
+
+class ListCursor:
+    """ Курсор постраничного просмотра готового списка записей. """
+    entries: List[Tuple[int, WalletEntry]]
+    per_page: int
+    _start: Optional[int]
+    _stop: int
+
+    def __init__(
+        self,
+        entries: List[Tuple[int, WalletEntry]],
+        per_page: int = 5,
+    ):
+        """
+        Args:
+            entries (List[Tuple[int, WalletEntry]]): список записей.
+            per_page (int): количество записей на странице.
+        """
+        self.entries = entries
+        self.per_page = per_page
+        self._start = None
+        self._stop = 0
+
+    def next_page(self) -> List[Tuple[int, WalletEntry]]:
+        """ Перейти к следующей странице, пустой список в конце. """
+        page = self.entries[self._stop:self._stop + self.per_page]
+        if page:
+            self._start = self._stop
+            self._stop += len(page)
+        return page
+
+    def previous_page(self) -> List[Tuple[int, WalletEntry]]:
+        """ Перейти к предыдущей странице, пустой список в начале. """
+        if not self._start:
+            return []
+        self._stop = self._start
+        self._start = max(0, self._start - self.per_page)
+        return self.entries[self._start:self._stop]
+
+    @property
+    def remaining(self) -> int:
+        """ Количество записей после текущей страницы. """
+        return len(self.entries) - self._stop
+
+    @property
+    def has_previous(self) -> bool:
+        """ Есть ли записи перед текущей страницей. """
+        return bool(self._start)
@@ -1,6 +1,7 @@
-from dataclasses import dataclass
 import datetime
+import math
 from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Tuple
 
 
 class EntryCategory(IntEnum):
@@ -14,35 +15,267 @@ CATEGORY = {
     EntryCategory.Spend: "Расход",
 }
 
+# Наибольшее количество разобранных дат в кэше EntryDecoder.
+DATE_CACHE_SIZE = 1 << 16
+
+# Наибольшая сумма записи в копейках. Суммы хранятся в 64-битных
+# массивах, и граница оставляет запас для итогов по многим записям.
+MAX_CENTS = 10 ** 15
+
+
+def to_cents(amount: float) -> int:
+    """ Перевести денежную сумму в целое число копеек. """
+    return int(round(amount * 100))
+
+
+def amount_cents(amount: Any) -> int:
+    """
+    Проверить сумму записи и перевести её в копейки.
+
+    Raises:
+        ValueError: при некорректной сумме.
+    """
+    if not (isinstance(amount, float) or isinstance(amount, int)):
+        raise ValueError("Некорректный тип поля amount")
+
+    if not math.isfinite(amount):
+        raise ValueError("Сумма должна быть конечным числом")
+
+    if amount < 0:
+        raise ValueError("Сумма не может быть отрицательной")
+
+    cents = to_cents(amount)
+    if cents > MAX_CENTS:
+        raise ValueError("Сумма превышает допустимую")
+    return cents
+
+
+def from_cents(cents: int) -> float:
+    """ Перевести целое число копеек в денежную сумму. """
+    return cents / 100
+
+
+def entry_fields(row: Any) -> Tuple[int, int, int, str]:
+    """
+    Проверить данные записи и привести их к полям колоночного хранилища.
+
+    Args:
+        row: WalletEntry или словарь с ключами date, category,
+             amount и description (даты допускаются строкой ISO).
+
+    Returns:
+        Tuple[int, int, int, str]: порядковый номер даты, категория,
+                                   сумма в копейках и описание.
+
+    Raises:
+        ValueError: при некорректных данных записи.
+    """
+    if isinstance(row, WalletEntry):
+        return (
+            row.date.toordinal(),
+            row.category,
+            row.cents,
+            row.description,
+        )
+
+    try:
+        date = row["date"]
+        category = row["category"]
+        amount = row["amount"]
+        description = row["description"]
+    except (KeyError, TypeError):
+        raise ValueError("Отсутствуют поля записи")
+
+    if isinstance(date, str):
+        date = datetime.date.fromisoformat(date)
+    elif not isinstance(date, datetime.date):
+        raise ValueError("Некорректный тип поля date")
+
+    if isinstance(category, bool) or category not in CATEGORY:
+        raise ValueError("Некорректная категория")
+
+    cents = amount_cents(amount)
+
+    if not isinstance(description, str):
+        raise ValueError("Некорректный тип поля description")
+
+    return date.toordinal(), int(category), cents, description
+
+
+class EntryDecoder:
+    """
+    Пакетная проверка записей с кэшем разобранных дат.
+
+    В кошельках одни и те же даты повторяются во многих записях,
+    поэтому строка даты разбирается один раз. Словари с полями
+    ожидаемых типов проверяются без вызова entry_fields, остальные
+    записи, в том числе некорректные, проверяются entry_fields, и
+    ошибки совпадают с её ошибками.
+    """
+    _dates: Dict[str, int]
+
+    def __init__(self):
+        self._dates = {}
+
+    def decode(
+        self,
+        entries: Iterable[Any],
+        first_number: int,
+        errors: List[Tuple[int, str]],
+    ) -> List[Tuple[int, int, int, str]]:
+        """
+        Проверить блок записей.
+
+        Args:
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+            first_number (int): номер первой записи блока.
+            errors (List[Tuple[int, str]]): список, в который добавляются
+                                            номера и ошибки некорректных
+                                            записей.
+
+        Returns:
+            List[Tuple[int, int, int, str]]: поля корректных записей,
+            см. entry_fields.
+        """
+        dates = self._dates
+        inf = math.inf
+        rows = []
+        append = rows.append
+        for number, entry in enumerate(entries, first_number):
+            if type(entry) is dict:
+                try:
+                    date = entry["date"]
+                    category = entry["category"]
+                    amount = entry["amount"]
+                    description = entry["description"]
+                except KeyError:
+                    date = None
+                ordinal = dates.get(date) if type(date) is str else None
+                if ordinal is not None and \
+                        type(category) is int and category in CATEGORY and \
+                        (type(amount) is float or type(amount) is int) and \
+                        0 <= amount < inf and type(description) is str:
+                    cents = to_cents(amount)
+                    if cents <= MAX_CENTS:
+                        append((ordinal, category, cents, description))
+                        continue
+
+            try:
+                fields = entry_fields(entry)
+            except (TypeError, ValueError) as error:
+                errors.append((number, str(error)))
+                continue
+
+            if type(entry) is dict and type(entry["date"]) is str and \
+                    len(dates) < DATE_CACHE_SIZE:
+                dates[entry["date"]] = fields[0]
+            append(fields)
+        return rows
+
 
-@dataclass(frozen=True)
 class WalletEntry:
-    """ Класс, представляющий запись в кошельке. """
+    """
+    Класс, представляющий запись в кошельке.
+
+    Сумма хранится целым числом копеек, поэтому итоги считаются
+    без накопления ошибки округления. Запись неизменяема и не имеет
+    словаря атрибутов.
+    """
+    __slots__ = ("date", "category", "cents", "description")
+
     date: datetime.date
     category: EntryCategory
-    amount: float
+    cents: int
     description: str
 
-    def __post_init__(self):
-        if not (isinstance(self.amount, float) or isinstance(self.amount, int)):
-            raise ValueError("Некорректный тип поля amount")
+    def __init__(
+        self,
+        date: datetime.date,
+        category: EntryCategory,
+        amount: float,
+        description: str,
+    ):
+        cents = amount_cents(amount)
+
+        object.__setattr__(self, "date", date)
+        object.__setattr__(self, "category", category)
+        object.__setattr__(self, "cents", cents)
+        object.__setattr__(self, "description", description)
+
+    @staticmethod
+    def from_row(row: Tuple[int, int, int, str]) -> "WalletEntry":
+        """
+        Создать запись из полей колоночного хранилища без проверки.
 
-        if self.amount < 0:
-            raise ValueError("Сумма не может быть отрицательной")
+        Args:
+            row (Tuple[int, int, int, str]): порядковый номер даты,
+                категория, сумма в копейках и описание.
+
+        Returns:
+            WalletEntry
+        """
+        date, category, cents, description = row
+        entry = object.__new__(WalletEntry)
+        object.__setattr__(entry, "date", datetime.date.fromordinal(date))
+        object.__setattr__(entry, "category", EntryCategory(category))
+        object.__setattr__(entry, "cents", cents)
+        object.__setattr__(entry, "description", description)
+        return entry
+
+    @property
+    def amount(self) -> float:
+        """ Сумма записи. """
+        return from_cents(self.cents)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Запись кошелька нельзя изменить")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Запись кошелька нельзя изменить")
+
+    def __eq__(self, other: Any):
+        if not isinstance(other, WalletEntry):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return "WalletEntry(date={date!r}, category={cat!r}, " \
+               "amount={amt!r}, description={desc!r})".format(
+                    date=self.date,
+                    cat=self.category,
+                    amt=self.amount,
+                    desc=self.description,
+                )
 
     def __str__(self):
         return "Дата: {date}\nКатегория: {cat}\nСумма: {amt}\n" \
                "Описание: {desc}".format(
                     date=self.date,
                     cat=CATEGORY[self.category],
-                    amt=round(self.amount, 2),
+                    amt=self.amount,
                     desc=self.description,
                 )
 
+    def _key(self) -> Tuple[datetime.date, int, int, str]:
+        return self.date, self.category, self.cents, self.description
+
+    @staticmethod
+    def from_json(entry_data: Dict) -> "WalletEntry":
+        return WalletEntry(
+            date=datetime.date.fromisoformat(entry_data["date"]),
+            category=EntryCategory(entry_data["category"]),
+            amount=entry_data["amount"],
+            description=entry_data["description"],
+        )
+
     def to_json(self):
         return {
             "date": self.date.isoformat(),
             "category": self.category.value,
-            "amount": round(self.amount, 2),
+            "amount": self.amount,
             "description": self.description,
         }
@@ -0,0 +1,372 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# Наибольшее число дней, покрываемых деревьями Фенвика (около 179 лет).
+# Суммы дней вне этого окна хранятся отдельно, чтобы одна ошибочная
+# дата вроде 0001-01-01 не выделяла массивы на миллионы дней.
+MAX_DENSE_DAYS = 1 << 16
+
+
+class SortedIndex:
+    """
+    Упорядоченный индекс записей кошелька по целочисленному ключу.
+
+    Хранит пары (ключ, номер записи) в двух параллельных массивах,
+    отсортированных по ключу, а при равных ключах - по номеру записи.
+    Поиск выполняется бинарным поиском за O(log n + k).
+    """
+    keys: array
+    ids: array
+
+    def __init__(self):
+        self.keys = array("q")
+        self.ids = array("l")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, key: int, entry_index: int) -> int:
+        """
+        Позиция пары (ключ, номер записи) в индексе: количество пар,
+        меньших данной.
+        """
+        lo = bisect_left(self.keys, key)
+        hi = bisect_right(self.keys, key, lo)
+        return bisect_left(self.ids, entry_index, lo, hi)
+
+    def insert(self, key: int, entry_index: int) -> None:
+        """
+        Добавить запись в индекс.
+
+        Args:
+            key (int): значение ключа записи.
+            entry_index (int): номер записи.
+        """
+
+        if not self.keys or self.keys[-1] < key or (
+            self.keys[-1] == key and self.ids[-1] < entry_index
+        ):
+            self.keys.append(key)
+            self.ids.append(entry_index)
+            return
+
+        position = self.position(key, entry_index)
+        self.keys.insert(position, key)
+        self.ids.insert(position, entry_index)
+
+    def extend(self, keys: Sequence[int], ids: Sequence[int]) -> None:
+        """
+        Добавить в индекс блок записей.
+
+        Номера добавляемых записей должны возрастать и быть больше номеров
+        уже учтённых записей. Если все новые ключи не меньше имеющихся,
+        пары дописываются в конец, иначе индекс перестраивается
+        устойчивой сортировкой, которая сливает два упорядоченных
+        участка за O(n + k).
+
+        Args:
+            keys (Sequence[int]): ключи записей.
+            ids (Sequence[int]): номера записей.
+        """
+
+        if not keys:
+            return
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        new_keys = array("q", map(keys.__getitem__, order))
+        new_ids = array("l", map(ids.__getitem__, order))
+
+        if not self.keys or self.keys[-1] <= new_keys[0]:
+            self.keys.extend(new_keys)
+            self.ids.extend(new_ids)
+            return
+
+        keys = self.keys + new_keys
+        ids = self.ids + new_ids
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = array("q", map(keys.__getitem__, order))
+        self.ids = array("l", map(ids.__getitem__, order))
+
+    def remove(self, key: int, entry_index: int) -> None:
+        """
+        Удалить запись из индекса.
+
+        Args:
+            key (int): значение ключа записи.
+            entry_index (int): номер записи.
+        """
+
+        position = self.position(key, entry_index)
+        if position < len(self.ids) and self.ids[position] == entry_index \
+                and self.keys[position] == key:
+            del self.keys[position]
+            del self.ids[position]
+
+    def bounds(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Границы позиций индекса с ключом в диапазоне [lower, upper].
+
+        Args:
+            lower (Optional[int]): нижняя граница, None - без ограничения.
+            upper (Optional[int]): верхняя граница, None - без ограничения.
+
+        Returns:
+            Tuple[int, int]: начальная и конечная (не включительно) позиции.
+        """
+
+        lo = 0 if lower is None else bisect_left(self.keys, lower)
+        hi = len(self.keys) if upper is None else \
+            bisect_right(self.keys, upper, lo)
+        return lo, max(lo, hi)
+
+    def range(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+    ) -> array:
+        """
+        Номера записей с ключом в диапазоне [lower, upper].
+
+        Args:
+            lower (Optional[int]): нижняя граница, None - без ограничения.
+            upper (Optional[int]): верхняя граница, None - без ограничения.
+
+        Returns:
+            array: номера записей, упорядоченные по ключу.
+        """
+
+        lo, hi = self.bounds(lower, upper)
+        return self.ids[lo:hi]
+
+
+class DatePrefixSums:
+    """
+    Префиксные суммы по датам на основе дерева Фенвика.
+
+    Для каждой категории хранится дерево Фенвика над днями, начиная
+    с базовой даты. Добавление суммы и получение суммы за период
+    выполняются за O(log d), где d - число дней в покрываемом диапазоне.
+    Диапазон расширяется с удвоением при появлении даты вне его, но не
+    выходит за окно из MAX_DENSE_DAYS дней вокруг первых дат. Суммы
+    дней вне окна хранятся в словарях и суммируются перебором.
+    """
+    _base: int
+    _size: int
+    _window: Optional[Tuple[int, int]]
+    _days: Dict[int, array]
+    _trees: Dict[int, array]
+    _outliers: Dict[int, Dict[int, int]]
+
+    def __init__(self, categories: Iterable[int]):
+        """
+        Args:
+            categories (Iterable[int]): категории, для которых ведутся суммы.
+        """
+        self._base = 0
+        self._size = 0
+        self._window = None
+        self._days = {category: array("q") for category in categories}
+        self._trees = {category: array("q") for category in self._days}
+        self._outliers = {category: {} for category in self._days}
+
+    def add(self, ordinal: int, category: int, amount: int) -> None:
+        """
+        Добавить сумму к дню.
+
+        Args:
+            ordinal (int): порядковый номер дня.
+            category (int): категория суммы.
+            amount (int): добавляемая сумма, отрицательная для вычитания.
+        """
+
+        if self._window is None:
+            self._set_window(ordinal)
+        if not self._in_window(ordinal):
+            self._add_outlier(ordinal, category, amount)
+            return
+
+        if not self._size:
+            self._resize(ordinal, ordinal + 1)
+        elif not self._base <= ordinal < self._base + self._size:
+            self._resize(
+                min(self._base, ordinal),
+                max(self._base + self._size, ordinal + 1),
+            )
+
+        position = ordinal - self._base
+        self._days[category][position] += amount
+
+        tree = self._trees[category]
+        position += 1
+        while position <= self._size:
+            tree[position - 1] += amount
+            position += position & -position
+
+    def extend(
+        self,
+        ordinals: Sequence[int],
+        categories: Sequence[int],
+        amounts: Sequence[int],
+    ) -> None:
+        """
+        Добавить блок сумм.
+
+        Небольшой блок добавляется поэлементно, крупный - суммированием
+        по дням с последующим перестроением деревьев за O(d + k).
+
+        Args:
+            ordinals (Sequence[int]): порядковые номера дней.
+            categories (Sequence[int]): категории сумм.
+            amounts (Sequence[int]): суммы.
+        """
+
+        if not ordinals:
+            return
+
+        if self._window is None:
+            self._set_window(sorted(ordinals)[len(ordinals) // 2])
+        if not (
+            self._in_window(min(ordinals)) and self._in_window(max(ordinals))
+        ):
+            rows = []
+            for row in zip(ordinals, categories, amounts):
+                if self._in_window(row[0]):
+                    rows.append(row)
+                else:
+                    self._add_outlier(*row)
+            if not rows:
+                return
+            ordinals, categories, amounts = zip(*rows)
+
+        first, last = min(ordinals), max(ordinals) + 1
+        if not self._size:
+            self._resize(first, last)
+        elif first < self._base or last > self._base + self._size:
+            self._resize(
+                min(self._base, first),
+                max(self._base + self._size, last),
+            )
+
+        if len(ordinals) * self._size.bit_length() < self._size:
+            for ordinal, category, amount in zip(
+                ordinals,
+                categories,
+                amounts,
+            ):
+                self.add(ordinal, category, amount)
+            return
+
+        base = self._base
+        for ordinal, category, amount in zip(ordinals, categories, amounts):
+            self._days[category][ordinal - base] += amount
+
+        for category, days in self._days.items():
+            self._trees[category] = self._build_tree(days)
+
+    def total(
+        self,
+        category: int,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> int:
+        """
+        Сумма категории за период.
+
+        Args:
+            category (int): категория суммы.
+            start (Optional[int]): первый день периода, None - с начала.
+            end (Optional[int]): последний день периода, None - до конца.
+
+        Returns:
+            int
+        """
+
+        total = self._prefix(category, end)
+        if start is not None:
+            total -= self._prefix(category, start - 1)
+        return total
+
+    def _prefix(self, category: int, end: Optional[int]) -> int:
+        """ Сумма категории по день end включительно. """
+        position = self._size if end is None else \
+            min(max(end - self._base + 1, 0), self._size)
+
+        tree = self._trees[category]
+        total = 0
+        while position > 0:
+            total += tree[position - 1]
+            position -= position & -position
+
+        for ordinal, amount in self._outliers[category].items():
+            if end is None or ordinal <= end:
+                total += amount
+        return total
+
+    def _set_window(self, ordinal: int) -> None:
+        """ Выбрать окно дней деревьев вокруг дня ordinal. """
+        start = ordinal - MAX_DENSE_DAYS // 2
+        self._window = (start, start + MAX_DENSE_DAYS)
+
+    def _in_window(self, ordinal: int) -> bool:
+        return self._window[0] <= ordinal < self._window[1]
+
+    def _add_outlier(self, ordinal: int, category: int, amount: int) -> None:
+        """ Добавить сумму к дню вне окна деревьев. """
+        outliers = self._outliers[category]
+        total = outliers.get(ordinal, 0) + amount
+        if total:
+            outliers[ordinal] = total
+        else:
+            outliers.pop(ordinal, None)
+
+    def _resize(self, first: int, last: int) -> None:
+        """
+        Расширить диапазон дней как минимум до [first, last)
+        и перестроить деревья.
+        """
+
+        # Размер диапазона как минимум удваивается, поэтому при
+        # последовательном добавлении новых дат перестроений O(log d).
+        # Запас добавляется с той стороны, в которую диапазон растёт.
+        span = last - first
+        new_size = max(span, 2 * self._size, 32)
+        padding = new_size - span
+        if not self._size or (
+            first < self._base and last > self._base + self._size
+        ):
+            new_base = first - padding // 2
+        elif first < self._base:
+            new_base = first - padding
+        else:
+            new_base = first
+
+        # Диапазон не выходит за окно, но всегда покрывает [first, last).
+        lower, upper = self._window
+        new_base = min(max(new_base, lower), first)
+        new_size = max(min(new_base + new_size, upper), last) - new_base
+        offset = self._base - new_base
+
+        for category, days in self._days.items():
+            new_days = array("q", bytes(8 * new_size))
+            new_days[offset:offset + len(days)] = days
+            self._days[category] = new_days
+            self._trees[category] = self._build_tree(new_days)
+
+        self._base = new_base
+        self._size = new_size
+
+    @staticmethod
+    def _build_tree(days: array) -> array:
+        """ Построить дерево Фенвика по суммам дней за O(d). """
+        size = len(days)
+        tree = array("q", days)
+        for position in range(1, size + 1):
+            parent = position + (position & -position)
+            if parent <= size:
+                tree[parent - 1] += tree[position - 1]
+        return tree
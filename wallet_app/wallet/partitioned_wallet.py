@@ -0,0 +1,497 @@
+import datetime
+from dataclasses import dataclass
+import json
+import os
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple,
+    TYPE_CHECKING,
+)
+
+from utils.json_handler import JsonHandler
+from wallet.entry import (
+    EntryCategory, EntryDecoder, WalletEntry, from_cents,
+)
+from wallet.rollups import RollupPeriod, bucket_key, bucket_label
+from wallet.storage import ColumnarStorage
+from wallet.wallet import (
+    BulkInsertReport, PageOrder, SearchField, Wallet,
+)
+
+if TYPE_CHECKING:
+    from wallet.query import Query
+
+PARTITIONED_EXTENSION = ".wparts"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+DATE_SEARCHES = (SearchField.Date, SearchField.DateRange)
+
+
+def is_partitioned_path(file_path: Optional[str]) -> bool:
+    """ Является ли путь путём к каталогу кошелька, разбитого по месяцам. """
+    return bool(file_path) and \
+        file_path.rstrip("/\\").lower().endswith(PARTITIONED_EXTENSION)
+
+
+def month_bounds(key: int) -> Tuple[int, int]:
+    """
+    Первый и последний день месяца.
+
+    Args:
+        key (int): номер месяца от начала эры, см. bucket_key.
+
+    Returns:
+        Tuple[int, int]: порядковые номера дней.
+    """
+    first = datetime.date(key // 12, key % 12 + 1, 1).toordinal()
+    if key % 12 == 11:
+        following = datetime.date(key // 12 + 1, 1, 1)
+    else:
+        following = datetime.date(key // 12, key % 12 + 2, 1)
+    return first, following.toordinal() - 1
+
+
+class PartitionError(ValueError):
+    """ Ошибка чтения раздела кошелька, разбитого по месяцам. """
+
+
+@dataclass
+class PartitionInfo:
+    """ Итоги раздела кошелька из манифеста, суммы в копейках. """
+    count: int
+    income: int
+    spending: int
+
+
+class PartitionedWallet(Wallet):
+    """
+    Кошелёк, хранящийся по месяцам в отдельных Json файлах.
+
+    Каталог кошелька содержит файл раздела на каждый месяц и манифест
+    с количеством записей, доходами и расходами каждого раздела.
+    Открытие читает только манифест. Баланс и итоги складываются из
+    манифеста и загруженных разделов. Поиск по датам и итоги за период
+    загружают только затронутые разделы, остальные операции - все
+    разделы. Добавляемая или изменяемая запись загружает раздел своего
+    месяца, а сохранение перезаписывает только изменённые разделы и
+    затем манифест.
+
+    Номера записей назначаются в порядке загрузки разделов и остаются
+    постоянными в течение сеанса работы с кошельком.
+    """
+    path: str
+    _manifest: Dict[int, PartitionInfo]
+    _loaded: Set[int]
+    _dirty: Set[int]
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): путь к каталогу кошелька.
+        """
+        super().__init__()
+        self.path = path
+        self._manifest = {}
+        self._loaded = set()
+        self._dirty = set()
+
+    @staticmethod
+    def open(path: str) -> Optional["PartitionedWallet"]:
+        """
+        Открыть кошелёк, прочитав только его манифест.
+
+        Args:
+            path (str): путь к каталогу кошелька.
+
+        Returns:
+            PartitionedWallet или None, если манифест отсутствует
+            или повреждён.
+        """
+        wallet = PartitionedWallet(path)
+        manifest = wallet._read_manifest()
+        if manifest is None:
+            return
+        wallet._manifest = manifest
+        return wallet
+
+    @staticmethod
+    def create(
+        path: str,
+        entries: Iterable[Any],
+    ) -> Optional["PartitionedWallet"]:
+        """
+        Создать кошелёк из записей, заменив существующий.
+
+        Args:
+            path (str): путь к каталогу кошелька.
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+
+        Returns:
+            PartitionedWallet или None в случае некорректных данных
+            или ошибки записи.
+        """
+        wallet = PartitionedWallet(path)
+        previous = wallet._read_manifest() or {}
+        wallet._loaded.update(previous)
+
+        report = wallet.add_entries(entries)
+        if report.errors:
+            return
+
+        # Разделы прежнего кошелька, в которые не попало ни одной записи,
+        # удаляются при сохранении.
+        wallet._manifest = previous
+        wallet._dirty.update(previous)
+        if not wallet.save():
+            return
+        return wallet
+
+    @property
+    def balance(self) -> float:
+        totals = self.totals
+        return from_cents(
+            totals[EntryCategory.Income] - totals[EntryCategory.Spend]
+        )
+
+    @property
+    def total_income(self) -> float:
+        return from_cents(self.totals[EntryCategory.Income])
+
+    @property
+    def total_spending(self) -> float:
+        return from_cents(self.totals[EntryCategory.Spend])
+
+    @property
+    def totals(self) -> Dict[EntryCategory, int]:
+        totals = dict(self._total)
+        for info in self._unloaded().values():
+            totals[EntryCategory.Income] += info.income
+            totals[EntryCategory.Spend] += info.spending
+        return totals
+
+    @property
+    def storage(self) -> ColumnarStorage:
+        self._load_all()
+        return self._storage
+
+    def save(self) -> bool:
+        """
+        Записать изменённые разделы и манифест.
+
+        Разделы записываются до манифеста, и каждый файл подменяется
+        целиком, поэтому сбой во время сохранения не повреждает
+        сохранённые ранее разделы.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+        try:
+            os.makedirs(self.path, exist_ok=True)
+        except OSError:
+            return False
+
+        json_handler = JsonHandler(self.path)
+        for key in sorted(self._dirty):
+            first, last = month_bounds(key)
+            entries = super().find_by_date_range(
+                datetime.date.fromordinal(first),
+                datetime.date.fromordinal(last),
+            )
+            partition_path = self._partition_path(key)
+
+            if not entries:
+                self._manifest.pop(key, None)
+                if os.path.exists(partition_path):
+                    try:
+                        os.remove(partition_path)
+                    except OSError:
+                        return False
+                continue
+
+            if not json_handler.save_entries(
+                (entry.to_json() for _, entry in entries),
+                partition_path,
+            ):
+                return False
+
+            info = PartitionInfo(count=len(entries), income=0, spending=0)
+            for _, entry in entries:
+                if entry.category == EntryCategory.Income:
+                    info.income += entry.cents
+                else:
+                    info.spending += entry.cents
+            self._manifest[key] = info
+
+        if not json_handler.save_json(
+            {
+                "version": MANIFEST_VERSION,
+                "partitions": [
+                    {
+                        "month": bucket_label(RollupPeriod.Month, key),
+                        "count": info.count,
+                        "income": info.income,
+                        "spending": info.spending,
+                    }
+                    for key, info in sorted(self._manifest.items())
+                ],
+            },
+            os.path.join(self.path, MANIFEST_NAME),
+        ):
+            return False
+
+        self._dirty.clear()
+        return True
+
+    def _period_total(
+        self,
+        category: EntryCategory,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+    ) -> int:
+        lower = start.toordinal() if start else None
+        upper = end.toordinal() if end else None
+
+        total = 0
+        partial = []
+        for key, info in self._unloaded().items():
+            first, last = month_bounds(key)
+            if (upper is not None and first > upper) or \
+                    (lower is not None and last < lower):
+                continue
+            if (lower is None or lower <= first) and \
+                    (upper is None or last <= upper):
+                total += info.income if category == EntryCategory.Income \
+                    else info.spending
+            else:
+                partial.append(key)
+
+        self._load_partitions(partial)
+        return total + super()._period_total(category, start, end)
+
+    def rollup(self, period: RollupPeriod) -> List[Tuple[str, float, float]]:
+        if period not in (RollupPeriod.Month, RollupPeriod.Year):
+            self._load_all()
+            return super().rollup(period)
+
+        merged = {}
+        for key, info in self._unloaded().items():
+            if period == RollupPeriod.Year:
+                key //= 12
+            total = merged.setdefault(key, [0, 0])
+            total[0] += info.income
+            total[1] += info.spending
+
+        rows = {label: (income, spend)
+                for label, income, spend in super().rollup(period)}
+        for key, (income, spend) in merged.items():
+            label = bucket_label(period, key)
+            loaded_income, loaded_spend = rows.get(label, (0.0, 0.0))
+            rows[label] = (
+                round(loaded_income + from_cents(income), 2),
+                round(loaded_spend + from_cents(spend), 2),
+            )
+        return [(label, *rows[label]) for label in sorted(rows)]
+
+    def add_entry(self, new_entry: WalletEntry) -> None:
+        key = bucket_key(RollupPeriod.Month, new_entry.date.toordinal())
+        self._load_partitions([key])
+        super().add_entry(new_entry)
+        self._dirty.add(key)
+
+    def add_entries(self, entries: Iterable[Any]) -> BulkInsertReport:
+        report = BulkInsertReport(first_index=len(self._storage))
+        rows = EntryDecoder().decode(entries, 0, report.errors)
+        keys = {bucket_key(RollupPeriod.Month, row[0]) for row in rows}
+        self._load_partitions(keys)
+
+        self._add_rows(rows, report)
+        self._dirty.update(keys)
+        return report
+
+    def __setitem__(
+        self,
+        entry_index: int,
+        updated_entry: WalletEntry,
+    ) -> None:
+        if not super()._has_entry(entry_index):
+            self._load_all()
+        if not super()._has_entry(entry_index):
+            print('Несуществующая запись.\n')
+            return
+
+        previous = self._month_of(entry_index)
+        key = bucket_key(RollupPeriod.Month, updated_entry.date.toordinal())
+        self._load_partitions([key])
+        super().__setitem__(entry_index, updated_entry)
+        self._dirty.update((previous, key))
+
+    def __getitem__(self, entry_index: int) -> Any:
+        self._load_all()
+        return super().__getitem__(entry_index)
+
+    def __len__(self):
+        return len(self._storage) + sum(
+            info.count for info in self._unloaded().values()
+        )
+
+    def _has_entry(self, entry_index: int) -> bool:
+        return 0 <= entry_index < len(self)
+
+    def page(
+        self,
+        order: PageOrder = PageOrder.Id,
+        after: Any = None,
+        before: Any = None,
+        limit: int = 5,
+    ) -> List[Tuple[int, WalletEntry]]:
+        self._load_all()
+        return super().page(order, after, before, limit)
+
+    def count_after(self, order: PageOrder, key: Any) -> int:
+        self._load_all()
+        return super().count_after(order, key)
+
+    def find_entries(
+        self,
+        search_field: SearchField,
+        value: Any,
+    ) -> List[Tuple[int, WalletEntry]]:
+        # Поиск по датам загружает разделы в find_by_date_range.
+        if search_field not in DATE_SEARCHES:
+            self._load_all()
+        return super().find_entries(search_field, value)
+
+    def find_by_date_range(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> List[Tuple[int, WalletEntry]]:
+        lower = start.toordinal() if start else None
+        upper = end.toordinal() if end else None
+        self._load_partitions(
+            key
+            for key in self._unloaded()
+            if (lower is None or month_bounds(key)[1] >= lower)
+            and (upper is None or month_bounds(key)[0] <= upper)
+        )
+        return super().find_by_date_range(start, end)
+
+    def find_by_amount_range(self, *args, **kwargs):
+        self._load_all()
+        return super().find_by_amount_range(*args, **kwargs)
+
+    def find_largest(self, *args, **kwargs):
+        self._load_all()
+        return super().find_largest(*args, **kwargs)
+
+    def find_similar(self, *args, **kwargs):
+        self._load_all()
+        return super().find_similar(*args, **kwargs)
+
+    def query(self, query: "Query") -> List[Tuple[int, WalletEntry]]:
+        self._load_all()
+        return super().query(query)
+
+    def explain(self, query: "Query") -> str:
+        self._load_all()
+        return super().explain(query)
+
+    def iter_json(self) -> Iterator[Dict]:
+        self._load_all()
+        return super().iter_json()
+
+    def _unloaded(self) -> Dict[int, PartitionInfo]:
+        """ Разделы манифеста, которые ещё не загружены. """
+        return {
+            key: info
+            for key, info in self._manifest.items()
+            if key not in self._loaded
+        }
+
+    def _month_of(self, entry_index: int) -> int:
+        """ Месяц записи, находящейся в памяти. """
+        ordinal = self._storage.dates[entry_index]
+        return bucket_key(RollupPeriod.Month, ordinal)
+
+    def _load_all(self) -> None:
+        self._load_partitions(list(self._manifest))
+
+    def _load_partitions(self, keys: Iterable[int]) -> None:
+        """
+        Загрузить разделы месяцев, если они ещё не загружены.
+
+        Записи всех разделов сначала читаются, а затем добавляются
+        в хранилище и индексы одним блоком, поэтому ошибка чтения
+        любого раздела не изменяет кошелёк. Загрузка не считается
+        изменением кошелька и не сообщается подписчикам.
+
+        Raises:
+            PartitionError: если файл раздела отсутствует или повреждён.
+        """
+        keys = sorted(set(keys).difference(self._loaded))
+        decoder = EntryDecoder()
+        rows = []
+        for key in keys:
+            if key not in self._manifest:
+                continue
+
+            # Разделы невелики, поэтому файл раздела разбирается
+            # целиком, а не потоково.
+            partition_path = self._partition_path(key)
+            data = JsonHandler(partition_path).load_json(partition_path)
+            if not isinstance(data, dict) or \
+                    not isinstance(data.get("entries"), list):
+                raise PartitionError(
+                    f"Раздел {partition_path} не найден или повреждён"
+                )
+            errors = []
+            rows.extend(decoder.decode(data["entries"], 0, errors))
+            if errors:
+                raise PartitionError(
+                    f"Раздел {partition_path} повреждён: {errors[0][1]}"
+                )
+
+        if rows:
+            # Индексы пустого кошелька строятся позже, при первом
+            # обращении, один раз для всех загруженных записей.
+            if not self._storage:
+                self._indexed = False
+            self._storage = self._storage.writable()
+            first_index = len(self._storage)
+            self._storage.extend(rows)
+            self._index_entries(first_index, len(rows))
+        self._loaded.update(keys)
+
+    def _partition_path(self, key: int) -> str:
+        return os.path.join(
+            self.path,
+            bucket_label(RollupPeriod.Month, key) + ".json",
+        )
+
+    def _read_manifest(self) -> Optional[Dict[int, PartitionInfo]]:
+        """ Прочитать манифест, None - если он отсутствует или повреждён. """
+        try:
+            with open(
+                os.path.join(self.path, MANIFEST_NAME),
+                "r",
+                encoding="utf-8",
+            ) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        try:
+            if data["version"] != MANIFEST_VERSION:
+                return
+            manifest = {}
+            for partition in data["partitions"]:
+                year, month = partition["month"].split("-")
+                manifest[int(year) * 12 + int(month) - 1] = PartitionInfo(
+                    count=int(partition["count"]),
+                    income=int(partition["income"]),
+                    spending=int(partition["spending"]),
+                )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return
+        return manifest
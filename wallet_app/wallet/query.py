@@ -0,0 +1,267 @@
+from abc import ABC, abstractmethod
+from typing import (
+    Any, Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING,
+)
+
+from wallet.entry import WalletEntry
+from wallet.wallet import FILTER_FUNCS, SearchField
+
+if TYPE_CHECKING:
+    from wallet.wallet import Wallet
+
+
+class QueryPlan:
+    """
+    Состояние планирования одного выполнения запроса в кошельке.
+
+    Участки индексов каждого условия вычисляются один раз и используются
+    повторно для оценки, выбора ведущего условия, отбора записей и
+    описания плана.
+    """
+    wallet: "Wallet"
+    _slices: Dict[
+        "Condition",
+        Optional[List[Tuple[Sequence[int], int, int]]],
+    ]
+
+    def __init__(self, wallet: "Wallet"):
+        """
+        Args:
+            wallet (Wallet): кошелёк для поиска.
+        """
+
+        self.wallet = wallet
+        self._slices = {}
+
+    def slices(
+        self,
+        condition: "Condition",
+    ) -> Optional[List[Tuple[Sequence[int], int, int]]]:
+        """ Участки индексов для условия, см. Wallet.index_slices. """
+        if condition not in self._slices:
+            self._slices[condition] = self.wallet.index_slices(
+                condition.search_field,
+                condition.value,
+            )
+        return self._slices[condition]
+
+
+class Query(ABC):
+    """
+    Базовый класс составного запроса к кошельку.
+
+    Запросы объединяются операторами & (И) и | (ИЛИ). Перед выполнением
+    планировщик оценивает число подходящих записей по индексам кошелька
+    и начинает с самого избирательного индексированного условия,
+    проверяя остальные условия только на отобранных записях.
+    """
+
+    def __and__(self, other: "Query") -> "Query":
+        return And(self, other)
+
+    def __or__(self, other: "Query") -> "Query":
+        return Or(self, other)
+
+    @abstractmethod
+    def estimate(self, plan: QueryPlan) -> int:
+        """ Оценка количества записей, подходящих под запрос. """
+
+    @abstractmethod
+    def indexed(self, plan: QueryPlan) -> bool:
+        """ Можно ли отобрать записи для запроса по индексам. """
+
+    @abstractmethod
+    def candidates(self, plan: QueryPlan) -> Optional[Set[int]]:
+        """
+        Номера записей, среди которых находятся все подходящие под запрос,
+        или None, если их нельзя получить без полного просмотра.
+        """
+
+    @abstractmethod
+    def matches(self, entry: Tuple[int, WalletEntry]) -> bool:
+        """ Проверить, подходит ли запись под запрос. """
+
+    @abstractmethod
+    def describe(self, plan: QueryPlan, depth: int = 0) -> List[str]:
+        """ Строки описания плана выполнения запроса. """
+
+    def execute(self, wallet: "Wallet") -> List[Tuple[int, WalletEntry]]:
+        """
+        Выполнить запрос.
+
+        Args:
+            wallet (Wallet): кошелёк для поиска.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи в порядке их номеров.
+        """
+
+        entry_indexes = self.candidates(QueryPlan(wallet))
+        if entry_indexes is None:
+            entry_indexes = range(len(wallet))
+        else:
+            entry_indexes = sorted(entry_indexes)
+
+        return [
+            entry
+            for entry in wallet.entries_at(entry_indexes)
+            if self.matches(entry)
+        ]
+
+    def explain(self, wallet: "Wallet") -> str:
+        """
+        Описание плана выполнения запроса.
+
+        Args:
+            wallet (Wallet): кошелёк для поиска.
+
+        Returns:
+            str
+        """
+
+        return "\n".join(self.describe(QueryPlan(wallet)))
+
+
+class Condition(Query):
+    """ Условие на одно поле записи. """
+    search_field: SearchField
+    value: Any
+
+    def __init__(self, search_field: SearchField, value: Any):
+        """
+        Args:
+            search_field (SearchField): поле, по которому проверяется условие.
+            value: искомое значение.
+        """
+
+        if search_field not in FILTER_FUNCS:
+            raise ValueError("Поле не поддерживается в составных запросах")
+
+        self.search_field = search_field
+        self.value = value
+        self._filter = FILTER_FUNCS[search_field](value)
+
+    def __reduce__(self):
+        # Функция фильтра не сериализуется и создаётся заново, что
+        # позволяет передавать запросы в другие процессы.
+        return Condition, (self.search_field, self.value)
+
+    def estimate(self, plan: QueryPlan) -> int:
+        slices = plan.slices(self)
+        if slices is None:
+            return len(plan.wallet)
+        return sum(hi - lo for _, lo, hi in slices)
+
+    def indexed(self, plan: QueryPlan) -> bool:
+        return plan.slices(self) is not None
+
+    def candidates(self, plan: QueryPlan) -> Optional[Set[int]]:
+        slices = plan.slices(self)
+        if slices is None:
+            return
+
+        entry_indexes = set()
+        for ids, lo, hi in slices:
+            entry_indexes.update(ids[lo:hi])
+        return entry_indexes
+
+    def matches(self, entry: Tuple[int, WalletEntry]) -> bool:
+        return self._filter(entry)
+
+    def describe(self, plan: QueryPlan, depth: int = 0) -> List[str]:
+        return [
+            "{indent}{field} = {value!r} ({access}, оценка: {est})".format(
+                indent="  " * depth,
+                field=self.search_field.name,
+                value=self.value,
+                access="индекс" if self.indexed(plan) else "фильтр",
+                est=self.estimate(plan),
+            )
+        ]
+
+
+class And(Query):
+    """ Запрос, которому должны удовлетворять все вложенные запросы. """
+    queries: Tuple[Query, ...]
+
+    def __init__(self, *queries: Query):
+        self.queries = queries
+
+    def _driver(self, plan: QueryPlan) -> Optional[Query]:
+        """ Самый избирательный из индексированных вложенных запросов. """
+        indexed = [query for query in self.queries if query.indexed(plan)]
+        if not indexed:
+            return
+        return min(indexed, key=lambda query: query.estimate(plan))
+
+    def estimate(self, plan: QueryPlan) -> int:
+        return min(query.estimate(plan) for query in self.queries)
+
+    def indexed(self, plan: QueryPlan) -> bool:
+        return any(query.indexed(plan) for query in self.queries)
+
+    def candidates(self, plan: QueryPlan) -> Optional[Set[int]]:
+        driver = self._driver(plan)
+        if driver is None:
+            return
+        return driver.candidates(plan)
+
+    def matches(self, entry: Tuple[int, WalletEntry]) -> bool:
+        return all(query.matches(entry) for query in self.queries)
+
+    def describe(self, plan: QueryPlan, depth: int = 0) -> List[str]:
+        driver = self._driver(plan)
+        lines = [
+            "{indent}И ({access}, оценка: {estimate})".format(
+                indent="  " * depth,
+                access="индекс" if driver else "полный просмотр",
+                estimate=self.estimate(plan),
+            )
+        ]
+        for query in self.queries:
+            query_lines = query.describe(plan, depth + 1)
+            if query is driver:
+                query_lines[0] += " <- ведущее условие"
+            lines.extend(query_lines)
+        return lines
+
+
+class Or(Query):
+    """ Запрос, которому должен удовлетворять хотя бы один вложенный. """
+    queries: Tuple[Query, ...]
+
+    def __init__(self, *queries: Query):
+        self.queries = queries
+
+    def estimate(self, plan: QueryPlan) -> int:
+        return min(
+            len(plan.wallet),
+            sum(query.estimate(plan) for query in self.queries),
+        )
+
+    def indexed(self, plan: QueryPlan) -> bool:
+        return all(query.indexed(plan) for query in self.queries)
+
+    def candidates(self, plan: QueryPlan) -> Optional[Set[int]]:
+        entry_indexes = set()
+        for query in self.queries:
+            query_indexes = query.candidates(plan)
+            if query_indexes is None:
+                return
+            entry_indexes |= query_indexes
+        return entry_indexes
+
+    def matches(self, entry: Tuple[int, WalletEntry]) -> bool:
+        return any(query.matches(entry) for query in self.queries)
+
+    def describe(self, plan: QueryPlan, depth: int = 0) -> List[str]:
+        lines = [
+            "{indent}ИЛИ ({access}, оценка: {estimate})".format(
+                indent="  " * depth,
+                access="индекс" if self.indexed(plan) else "полный просмотр",
+                estimate=self.estimate(plan),
+            )
+        ]
+        for query in self.queries:
+            lines.extend(query.describe(plan, depth + 1))
+        return lines
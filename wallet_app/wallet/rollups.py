@@ -0,0 +1,154 @@
+import datetime
+from enum import IntEnum
+from typing import Dict, List, Sequence, Tuple
+
+from wallet.entry import EntryCategory
+
+
+class RollupPeriod(IntEnum):
+    Day = 1,
+    Week = 2,
+    Month = 3,
+    Year = 4
+
+
+def bucket_key(period: RollupPeriod, ordinal: int) -> int:
+    """
+    Ключ группы периода для дня.
+
+    Args:
+        period (RollupPeriod): период группировки.
+        ordinal (int): порядковый номер дня.
+
+    Returns:
+        int: номер дня для дней, номер понедельника для недель,
+             номер месяца от начала эры для месяцев, год для годов.
+    """
+    if period == RollupPeriod.Day:
+        return ordinal
+    if period == RollupPeriod.Week:
+        return ordinal - (ordinal - 1) % 7
+
+    date = datetime.date.fromordinal(ordinal)
+    if period == RollupPeriod.Month:
+        return date.year * 12 + date.month - 1
+    return date.year
+
+
+def bucket_label(period: RollupPeriod, key: int) -> str:
+    """
+    Подпись группы периода.
+
+    Args:
+        period (RollupPeriod): период группировки.
+        key (int): ключ группы.
+
+    Returns:
+        str
+    """
+    if period == RollupPeriod.Day:
+        return datetime.date.fromordinal(key).isoformat()
+    if period == RollupPeriod.Week:
+        year, week, _ = datetime.date.fromordinal(key).isocalendar()
+        return f"{year}-W{week:02}"
+    if period == RollupPeriod.Month:
+        return f"{key // 12}-{key % 12 + 1:02}"
+    return str(key)
+
+
+class Rollups:
+    """
+    Материализованные итоги кошелька по дням, неделям, месяцам и годам.
+
+    Для каждой группы периода хранятся суммы в копейках и количество
+    записей по категориям. Учёт одной записи стоит O(1) на период,
+    а построение отчёта - O(k log k), где k - число групп.
+    """
+    _buckets: Dict[RollupPeriod, Dict[int, List[int]]]
+
+    def __init__(self):
+        self._buckets = {period: {} for period in RollupPeriod}
+
+    def add(self, ordinal: int, category: int, amount: int) -> None:
+        """
+        Учесть запись в итогах.
+
+        Args:
+            ordinal (int): порядковый номер дня записи.
+            category (int): категория записи.
+            amount (int): сумма записи в копейках.
+        """
+        self._update(ordinal, category, amount, 1)
+
+    def extend(
+        self,
+        ordinals: Sequence[int],
+        categories: Sequence[int],
+        amounts: Sequence[int],
+    ) -> None:
+        """
+        Учесть в итогах блок записей.
+
+        Записи предварительно суммируются по дням, поэтому стоимость
+        обновления групп зависит от числа различных дней, а не записей.
+
+        Args:
+            ordinals (Sequence[int]): порядковые номера дней записей.
+            categories (Sequence[int]): категории записей.
+            amounts (Sequence[int]): суммы записей в копейках.
+        """
+        days = {}
+        for ordinal, category, amount in zip(ordinals, categories, amounts):
+            day = days.get((ordinal, category))
+            if day is None:
+                days[(ordinal, category)] = [amount, 1]
+            else:
+                day[0] += amount
+                day[1] += 1
+
+        for (ordinal, category), (amount, count) in days.items():
+            self._update(ordinal, category, amount, count)
+
+    def remove(self, ordinal: int, category: int, amount: int) -> None:
+        """
+        Исключить запись из итогов.
+
+        Args:
+            ordinal (int): порядковый номер дня записи.
+            category (int): категория записи.
+            amount (int): сумма записи в копейках.
+        """
+        self._update(ordinal, category, -amount, -1)
+
+    def _update(
+        self,
+        ordinal: int,
+        category: int,
+        amount: int,
+        count: int,
+    ) -> None:
+        spend = category == EntryCategory.Spend
+        for period, buckets in self._buckets.items():
+            key = bucket_key(period, ordinal)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [0, 0, 0, 0]
+
+            bucket[spend] += amount
+            bucket[2 + spend] += count
+            if not bucket[2] and not bucket[3]:
+                del buckets[key]
+
+    def report(self, period: RollupPeriod) -> List[Tuple[int, List[int]]]:
+        """
+        Итоги по группам периода.
+
+        Args:
+            period (RollupPeriod): период группировки.
+
+        Returns:
+            List[Tuple[int, List[int]]]: ключ группы и список
+            [доходы, расходы, число доходов, число расходов],
+            упорядоченные по ключу.
+        """
+        return sorted(self._buckets[period].items())
@@ -0,0 +1,685 @@
+import datetime
+import json
+import os
+from typing import Any, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from utils import filters
+from wallet.entry import (
+    EntryCategory, WalletEntry, entry_fields, from_cents, to_cents,
+)
+from wallet.rollups import RollupPeriod, bucket_label
+from wallet.storage import ColumnarStorage
+from wallet.text_index import (
+    FUZZY_THRESHOLD, TrigramIndex, parse_text_query, text_matches,
+)
+from wallet.wallet import (
+    BulkInsertReport, LOAD_BATCH_SIZE, PageOrder, SearchField, Wallet,
+)
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from utils.json_handler import JsonHandler
+    from wallet.query import Query
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+# Смещение между порядковым номером дня и юлианским днём SQLite.
+JULIAN_DAY_OFFSET = 1721424.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    date INTEGER NOT NULL,
+    category INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS entries_category_date
+    ON entries (category, date, amount);
+CREATE INDEX IF NOT EXISTS entries_category_amount
+    ON entries (category, amount);
+CREATE INDEX IF NOT EXISTS entries_amount ON entries (amount);
+CREATE INDEX IF NOT EXISTS entries_description ON entries (description);
+"""
+
+COLUMNS = "id, date, category, amount, description"
+
+ROLLUP_BUCKETS = {
+    RollupPeriod.Day: "date",
+    RollupPeriod.Week: "date - (date - 1) % 7",
+    RollupPeriod.Month: (
+        "CAST(strftime('%Y', date + {offset}) AS INTEGER) * 12"
+        " + CAST(strftime('%m', date + {offset}) AS INTEGER) - 1"
+    ).format(offset=JULIAN_DAY_OFFSET),
+    RollupPeriod.Year: "CAST(strftime('%Y', date + {offset}) AS INTEGER)"
+    .format(offset=JULIAN_DAY_OFFSET),
+}
+
+
+def is_sqlite_path(file_path: Optional[str]) -> bool:
+    """ Является ли путь путём к файлу кошелька SQLite. """
+    return bool(file_path) and file_path.endswith(SQLITE_EXTENSIONS)
+
+
+def _row_to_entry(row: Tuple) -> Tuple[int, WalletEntry]:
+    """ Преобразовать строку таблицы в пару (номер записи, запись). """
+    return row[0], WalletEntry.from_row(row[1:])
+
+
+def _remove_database(path: str, keep_database: bool = False) -> None:
+    """
+    Удалить файл базы данных вместе с файлами журнала WAL.
+
+    Args:
+        path (str): путь к файлу базы данных.
+        keep_database (bool): удалить только файлы журнала.
+    """
+    paths = [path + "-wal", path + "-shm"]
+    if not keep_database:
+        paths.append(path)
+    for database_path in paths:
+        if os.path.exists(database_path):
+            os.remove(database_path)
+
+
+class SqliteWallet(Wallet):
+    """
+    Кошелёк, хранящий записи в локальном файле SQLite.
+
+    Поиск, итоги за период, отчёты и срезы выполняются запросами SQL
+    по индексам таблицы, поэтому записи не загружаются в память.
+    Каждое изменение записывается в файл одной строкой.
+    В памяти хранятся только количество записей и итоги по категориям.
+    """
+    path: str
+    _connection: "sqlite3.Connection"
+    _count: int
+    _trigrams: Optional[TrigramIndex]
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): путь к файлу базы данных, создаётся при отсутствии.
+        """
+        # sqlite3 импортируется только при открытии кошелька SQLite,
+        # команды над файлами других форматов его не загружают.
+        import sqlite3
+
+        super().__init__()
+        self.path = path
+        self._trigrams = None
+        self._connection = sqlite3.connect(path)
+        self._connection.create_function(
+            "casefold", 1, str.casefold, deterministic=True,
+        )
+        self._connection.create_function(
+            "text_match",
+            2,
+            lambda text, query: text_matches(text, parse_text_query(query)),
+            deterministic=True,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        self._count = self._connection.execute(
+            "SELECT COALESCE(MAX(id) + 1, 0) FROM entries"
+        ).fetchone()[0]
+        for category, total in self._connection.execute(
+            "SELECT category, SUM(amount) FROM entries GROUP BY category"
+        ):
+            self._total[EntryCategory(category)] = total
+
+    def close(self) -> None:
+        """ Закрыть соединение с базой данных. """
+        self._connection.close()
+
+    @staticmethod
+    def open(path: str) -> Optional["SqliteWallet"]:
+        """
+        Открыть существующий кошелёк SQLite.
+
+        Args:
+            path (str): путь к файлу базы данных.
+
+        Returns:
+            SqliteWallet или None, если файл отсутствует или повреждён.
+        """
+        if not os.path.exists(path):
+            return
+
+        import sqlite3
+
+        try:
+            return SqliteWallet(path)
+        except (sqlite3.DatabaseError, ValueError):
+            return
+
+    @staticmethod
+    def create(
+        path: str,
+        entries: Iterable[Any] = (),
+        batch_size: int = LOAD_BATCH_SIZE,
+    ) -> Optional["SqliteWallet"]:
+        """
+        Создать новый кошелёк SQLite из потока записей.
+
+        Существующий файл заменяется. Записи вставляются блоками
+        в одной транзакции.
+
+        Args:
+            path (str): путь к файлу базы данных.
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+            batch_size (int): размер блока записей.
+
+        Returns:
+            SqliteWallet или None в случае некорректных данных.
+        """
+        temp_path = path + ".tmp"
+        _remove_database(temp_path)
+
+        wallet = SqliteWallet(temp_path)
+        batch = []
+        try:
+            with wallet._connection:
+                for entry in entries:
+                    batch.append(entry_fields(entry))
+                    if len(batch) >= batch_size:
+                        wallet._insert(batch)
+                        batch = []
+                if batch:
+                    wallet._insert(batch)
+        except (TypeError, ValueError):
+            wallet.close()
+            _remove_database(temp_path)
+            return
+
+        wallet._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        wallet.close()
+        # Журнал WAL заменяемой базы иначе был бы применён к новой.
+        _remove_database(path, keep_database=True)
+        os.replace(temp_path, path)
+        return SqliteWallet(path)
+
+    @staticmethod
+    def migrate_json(
+        json_handler: "JsonHandler",
+        json_path: Optional[str],
+        path: str,
+    ) -> Optional["SqliteWallet"]:
+        """
+        Перенести Json файл кошелька в новый кошелёк SQLite.
+
+        Args:
+            json_handler (JsonHandler): обработчик Json файлов.
+            json_path (str): путь к Json файлу.
+            path (str): путь к файлу базы данных.
+
+        Returns:
+            SqliteWallet или None в случае ошибки.
+        """
+        entries = json_handler.stream_entries(json_path)
+        if entries is None:
+            return
+
+        return SqliteWallet.create(path, entries)
+
+    def _insert(self, rows: List[Tuple[int, int, int, str]]) -> None:
+        """ Вставить блок записей и учесть их в итогах. """
+        first_index = self._count
+        self._connection.executemany(
+            "INSERT INTO entries ({columns}) VALUES (?, ?, ?, ?, ?)"
+            .format(columns=COLUMNS),
+            (
+                (first_index + offset, *row)
+                for offset, row in enumerate(rows)
+            ),
+        )
+        self._count += len(rows)
+        for _, category, amount, description in rows:
+            self._total[category] += amount
+            if self._trigrams is not None:
+                self._trigrams.add(description)
+
+    @property
+    def storage(self) -> ColumnarStorage:
+        """ Копия записей кошелька в колоночном хранилище. """
+        storage = ColumnarStorage()
+        storage.extend(
+            row[1:]
+            for row in self._connection.execute(
+                "SELECT {columns} FROM entries ORDER BY id".format(
+                    columns=COLUMNS,
+                )
+            )
+        )
+        return storage
+
+    def _period_total(
+        self,
+        category: EntryCategory,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+    ) -> int:
+        conditions, parameters = self._date_conditions(
+            start.toordinal() if start else None,
+            end.toordinal() if end else None,
+        )
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(amount), 0) FROM entries"
+            " WHERE category = ?" + "".join(
+                " AND " + condition for condition in conditions
+            ),
+            (int(category), *parameters),
+        ).fetchone()[0]
+
+    def rollup(self, period: RollupPeriod) -> List[Tuple[str, float, float]]:
+        rows = self._connection.execute(
+            "SELECT {bucket} AS bucket,"
+            " SUM(CASE WHEN category = 1 THEN amount ELSE 0 END),"
+            " SUM(CASE WHEN category = 2 THEN amount ELSE 0 END)"
+            " FROM entries GROUP BY bucket ORDER BY bucket".format(
+                bucket=ROLLUP_BUCKETS[period],
+            )
+        )
+        return [
+            (bucket_label(period, key), from_cents(income), from_cents(spend))
+            for key, income, spend in rows
+        ]
+
+    def add_entry(self, new_entry: WalletEntry) -> None:
+        with self._connection:
+            self._insert([entry_fields(new_entry)])
+        self._notify(self._count - 1, True)
+
+    def add_entries(self, entries: Iterable[Any]) -> BulkInsertReport:
+        report = BulkInsertReport(first_index=self._count)
+
+        rows = []
+        for row_number, entry in enumerate(entries):
+            try:
+                rows.append(entry_fields(entry))
+            except ValueError as error:
+                report.errors.append((row_number, str(error)))
+
+        if rows:
+            with self._connection:
+                self._insert(rows)
+            report.added = len(rows)
+
+            if self._listeners:
+                for entry_index in range(report.first_index, self._count):
+                    self._notify(entry_index, True)
+
+        return report
+
+    def __setitem__(self, entry_index: int, updated_entry: WalletEntry) -> None:
+        if not self._has_entry(entry_index):
+            print('Несуществующая запись.\n')
+            return
+
+        date, category, amount, description = entry_fields(updated_entry)
+        with self._connection:
+            old_category, old_amount, old_description = \
+                self._connection.execute(
+                    "SELECT category, amount, description FROM entries"
+                    " WHERE id = ?",
+                    (entry_index,),
+                ).fetchone()
+            self._connection.execute(
+                "UPDATE entries SET date = ?, category = ?, amount = ?,"
+                " description = ? WHERE id = ?",
+                (date, category, amount, description, entry_index),
+            )
+        self._total[old_category] -= old_amount
+        self._total[category] += amount
+        if self._trigrams is not None:
+            self._trigrams.remove(old_description)
+            self._trigrams.add(description)
+        self._notify(entry_index, False)
+
+    def __getitem__(self, entry_index: int) -> Any:
+        if isinstance(entry_index, int):
+            if not self._has_entry(entry_index):
+                return
+            return self._select("id = ?", (entry_index,))[0]
+
+        indexes = range(self._count)[entry_index]
+        if not indexes:
+            return []
+
+        return self._select(
+            "id BETWEEN ? AND ? AND (id - ?) % ? = 0",
+            (
+                min(indexes),
+                max(indexes),
+                indexes.start,
+                abs(indexes.step),
+            ),
+            "id" if indexes.step > 0 else "id DESC",
+        )
+
+    def __len__(self):
+        return self._count
+
+    def _has_entry(self, entry_index: int) -> bool:
+        return 0 <= entry_index < self._count
+
+    def page(
+        self,
+        order: PageOrder = PageOrder.Id,
+        after: Any = None,
+        before: Any = None,
+        limit: int = 5,
+    ) -> List[Tuple[int, WalletEntry]]:
+        columns = "id" if order == PageOrder.Id else "(date, id)"
+        key = before if before is not None else after
+        if key is None:
+            where, parameters = "1", ()
+        else:
+            where = "{columns} {sign} {value}".format(
+                columns=columns,
+                sign="<" if before is not None else ">",
+                value="?" if order == PageOrder.Id else "(?, ?)",
+            )
+            parameters = (key,) if order == PageOrder.Id else tuple(key)
+
+        direction = " DESC" if before is not None else ""
+        order_by = "id" + direction if order == PageOrder.Id else \
+            "date{direction}, id{direction}".format(direction=direction)
+        page = self._select(
+            where,
+            parameters,
+            "{order_by} LIMIT {limit}".format(
+                order_by=order_by,
+                limit=int(limit),
+            ),
+        )
+        if before is not None:
+            page.reverse()
+        return page
+
+    def count_after(self, order: PageOrder, key: Any) -> int:
+        if order == PageOrder.Id:
+            return max(0, self._count - key - 1)
+
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM entries WHERE (date, id) > (?, ?)",
+            tuple(key),
+        ).fetchone()[0]
+
+    def find_entries(
+        self,
+        search_field: SearchField,
+        value: Any,
+    ) -> List[Tuple[int, WalletEntry]]:
+        if search_field in (
+            SearchField.LargestSpends,
+            SearchField.LargestIncomes,
+        ):
+            count = filters.parse_count(value)
+            if count is None:
+                return []
+            category = EntryCategory.Spend \
+                if search_field == SearchField.LargestSpends \
+                else EntryCategory.Income
+            return self.find_largest(category, count)
+
+        if search_field == SearchField.Fuzzy:
+            if not isinstance(value, str):
+                return []
+            return self.find_similar(value)
+
+        condition = self._condition(search_field, value)
+        if condition is None:
+            return []
+
+        order = {
+            SearchField.Date: "date, id",
+            SearchField.DateRange: "date, id",
+            SearchField.AmountRange: "amount, id",
+        }.get(search_field, "id")
+        return self._select(*condition, order)
+
+    def find_by_date_range(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> List[Tuple[int, WalletEntry]]:
+        return self.find_entries(SearchField.DateRange, (start, end))
+
+    def find_by_amount_range(
+        self,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ) -> List[Tuple[int, WalletEntry]]:
+        return self.find_entries(SearchField.AmountRange, (minimum, maximum))
+
+    def find_largest(
+        self,
+        category: EntryCategory,
+        count: int,
+    ) -> List[Tuple[int, WalletEntry]]:
+        if count <= 0:
+            return []
+
+        return self._select(
+            "category = ?",
+            (int(category),),
+            "amount DESC, id DESC LIMIT {count}".format(count=int(count)),
+        )
+
+    def find_similar(
+        self,
+        text: str,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> List[Tuple[int, WalletEntry]]:
+        ranked = []
+        for description, score in self._trigram_index().similar(
+            text,
+            threshold,
+        ):
+            ranked.extend(
+                (-score, entry)
+                for entry in self._select("description = ?", (description,))
+            )
+        ranked.sort(key=lambda item: (item[0], item[1][0]))
+        return [entry for _, entry in ranked]
+
+    def _trigram_index(self) -> TrigramIndex:
+        """
+        Индекс триграмм различных описаний, строится при первом
+        нечётком поиске.
+        """
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex()
+            for description, count in self._connection.execute(
+                "SELECT description, COUNT(*) FROM entries"
+                " GROUP BY description"
+            ):
+                self._trigrams.add(description, count)
+        return self._trigrams
+
+    def query(self, query: "Query") -> List[Tuple[int, WalletEntry]]:
+        condition = self._compile(query)
+        if condition is None:
+            return []
+        return self._select(*condition)
+
+    def explain(self, query: "Query") -> str:
+        condition = self._compile(query)
+        if condition is None:
+            return "Пустой результат"
+
+        where, parameters = condition
+        rows = self._connection.execute(
+            "EXPLAIN QUERY PLAN SELECT {columns} FROM entries"
+            " WHERE {where} ORDER BY id".format(columns=COLUMNS, where=where),
+            parameters,
+        )
+        return "\n".join(row[-1] for row in rows)
+
+    def to_json(self):
+        return {
+            "entries": [
+                {
+                    "date": datetime.date.fromordinal(date).isoformat(),
+                    "category": category,
+                    "amount": from_cents(amount),
+                    "description": description,
+                }
+                for date, category, amount, description
+                in self._connection.execute(
+                    "SELECT date, category, amount, description"
+                    " FROM entries ORDER BY id"
+                )
+            ]
+        }
+
+    def _select(
+        self,
+        where: str,
+        parameters: Tuple = (),
+        order: str = "id",
+    ) -> List[Tuple[int, WalletEntry]]:
+        """ Выбрать записи по условию SQL. """
+        return [
+            _row_to_entry(row)
+            for row in self._connection.execute(
+                "SELECT {columns} FROM entries WHERE {where}"
+                " ORDER BY {order}".format(
+                    columns=COLUMNS,
+                    where=where,
+                    order=order,
+                ),
+                parameters,
+            )
+        ]
+
+    @staticmethod
+    def _date_conditions(
+        lower: Optional[int],
+        upper: Optional[int],
+    ) -> Tuple[List[str], List[int]]:
+        """ Условия SQL на диапазон порядковых номеров дат. """
+        conditions, parameters = [], []
+        if lower is not None:
+            conditions.append("date >= ?")
+            parameters.append(lower)
+        if upper is not None:
+            conditions.append("date <= ?")
+            parameters.append(upper)
+        return conditions, parameters
+
+    def _condition(
+        self,
+        search_field: SearchField,
+        value: Any,
+    ) -> Optional[Tuple[str, Tuple]]:
+        """
+        Условие SQL для поиска по полю.
+
+        Returns:
+            Tuple[str, Tuple]: условие и его параметры,
+            или None, если значение некорректно.
+        """
+        if search_field == SearchField.Category:
+            category = filters.parse_category(value)
+            if category is None:
+                return
+            return "category = ?", (int(category),)
+
+        if search_field in (SearchField.Date, SearchField.DateRange):
+            if search_field == SearchField.Date:
+                date = filters.parse_date(value)
+                date_range = None if date is None else (date, date)
+            else:
+                date_range = filters.parse_date_range(value)
+            if date_range is None:
+                return
+            conditions, parameters = self._date_conditions(
+                *(
+                    None if bound is None else bound.toordinal()
+                    for bound in date_range
+                )
+            )
+            return " AND ".join(conditions) or "1", tuple(parameters)
+
+        if search_field in (SearchField.Amount, SearchField.AmountRange):
+            if search_field == SearchField.Amount:
+                amount = filters.parse_amount(value)
+                amount_range = None if amount is None else (amount, amount)
+            else:
+                amount_range = filters.parse_amount_range(value)
+            if amount_range is None:
+                return
+            minimum, maximum = amount_range
+            conditions, parameters = [], []
+            if minimum is not None:
+                conditions.append("amount >= ?")
+                parameters.append(to_cents(minimum))
+            if maximum is not None:
+                conditions.append("amount <= ?")
+                parameters.append(to_cents(maximum))
+            return " AND ".join(conditions) or "1", tuple(parameters)
+
+        if search_field == SearchField.Description:
+            if not isinstance(value, str) or not value:
+                return
+            return "instr(casefold(description), ?) > 0", (value.casefold(),)
+
+        if search_field == SearchField.Text:
+            if not isinstance(value, str) or not parse_text_query(value):
+                return
+            return "text_match(description, ?)", (value,)
+
+        if search_field == SearchField.Fuzzy:
+            descriptions = [
+                description
+                for description, _ in self._trigram_index().similar(value)
+            ] if isinstance(value, str) else []
+            if not descriptions:
+                return
+            # Описания передаются одним параметром, так как их
+            # количество может превышать ограничение SQLite
+            # на число параметров запроса.
+            return (
+                "description IN (SELECT value FROM json_each(?))",
+                (json.dumps(descriptions),),
+            )
+
+    def _compile(self, query: "Query") -> Optional[Tuple[str, Tuple]]:
+        """
+        Преобразовать составной запрос в условие SQL.
+
+        Returns:
+            Tuple[str, Tuple]: условие и его параметры,
+            или None, если запросу не соответствует ни одна запись.
+        """
+        from wallet.query import And, Condition
+
+        if isinstance(query, Condition):
+            return self._condition(query.search_field, query.value)
+
+        parts = [self._compile(nested) for nested in query.queries]
+        if isinstance(query, And):
+            if any(part is None for part in parts):
+                return
+        else:
+            parts = [part for part in parts if part is not None]
+            if not parts:
+                return
+
+        return (
+            (" AND " if isinstance(query, And) else " OR ").join(
+                "(" + where + ")" for where, _ in parts
+            ),
+            tuple(
+                parameter
+                for _, parameters in parts
+                for parameter in parameters
+            ),
+        )
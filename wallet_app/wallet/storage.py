@@ -0,0 +1,202 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from wallet.entry import WalletEntry
+
+
+class ColumnarStorage:
+    """
+    Колоночное хранилище записей кошелька.
+
+    Каждое поле записи хранится в отдельном компактном массиве:
+    даты - порядковыми номерами дней, категории - байтами,
+    суммы - целым числом копеек, описания - индексами в таблице строк.
+    Объекты WalletEntry создаются только по запросу.
+    """
+    dates: array
+    categories: bytearray
+    amounts: array
+    descriptions: array
+    strings: List[str]
+    _string_ids: Dict[str, int]
+
+    def __init__(self):
+        self.dates = array("l")
+        self.categories = bytearray()
+        self.amounts = array("q")
+        self.descriptions = array("l")
+        self.strings = []
+        self._string_ids = {}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def writable(self) -> "ColumnarStorage":
+        """ Изменяемое хранилище с теми же записями. """
+        return self
+
+    def snapshot(self) -> "ColumnarStorage":
+        """
+        Копия записей для чтения, не затрагиваемая последующими
+        изменениями хранилища.
+
+        Копируются только массивы колонок и список строк, поэтому
+        копия создаётся быстро и для больших кошельков.
+        """
+        storage = ColumnarStorage()
+        storage.dates = array("l", self.dates)
+        storage.categories = bytearray(self.categories)
+        storage.amounts = array("q", self.amounts)
+        storage.descriptions = array("l", self.descriptions)
+        storage.strings = list(self.strings)
+        return storage
+
+    def intern(self, string: str) -> int:
+        """
+        Получить индекс строки в таблице строк, добавив её при необходимости.
+
+        Args:
+            string (str): строка описания.
+
+        Returns:
+            int
+        """
+
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+    def append(self, entry: WalletEntry) -> int:
+        """
+        Добавить запись в конец хранилища.
+
+        Args:
+            entry (WalletEntry): добавляемая запись.
+
+        Returns:
+            int: номер добавленной записи.
+        """
+
+        self.dates.append(entry.date.toordinal())
+        self.categories.append(entry.category)
+        self.amounts.append(entry.cents)
+        self.descriptions.append(self.intern(entry.description))
+        return len(self.dates) - 1
+
+    def extend(self, rows: Iterable[Tuple[int, int, int, str]]) -> int:
+        """
+        Добавить блок записей в конец хранилища.
+
+        Args:
+            rows (Iterable[Tuple[int, int, int, str]]): порядковый номер даты,
+                категория, сумма в копейках и описание каждой записи.
+
+        Returns:
+            int: номер первой добавленной записи.
+        """
+
+        first_index = len(self.dates)
+        for date, category, amount, description in rows:
+            self.dates.append(date)
+            self.categories.append(category)
+            self.amounts.append(amount)
+            self.descriptions.append(self.intern(description))
+        return first_index
+
+    def replace(self, entry_index: int, entry: WalletEntry) -> None:
+        """
+        Заменить данные существующей записи.
+
+        Args:
+            entry_index (int): номер записи.
+            entry (WalletEntry): запись с новыми данными.
+        """
+
+        self.dates[entry_index] = entry.date.toordinal()
+        self.categories[entry_index] = entry.category
+        self.amounts[entry_index] = entry.cents
+        self.descriptions[entry_index] = self.intern(entry.description)
+
+    def row(self, entry_index: int) -> Tuple[int, int, int, str]:
+        """
+        Получить сырые данные записи без создания WalletEntry.
+
+        Args:
+            entry_index (int): номер записи.
+
+        Returns:
+            Tuple[int, int, int, str]: порядковый номер даты, категория,
+                                       сумма в копейках и описание.
+        """
+
+        return (
+            self.dates[entry_index],
+            self.categories[entry_index],
+            self.amounts[entry_index],
+            self.strings[self.descriptions[entry_index]],
+        )
+
+    def entry(self, entry_index: int) -> WalletEntry:
+        """
+        Создать объект WalletEntry для записи.
+
+        Args:
+            entry_index (int): номер записи.
+
+        Returns:
+            WalletEntry
+        """
+
+        return WalletEntry.from_row(self.row(entry_index))
+
+    def items(self) -> Iterator[Tuple[int, WalletEntry]]:
+        """ Последовательно получить все записи с их номерами. """
+
+        for entry_index in range(len(self.dates)):
+            yield entry_index, self.entry(entry_index)
+
+
+class MappedStorage(ColumnarStorage):
+    """
+    Хранилище записей только для чтения поверх отображённого в память
+    файла.
+
+    Колонки являются представлениями memoryview над файлом, а описания
+    декодируются из кучи строк при обращении, поэтому открытие хранилища
+    не читает записи, а чтение затрагивает только нужные страницы.
+    Для изменения записей хранилище копируется методом writable.
+    """
+
+    def __init__(
+        self,
+        dates: Sequence[int],
+        categories: Sequence[int],
+        amounts: Sequence[int],
+        descriptions: Sequence[int],
+        strings: Sequence[str],
+    ):
+        """
+        Args:
+            dates (Sequence[int]): порядковые номера дат записей.
+            categories (Sequence[int]): категории записей.
+            amounts (Sequence[int]): суммы записей в копейках.
+            descriptions (Sequence[int]): индексы описаний в таблице строк.
+            strings (Sequence[str]): таблица строк описаний.
+        """
+        super().__init__()
+        self.dates = dates
+        self.categories = categories
+        self.amounts = amounts
+        self.descriptions = descriptions
+        self.strings = strings
+
+    def writable(self) -> ColumnarStorage:
+        storage = self.snapshot()
+        storage._string_ids = {
+            string: string_id
+            for string_id, string in enumerate(storage.strings)
+        }
+        return storage
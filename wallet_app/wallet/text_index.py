@@ -0,0 +1,439 @@
+from array import array
+from bisect import bisect_left, insort
+import re
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+QUERY_PATTERN = re.compile(r"(\w+)(\*?)")
+
+FUZZY_THRESHOLD = 0.3
+
+# Транслитерация кириллицы, чтобы "Пятёрочка" и "Pyaterochka"
+# имели общие триграммы.
+TRANSLITERATION = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e",
+    "ё": "e", "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k",
+    "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "",
+    "э": "e", "ю": "yu", "я": "ya",
+})
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Разбить текст на слова без учёта регистра.
+
+    Args:
+        text (str): текст описания.
+
+    Returns:
+        Set[str]: различные слова текста.
+    """
+    return set(TOKEN_PATTERN.findall(text.casefold()))
+
+
+def parse_text_query(query: str) -> List[Tuple[str, bool]]:
+    """
+    Разобрать текстовый запрос на слова.
+
+    Слово, оканчивающееся на "*", ищется как префикс.
+
+    Args:
+        query (str): текстовый запрос.
+
+    Returns:
+        List[Tuple[str, bool]]: слово и признак поиска по префиксу.
+    """
+    return [
+        (term, bool(prefix))
+        for term, prefix in QUERY_PATTERN.findall(query.casefold())
+    ]
+
+
+def text_matches(text: str, terms: List[Tuple[str, bool]]) -> bool:
+    """
+    Содержит ли текст все слова разобранного запроса.
+
+    Args:
+        text (str): текст описания.
+        terms (List[Tuple[str, bool]]): слова запроса, см. parse_text_query.
+
+    Returns:
+        bool
+    """
+    tokens = tokenize(text)
+    return all(
+        any(token.startswith(term) for token in tokens)
+        if prefix else term in tokens
+        for term, prefix in terms
+    )
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Триграммы слов текста для нечёткого сравнения.
+
+    Args:
+        text (str): текст описания.
+
+    Returns:
+        Set[str]: различные триграммы слов, дополненных пробелами.
+    """
+    grams = set()
+    for word in TOKEN_PATTERN.findall(
+        text.casefold().translate(TRANSLITERATION)
+    ):
+        padded = "  " + word + " "
+        grams.update(padded[idx:idx + 3] for idx in range(len(word) + 1))
+    return grams
+
+
+class TokenIndex:
+    """
+    Инвертированный индекс слов описаний записей.
+
+    Для каждого слова хранится упорядоченный список номеров записей,
+    а отсортированный словарь позволяет находить слова по префиксу.
+    Поиск пересекает списки, начиная с самого короткого, поэтому его
+    стоимость зависит от числа совпадений, а не от размера кошелька.
+    """
+    _postings: Dict[str, array]
+    _terms: List[str]
+
+    def __init__(self):
+        self._postings = {}
+        self._terms = []
+
+    def add(self, entry_index: int, text: str) -> None:
+        """
+        Добавить описание записи в индекс.
+
+        Args:
+            entry_index (int): номер записи.
+            text (str): описание записи.
+        """
+
+        for token in tokenize(text):
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = array("l", [entry_index])
+                insort(self._terms, token)
+            elif postings[-1] < entry_index:
+                postings.append(entry_index)
+            else:
+                postings.insert(
+                    bisect_left(postings, entry_index),
+                    entry_index,
+                )
+
+    def extend(
+        self,
+        entry_indexes: Iterable[int],
+        texts: Sequence[str],
+    ) -> None:
+        """
+        Добавить в индекс блок записей.
+
+        Номера добавляемых записей должны возрастать и быть больше номеров
+        уже учтённых записей. Повторяющиеся описания разбиваются на слова
+        один раз.
+
+        Args:
+            entry_indexes (Iterable[int]): номера записей.
+            texts (Sequence[str]): описания записей.
+        """
+
+        tokens_cache = {}
+        added_terms = False
+        for entry_index, text in zip(entry_indexes, texts):
+            tokens = tokens_cache.get(text)
+            if tokens is None:
+                tokens = tokens_cache[text] = tokenize(text)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    self._postings[token] = array("l", [entry_index])
+                    added_terms = True
+                else:
+                    postings.append(entry_index)
+
+        if added_terms:
+            self._terms = sorted(self._postings)
+
+    def remove(self, entry_index: int, text: str) -> None:
+        """
+        Удалить описание записи из индекса.
+
+        Args:
+            entry_index (int): номер записи.
+            text (str): описание записи.
+        """
+
+        for token in tokenize(text):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            position = bisect_left(postings, entry_index)
+            if position < len(postings) and postings[position] == entry_index:
+                del postings[position]
+            if not postings:
+                del self._postings[token]
+                del self._terms[bisect_left(self._terms, token)]
+
+    def search(self, query: str) -> List[int]:
+        """
+        Найти записи, описания которых содержат все слова запроса.
+
+        Args:
+            query (str): слова через пробел, "*" в конце слова - поиск
+                         по префиксу.
+
+        Returns:
+            List[int]: номера записей по возрастанию.
+        """
+
+        terms = parse_text_query(query)
+        if not terms:
+            return []
+
+        postings = []
+        for term, prefix in terms:
+            if prefix:
+                postings.append(self._prefix_postings(term))
+            else:
+                postings.append(self._postings.get(term, ()))
+
+        postings.sort(key=len)
+        result = list(postings[0])
+        for other in postings[1:]:
+            if not result:
+                break
+            result = [
+                entry_index
+                for entry_index in result
+                if self._contains(other, entry_index)
+            ]
+        return result
+
+    def _prefix_postings(self, prefix: str) -> Sequence[int]:
+        """ Номера записей со словами, начинающимися с prefix. """
+        position = bisect_left(self._terms, prefix)
+        lists = []
+        while position < len(self._terms) and \
+                self._terms[position].startswith(prefix):
+            lists.append(self._postings[self._terms[position]])
+            position += 1
+
+        if len(lists) == 1:
+            return lists[0]
+        return sorted(set().union(*lists))
+
+    @staticmethod
+    def _contains(postings: Sequence[int], entry_index: int) -> bool:
+        position = bisect_left(postings, entry_index)
+        return position < len(postings) and postings[position] == entry_index
+
+
+class TrigramIndex:
+    """
+    Индекс триграмм описаний для нечёткого поиска.
+
+    Описание приводится к нижнему регистру и латинице, каждое слово
+    дополняется пробелами и разбивается на триграммы. Для каждой
+    триграммы хранится множество описаний, в которых она встречается.
+    Сходство запроса и описания - доля общих триграмм (коэффициент
+    Жаккара). Поиск просматривает только описания, имеющие общие
+    с запросом триграммы, и не сравнивает запрос со всеми записями.
+    Каждое различное описание учитывается в индексе один раз.
+    """
+    _postings: Dict[str, Set[str]]
+    _sizes: Dict[str, int]
+    _counts: Dict[str, int]
+
+    def __init__(self):
+        self._postings = {}
+        self._sizes = {}
+        self._counts = {}
+
+    def add(self, text: str, count: int = 1) -> None:
+        """
+        Учесть описание в индексе.
+
+        Args:
+            text (str): описание записи.
+            count (int): количество записей с этим описанием.
+        """
+
+        if text in self._counts:
+            self._counts[text] += count
+            return
+
+        grams = trigrams(text)
+        self._counts[text] = count
+        self._sizes[text] = len(grams)
+        for gram in grams:
+            texts = self._postings.get(gram)
+            if texts is None:
+                self._postings[gram] = {text}
+            else:
+                texts.add(text)
+
+    def remove(self, text: str) -> None:
+        """
+        Исключить описание одной записи из индекса.
+
+        Args:
+            text (str): описание записи.
+        """
+
+        count = self._counts.get(text)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[text] = count - 1
+            return
+
+        del self._counts[text]
+        del self._sizes[text]
+        for gram in trigrams(text):
+            texts = self._postings[gram]
+            texts.discard(text)
+            if not texts:
+                del self._postings[gram]
+
+    def similar(
+        self,
+        query: str,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> List[Tuple[str, float]]:
+        """
+        Найти описания, похожие на запрос.
+
+        Args:
+            query (str): искомый текст.
+            threshold (float): минимальное сходство от 0 до 1.
+
+        Returns:
+            List[Tuple[str, float]]: описания и их сходство с запросом
+            по убыванию сходства.
+        """
+
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for text in self._postings.get(gram, ()):
+                shared[text] = shared.get(text, 0) + 1
+
+        result = []
+        for text, common in shared.items():
+            score = common / (len(grams) + self._sizes[text] - common)
+            if score >= threshold:
+                result.append((text, score))
+        result.sort(key=lambda item: (-item[1], item[0]))
+        return result
+
+
+class FuzzyIndex:
+    """
+    Индекс нечёткого поиска записей по описанию.
+
+    Хранит индекс триграмм различных описаний и номера записей
+    с каждым описанием.
+    """
+    trigrams: TrigramIndex
+    _entries: Dict[str, array]
+
+    def __init__(self):
+        self.trigrams = TrigramIndex()
+        self._entries = {}
+
+    def add(self, entry_index: int, text: str) -> None:
+        """
+        Добавить описание записи в индекс.
+
+        Args:
+            entry_index (int): номер записи.
+            text (str): описание записи.
+        """
+
+        entries = self._entries.get(text)
+        if entries is None:
+            self._entries[text] = array("l", [entry_index])
+        elif entries[-1] < entry_index:
+            entries.append(entry_index)
+        else:
+            entries.insert(bisect_left(entries, entry_index), entry_index)
+        self.trigrams.add(text)
+
+    def extend(
+        self,
+        entry_indexes: Iterable[int],
+        texts: Sequence[str],
+    ) -> None:
+        """
+        Добавить в индекс блок записей.
+
+        Номера добавляемых записей должны возрастать и быть больше номеров
+        уже учтённых записей.
+
+        Args:
+            entry_indexes (Iterable[int]): номера записей.
+            texts (Sequence[str]): описания записей.
+        """
+
+        added = {}
+        for entry_index, text in zip(entry_indexes, texts):
+            entries = self._entries.get(text)
+            if entries is None:
+                entries = self._entries[text] = array("l")
+            entries.append(entry_index)
+            added[text] = added.get(text, 0) + 1
+
+        for text, count in added.items():
+            self.trigrams.add(text, count)
+
+    def remove(self, entry_index: int, text: str) -> None:
+        """
+        Удалить описание записи из индекса.
+
+        Args:
+            entry_index (int): номер записи.
+            text (str): описание записи.
+        """
+
+        entries = self._entries.get(text)
+        if entries is None:
+            return
+        position = bisect_left(entries, entry_index)
+        if position < len(entries) and entries[position] == entry_index:
+            del entries[position]
+            self.trigrams.remove(text)
+        if not entries:
+            del self._entries[text]
+
+    def search(
+        self,
+        query: str,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> List[int]:
+        """
+        Найти записи с описаниями, похожими на запрос.
+
+        Args:
+            query (str): искомый текст.
+            threshold (float): минимальное сходство от 0 до 1.
+
+        Returns:
+            List[int]: номера записей по убыванию сходства описания,
+            при равном сходстве - по возрастанию номера.
+        """
+
+        ranked = []
+        for text, score in self.trigrams.similar(query, threshold):
+            ranked.extend((-score, idx) for idx in self._entries[text])
+        ranked.sort()
+        return [entry_index for _, entry_index in ranked]
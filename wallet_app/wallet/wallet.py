@@ -1,62 +1,279 @@
+from dataclasses import dataclass, field
 import datetime
 from enum import IntEnum
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import islice
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence,
+    Tuple, TYPE_CHECKING,
+)
 
 from utils import filters
-from wallet.entry import EntryCategory, WalletEntry
+from wallet.entry import (
+    EntryCategory, EntryDecoder, WalletEntry, from_cents, to_cents,
+)
+from wallet.indexes import DatePrefixSums, SortedIndex
+from wallet.rollups import RollupPeriod, Rollups, bucket_label
+from wallet.storage import ColumnarStorage
+from wallet.text_index import FuzzyIndex, FUZZY_THRESHOLD, TokenIndex
+
+if TYPE_CHECKING:
+    from wallet.query import Query
 
 
 class SearchField(IntEnum):
     Category = 1,
     Date = 2,
     Amount = 3
+    DateRange = 4
+    AmountRange = 5
+    LargestSpends = 6
+    LargestIncomes = 7
+    Description = 8
+    Text = 9
+    Fuzzy = 10
+
+
+class PageOrder(IntEnum):
+    """ Порядок постраничного просмотра записей. """
+    Id = 1
+    Date = 2
 
 
 FILTER_FUNCS = {
     SearchField.Category: filters.category_filter,
     SearchField.Date: filters.date_filter,
     SearchField.Amount: filters.amount_filter,
+    SearchField.DateRange: filters.date_range_filter,
+    SearchField.AmountRange: filters.amount_range_filter,
+    SearchField.Description: filters.description_filter,
+    SearchField.Text: filters.text_filter,
+    SearchField.Fuzzy: filters.fuzzy_filter,
+}
+
+LOAD_BATCH_SIZE = 10000
+
+INDEXED_SEARCHES = {
+    SearchField.Date: "_search_date",
+    SearchField.DateRange: "_search_date_range",
+    SearchField.Amount: "_search_amount",
+    SearchField.AmountRange: "_search_amount_range",
+    SearchField.LargestSpends: "_search_largest_spends",
+    SearchField.LargestIncomes: "_search_largest_incomes",
+    SearchField.Text: "_search_text",
+    SearchField.Fuzzy: "_search_fuzzy",
 }
 
 
+@dataclass
+class BulkInsertReport:
+    """ Результат пакетного добавления записей. """
+    first_index: int
+    added: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+
 class Wallet:
-    """ Класс, представляющий кошелёк. """
-    _entries: Dict[int, WalletEntry]
-    _total: Dict[EntryCategory, float]
+    """
+    Класс, представляющий кошелёк.
+
+    Записи хранятся в колоночном хранилище, суммы - в копейках.
+    Индексы кошелька, загруженного из файла, строятся при первом
+    обращении к ним.
+    """
+    _storage: ColumnarStorage
+    _total: Dict[EntryCategory, int]
+    _indexed: bool
+    _date_index: SortedIndex
+    _amount_index: Dict[EntryCategory, SortedIndex]
+    _date_totals: DatePrefixSums
+    _rollups: Rollups
+    _text_index: Optional[TokenIndex]
+    _fuzzy_index: Optional[FuzzyIndex]
+    _listeners: List[Callable[[int, bool], None]]
 
     def __init__(self, entries: Optional[List[WalletEntry]] = None):
         """
         Args:
             entries (List[WalletEntry]): список записей кошелька.
         """
-        self._entries = {}
+        self._storage = ColumnarStorage()
         self._total = {
             EntryCategory.Income: 0,
             EntryCategory.Spend: 0,
         }
+        self._date_index = SortedIndex()
+        self._amount_index = {
+            EntryCategory.Income: SortedIndex(),
+            EntryCategory.Spend: SortedIndex(),
+        }
+        self._date_totals = DatePrefixSums(EntryCategory)
+        self._rollups = Rollups()
+        # Индексы описаний строятся при первом поиске по ним.
+        self._text_index = None
+        self._fuzzy_index = None
+        self._indexed = True
+        self._listeners = []
 
         if entries:
-            for idx, entry in enumerate(entries):
-                self._entries[idx] = entry
-                self._total[entry.category] += entry.amount
+            self.add_entries(entries)
 
     @property
     def balance(self) -> float:
         """ Текущий баланс кошелька. """
-        return round(
-            self._total[EntryCategory.Income] - self._total[EntryCategory.Spend],
-            2,
+        return from_cents(
+            self._total[EntryCategory.Income] - self._total[EntryCategory.Spend]
         )
 
     @property
     def total_income(self) -> float:
         """ Сумма доходов кошелька. """
-        return round(self._total[EntryCategory.Income], 2)
+        return from_cents(self._total[EntryCategory.Income])
 
     @property
     def total_spending(self) -> float:
         """ Сумма расходов кошелька. """
-        return round(self._total[EntryCategory.Spend], 2)
+        return from_cents(self._total[EntryCategory.Spend])
+
+    @property
+    def storage(self) -> ColumnarStorage:
+        """ Хранилище записей кошелька. """
+        return self._storage
+
+    @property
+    def totals(self) -> Dict[EntryCategory, int]:
+        """ Суммы доходов и расходов кошелька в копейках. """
+        return dict(self._total)
+
+    def balance_as_of(self, date: datetime.date) -> float:
+        """
+        Баланс кошелька на конец указанной даты.
+
+        Args:
+            date (datetime.date): дата.
+
+        Returns:
+            float
+        """
+        return self.balance_between(end=date)
+
+    def income_as_of(self, date: datetime.date) -> float:
+        """
+        Сумма доходов кошелька по указанную дату включительно.
+
+        Args:
+            date (datetime.date): дата.
+
+        Returns:
+            float
+        """
+        return self.income_between(end=date)
+
+    def spending_as_of(self, date: datetime.date) -> float:
+        """
+        Сумма расходов кошелька по указанную дату включительно.
+
+        Args:
+            date (datetime.date): дата.
+
+        Returns:
+            float
+        """
+        return self.spending_between(end=date)
+
+    def balance_between(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> float:
+        """
+        Разница доходов и расходов кошелька за период.
+
+        Args:
+            start (Optional[datetime.date]): начало периода включительно,
+                                             None - без ограничения.
+            end (Optional[datetime.date]): конец периода включительно,
+                                           None - без ограничения.
+
+        Returns:
+            float
+        """
+        return from_cents(
+            self._period_total(EntryCategory.Income, start, end)
+            - self._period_total(EntryCategory.Spend, start, end)
+        )
+
+    def income_between(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> float:
+        """
+        Сумма доходов кошелька за период.
+
+        Args:
+            start (Optional[datetime.date]): начало периода включительно,
+                                             None - без ограничения.
+            end (Optional[datetime.date]): конец периода включительно,
+                                           None - без ограничения.
+
+        Returns:
+            float
+        """
+        return from_cents(
+            self._period_total(EntryCategory.Income, start, end)
+        )
+
+    def spending_between(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> float:
+        """
+        Сумма расходов кошелька за период.
+
+        Args:
+            start (Optional[datetime.date]): начало периода включительно,
+                                             None - без ограничения.
+            end (Optional[datetime.date]): конец периода включительно,
+                                           None - без ограничения.
+
+        Returns:
+            float
+        """
+        return from_cents(
+            self._period_total(EntryCategory.Spend, start, end)
+        )
+
+    def rollup(self, period: RollupPeriod) -> List[Tuple[str, float, float]]:
+        """
+        Доходы и расходы кошелька по дням, неделям, месяцам или годам.
+
+        Args:
+            period (RollupPeriod): период группировки.
+
+        Returns:
+            List[Tuple[str, float, float]]: подпись периода, сумма доходов
+            и сумма расходов, упорядоченные по времени.
+        """
+        self._ensure_indexed()
+        return [
+            (bucket_label(period, key), from_cents(income), from_cents(spend))
+            for key, (income, spend, _, _) in self._rollups.report(period)
+        ]
+
+    def _period_total(
+        self,
+        category: EntryCategory,
+        start: Optional[datetime.date],
+        end: Optional[datetime.date],
+    ) -> int:
+        """ Сумма категории за период в копейках. """
+        self._ensure_indexed()
+        return self._date_totals.total(
+            category,
+            start.toordinal() if start else None,
+            end.toordinal() if end else None,
+        )
 
     def add_entry(self, new_entry: WalletEntry) -> None:
         """
@@ -66,9 +283,65 @@ class Wallet:
             new_entry (WalletEntry): добавляемая запись.
         """
 
-        self._entries[len(self._entries)] = new_entry
+        self._prepare_for_update()
+        entry_index = self._storage.append(new_entry)
+        self._index_entry(entry_index)
+        self._notify(entry_index, True)
+
+    def add_entries(self, entries: Iterable[Any]) -> BulkInsertReport:
+        """
+        Добавить блок записей.
 
-        self._total[new_entry.category] += new_entry.amount
+        Записи проверяются за один проход, получают номера одним блоком,
+        а итоги и индексы обновляются один раз на весь блок.
+        Некорректные записи пропускаются и попадают в отчёт.
+
+        Args:
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+
+        Returns:
+            BulkInsertReport: номер первой добавленной записи,
+            количество добавленных записей и ошибки по номерам строк.
+        """
+        report = BulkInsertReport(first_index=len(self._storage))
+        rows = EntryDecoder().decode(entries, 0, report.errors)
+        self._add_rows(rows, report)
+        return report
+
+    def _add_rows(
+        self,
+        rows: List[Tuple[int, int, int, str]],
+        report: BulkInsertReport,
+    ) -> None:
+        """
+        Добавить блок проверенных полей записей, см. entry_fields.
+
+        Args:
+            rows (List[Tuple[int, int, int, str]]): поля записей.
+            report (BulkInsertReport): отчёт, в котором отмечаются
+                                       номер первой и количество
+                                       добавленных записей.
+        """
+        report.first_index = len(self._storage)
+        if not rows:
+            return
+
+        self._prepare_for_update()
+        self._storage.extend(rows)
+        report.added = len(rows)
+        self._index_entries(report.first_index, len(rows))
+
+        if self._listeners:
+            for entry_index in range(
+                report.first_index,
+                report.first_index + report.added,
+            ):
+                self._notify(entry_index, True)
+
+    def extend(self, entries: Iterable[Any]) -> BulkInsertReport:
+        """ Синоним add_entries. """
+        return self.add_entries(entries)
 
     def __setitem__(self, entry_index: int, updated_entry: WalletEntry) -> None:
         """
@@ -79,36 +352,257 @@ class Wallet:
             updated_entry (WalletEntry): запись с обновлёнными данными.
         """
 
-        old_entry = self._entries.get(entry_index)
-
-        if not old_entry:
+        if not self._has_entry(entry_index):
             print('Несуществующая запись.\n')
             return
 
-        self._total[old_entry.category] -= old_entry.amount
+        self._prepare_for_update()
+        self._unindex_entry(entry_index)
+        self._storage.replace(entry_index, updated_entry)
+        self._index_entry(entry_index)
+        self._notify(entry_index, False)
+
+    def add_listener(self, listener: Callable[[int, bool], None]) -> None:
+        """
+        Подписаться на изменения записей кошелька.
 
-        self._entries[entry_index] = updated_entry
+        Args:
+            listener (Callable[[int, bool], None]): вызывается после
+                добавления или изменения записи с её номером и признаком
+                того, что запись добавлена.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, bool], None]) -> None:
+        """
+        Отписаться от изменений записей кошелька.
+
+        Args:
+            listener (Callable[[int, bool], None]): ранее добавленный
+                                                    подписчик.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, entry_index: int, created: bool) -> None:
+        """ Сообщить подписчикам об изменении записи. """
+        for listener in self._listeners:
+            listener(entry_index, created)
+
+    def _index_entry(self, entry_index: int) -> None:
+        """ Учесть запись в итогах и индексах кошелька. """
+        storage = self._storage
+        ordinal = storage.dates[entry_index]
+        category = storage.categories[entry_index]
+        amount = storage.amounts[entry_index]
+
+        self._total[category] += amount
+        self._date_index.insert(ordinal, entry_index)
+        self._amount_index[category].insert(amount, entry_index)
+        self._date_totals.add(ordinal, category, amount)
+        self._rollups.add(ordinal, category, amount)
+        description = storage.strings[storage.descriptions[entry_index]]
+        if self._text_index is not None:
+            self._text_index.add(entry_index, description)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(entry_index, description)
+
+    def _index_entries(self, first_index: int, count: int) -> None:
+        """
+        Учесть блок записей в итогах и, если индексы уже построены,
+        в индексах кошелька.
+        """
+        storage = self._storage
+        last_index = first_index + count
+        categories = storage.categories[first_index:last_index]
+        amounts = storage.amounts[first_index:last_index]
+
+        for category in self._total:
+            self._total[category] += sum(
+                amount
+                for entry_category, amount in zip(categories, amounts)
+                if entry_category == category
+            )
+
+        if self._indexed:
+            self._build_indexes(first_index, count)
+
+        # Индексы описаний не зависят от остальных индексов и, если уже
+        # построены, дополняются сразу.
+        if self._text_index is not None or self._fuzzy_index is not None:
+            descriptions = self._descriptions(first_index, last_index)
+            entry_indexes = range(first_index, last_index)
+            if self._text_index is not None:
+                self._text_index.extend(entry_indexes, descriptions)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.extend(entry_indexes, descriptions)
+
+    def _ensure_indexed(self) -> None:
+        """ Построить индексы кошелька, если они ещё не построены. """
+        if self._indexed:
+            return
 
-        self._total[updated_entry.category] += updated_entry.amount
+        self._indexed = True
+        self._build_indexes(0, len(self._storage))
+
+    def _prepare_for_update(self) -> None:
+        """
+        Подготовить кошелёк к изменению: построить индексы и перейти
+        к изменяемому хранилищу, если записи загружены только для чтения.
+        """
+        self._ensure_indexed()
+        self._storage = self._storage.writable()
+
+    def _build_indexes(self, first_index: int, count: int) -> None:
+        """ Добавить блок записей в индексы кошелька. """
+        storage = self._storage
+        last_index = first_index + count
+        ordinals = storage.dates[first_index:last_index]
+        categories = storage.categories[first_index:last_index]
+        amounts = storage.amounts[first_index:last_index]
+        entry_indexes = range(first_index, last_index)
+
+        for category, index in self._amount_index.items():
+            category_indexes = [
+                entry_index
+                for entry_index, entry_category in zip(
+                    entry_indexes,
+                    categories,
+                )
+                if entry_category == category
+            ]
+            index.extend(
+                [storage.amounts[idx] for idx in category_indexes],
+                category_indexes,
+            )
+
+        self._date_index.extend(ordinals, entry_indexes)
+        self._date_totals.extend(ordinals, categories, amounts)
+        self._rollups.extend(ordinals, categories, amounts)
+
+    def _descriptions(self, first_index: int, last_index: int) -> List[str]:
+        """ Описания записей с номерами в диапазоне [first, last). """
+        strings = self._storage.strings
+        return [
+            strings[string_id]
+            for string_id in self._storage.descriptions[first_index:last_index]
+        ]
+
+    def _get_text_index(self) -> TokenIndex:
+        """ Индекс слов описаний, строится при первом обращении. """
+        if self._text_index is None:
+            count = len(self._storage)
+            self._text_index = TokenIndex()
+            self._text_index.extend(range(count), self._descriptions(0, count))
+        return self._text_index
+
+    def _get_fuzzy_index(self) -> FuzzyIndex:
+        """ Индекс триграмм описаний, строится при первом обращении. """
+        if self._fuzzy_index is None:
+            count = len(self._storage)
+            self._fuzzy_index = FuzzyIndex()
+            self._fuzzy_index.extend(
+                range(count),
+                self._descriptions(0, count),
+            )
+        return self._fuzzy_index
+
+    def _unindex_entry(self, entry_index: int) -> None:
+        """ Исключить запись из итогов и индексов кошелька. """
+        storage = self._storage
+        ordinal = storage.dates[entry_index]
+        category = storage.categories[entry_index]
+        amount = storage.amounts[entry_index]
+
+        self._total[category] -= amount
+        self._date_index.remove(ordinal, entry_index)
+        self._amount_index[category].remove(amount, entry_index)
+        self._date_totals.add(ordinal, category, -amount)
+        self._rollups.remove(ordinal, category, amount)
+        description = storage.strings[storage.descriptions[entry_index]]
+        if self._text_index is not None:
+            self._text_index.remove(entry_index, description)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(entry_index, description)
 
     def __getitem__(self, entry_index: int) -> Any:
         """ Получение записи или списка записей. """
 
         if isinstance(entry_index, int):
-            entry = self._entries.get(entry_index)
-            if not entry:
+            if not self._has_entry(entry_index):
                 return
-            return entry_index, entry
+            return entry_index, self._storage.entry(entry_index)
 
-        return list(
-            zip(
-                list(self._entries.keys())[entry_index],
-                list(self._entries.values())[entry_index],
-            )
-        )
+        return [
+            (idx, self._storage.entry(idx))
+            for idx in range(len(self._storage))[entry_index]
+        ]
 
     def __len__(self):
-        return len(self._entries)
+        return len(self._storage)
+
+    def _has_entry(self, entry_index: int) -> bool:
+        """ Проверить существование записи с указанным номером. """
+        return 0 <= entry_index < len(self._storage)
+
+    def page(
+        self,
+        order: PageOrder = PageOrder.Id,
+        after: Any = None,
+        before: Any = None,
+        limit: int = 5,
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Страница записей, следующих за ключом или предшествующих ему.
+
+        Ключ записи - её номер для порядка по номерам и пара
+        (порядковый номер даты, номер записи) для порядка по датам.
+        Страница находится по ключу без просмотра предыдущих записей,
+        поэтому её получение не зависит от размера кошелька.
+
+        Args:
+            order (PageOrder): порядок просмотра.
+            after: ключ, после которого начинается страница,
+                   None - с начала кошелька.
+            before: ключ, перед которым заканчивается страница.
+            limit (int): количество записей на странице.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи в порядке просмотра.
+        """
+        if order == PageOrder.Id:
+            if before is not None:
+                return self[max(0, before - limit):max(0, before)]
+            start = 0 if after is None else after + 1
+            return self[start:start + limit]
+
+        self._ensure_indexed()
+        if before is not None:
+            stop = self._date_index.position(*before)
+            start = max(0, stop - limit)
+        else:
+            start = 0 if after is None else \
+                self._date_index.position(after[0], after[1] + 1)
+            stop = start + limit
+        return self._materialize(self._date_index.ids[start:stop])
+
+    def count_after(self, order: PageOrder, key: Any) -> int:
+        """
+        Количество записей, следующих за ключом в порядке просмотра.
+
+        Args:
+            order (PageOrder): порядок просмотра.
+            key: ключ записи, см. page.
+
+        Returns:
+            int
+        """
+        if order == PageOrder.Id:
+            return max(0, len(self) - key - 1)
+
+        self._ensure_indexed()
+        return len(self._date_index) - \
+            self._date_index.position(key[0], key[1] + 1)
 
     def find_entries(
         self,
@@ -125,30 +619,430 @@ class Wallet:
         Returns:
             List[Tuple[int, WalletEntry]]
         """
+        indexed_search = INDEXED_SEARCHES.get(search_field)
+        if indexed_search:
+            return getattr(self, indexed_search)(value)
+
         return list(
-            filter(FILTER_FUNCS[search_field](value), self._entries.items())
+            filter(FILTER_FUNCS[search_field](value), self._storage.items())
         )
 
+    def find_by_date_range(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Поиск записей за период по индексу дат.
+
+        Args:
+            start (Optional[datetime.date]): начало периода включительно,
+                                             None - без ограничения.
+            end (Optional[datetime.date]): конец периода включительно,
+                                           None - без ограничения.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи, упорядоченные по дате.
+        """
+        self._ensure_indexed()
+        return self._materialize(
+            self._date_index.range(
+                start.toordinal() if start else None,
+                end.toordinal() if end else None,
+            )
+        )
+
+    def find_by_amount_range(
+        self,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Поиск записей с суммой в диапазоне по индексу сумм.
+
+        Args:
+            minimum (Optional[float]): минимальная сумма включительно,
+                                       None - без ограничения.
+            maximum (Optional[float]): максимальная сумма включительно,
+                                       None - без ограничения.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи, упорядоченные по сумме.
+        """
+        self._ensure_indexed()
+        lower = None if minimum is None else to_cents(minimum)
+        upper = None if maximum is None else to_cents(maximum)
+        amounts = self._storage.amounts
+
+        entry_indexes = []
+        for index in self._amount_index.values():
+            entry_indexes.extend(index.range(lower, upper))
+        entry_indexes.sort(key=lambda idx: (amounts[idx], idx))
+
+        return self._materialize(entry_indexes)
+
+    def find_largest(
+        self,
+        category: EntryCategory,
+        count: int,
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Поиск записей категории с наибольшими суммами.
+
+        Args:
+            category (EntryCategory): категория записей.
+            count (int): количество записей.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи по убыванию суммы.
+        """
+        if count <= 0:
+            return []
+
+        self._ensure_indexed()
+        index = self._amount_index[category]
+        return self._materialize(reversed(index.ids[-count:]))
+
+    def find_similar(
+        self,
+        text: str,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Нечёткий поиск записей по описанию с помощью индекса триграмм.
+
+        Args:
+            text (str): искомый текст описания.
+            threshold (float): минимальное сходство описания от 0 до 1.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи по убыванию сходства.
+        """
+        return self._materialize(
+            self._get_fuzzy_index().search(text, threshold),
+        )
+
+    def query(self, query: "Query") -> List[Tuple[int, WalletEntry]]:
+        """
+        Поиск записей по составному запросу.
+
+        Args:
+            query (Query): запрос из условий, объединённых через И/ИЛИ.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи в порядке их номеров.
+        """
+        return query.execute(self)
+
+    def explain(self, query: "Query") -> str:
+        """
+        Описание плана выполнения составного запроса.
+
+        Args:
+            query (Query): запрос из условий, объединённых через И/ИЛИ.
+
+        Returns:
+            str
+        """
+        return query.explain(self)
+
+    def entries_at(
+        self,
+        entry_indexes: Iterable[int],
+    ) -> List[Tuple[int, WalletEntry]]:
+        """
+        Записи кошелька по их номерам.
+
+        Args:
+            entry_indexes (Iterable[int]): номера записей.
+
+        Returns:
+            List[Tuple[int, WalletEntry]]: записи в порядке номеров
+            entry_indexes.
+        """
+        return self._materialize(entry_indexes)
+
+    def index_slices(
+        self,
+        search_field: SearchField,
+        value: Any,
+    ) -> Optional[List[Tuple[Sequence[int], int, int]]]:
+        """
+        Участки индексов, содержащие записи, подходящие под условие.
+
+        Используется планировщиком составных запросов для оценки
+        избирательности условий и отбора записей без полного просмотра.
+
+        Args:
+            search_field (SearchField): поле условия.
+            value: значение условия.
+
+        Returns:
+            List[Tuple[Sequence[int], int, int]]: номера записей индекса
+            и границы позиций в них, или None, если для поля нет индекса.
+        """
+        self._ensure_indexed()
+        if search_field == SearchField.Category:
+            category = filters.parse_category(value)
+            if category is None:
+                return []
+            index = self._amount_index[category]
+            return [(index.ids, 0, len(index))]
+
+        if search_field in (SearchField.Date, SearchField.DateRange):
+            if search_field == SearchField.Date:
+                date = filters.parse_date(value)
+                date_range = None if date is None else (date, date)
+            else:
+                date_range = filters.parse_date_range(value)
+            if date_range is None:
+                return []
+            lower, upper = (
+                None if bound is None else bound.toordinal()
+                for bound in date_range
+            )
+            return [
+                (self._date_index.ids, *self._date_index.bounds(lower, upper)),
+            ]
+
+        if search_field in (SearchField.Amount, SearchField.AmountRange):
+            if search_field == SearchField.Amount:
+                amount = filters.parse_amount(value)
+                amount_range = None if amount is None else (amount, amount)
+            else:
+                amount_range = filters.parse_amount_range(value)
+            if amount_range is None:
+                return []
+            lower, upper = (
+                None if bound is None else to_cents(bound)
+                for bound in amount_range
+            )
+            return [
+                (index.ids, *index.bounds(lower, upper))
+                for index in self._amount_index.values()
+            ]
+
+        if search_field == SearchField.Text:
+            entry_indexes = self._get_text_index().search(value) \
+                if isinstance(value, str) else []
+            return [(entry_indexes, 0, len(entry_indexes))]
+
+        if search_field == SearchField.Fuzzy:
+            entry_indexes = self._get_fuzzy_index().search(value) \
+                if isinstance(value, str) else []
+            return [(entry_indexes, 0, len(entry_indexes))]
+
+    def _search_date(self, value: Any) -> List[Tuple[int, WalletEntry]]:
+        date = filters.parse_date(value)
+        if date is None:
+            return []
+        return self.find_by_date_range(date, date)
+
+    def _search_date_range(self, value: Any) -> List[Tuple[int, WalletEntry]]:
+        date_range = filters.parse_date_range(value)
+        if date_range is None:
+            return []
+        return self.find_by_date_range(*date_range)
+
+    def _search_amount(self, value: Any) -> List[Tuple[int, WalletEntry]]:
+        amount = filters.parse_amount(value)
+        if amount is None:
+            return []
+
+        self._ensure_indexed()
+        cents = to_cents(amount)
+        entry_indexes = []
+        for index in self._amount_index.values():
+            entry_indexes.extend(index.range(cents, cents))
+        entry_indexes.sort()
+
+        return self._materialize(entry_indexes)
+
+    def _search_amount_range(
+        self,
+        value: Any,
+    ) -> List[Tuple[int, WalletEntry]]:
+        amount_range = filters.parse_amount_range(value)
+        if amount_range is None:
+            return []
+        return self.find_by_amount_range(*amount_range)
+
+    def _search_largest_spends(
+        self,
+        value: Any,
+    ) -> List[Tuple[int, WalletEntry]]:
+        count = filters.parse_count(value)
+        if count is None:
+            return []
+        return self.find_largest(EntryCategory.Spend, count)
+
+    def _search_largest_incomes(
+        self,
+        value: Any,
+    ) -> List[Tuple[int, WalletEntry]]:
+        count = filters.parse_count(value)
+        if count is None:
+            return []
+        return self.find_largest(EntryCategory.Income, count)
+
+    def _search_text(self, value: Any) -> List[Tuple[int, WalletEntry]]:
+        if not isinstance(value, str):
+            return []
+
+        return self._materialize(self._get_text_index().search(value))
+
+    def _search_fuzzy(self, value: Any) -> List[Tuple[int, WalletEntry]]:
+        if not isinstance(value, str):
+            return []
+        return self.find_similar(value)
+
+    def _materialize(
+        self,
+        entry_indexes: Iterable[int],
+    ) -> List[Tuple[int, WalletEntry]]:
+        """ Создать записи по списку их номеров. """
+        return [(idx, self._storage.entry(idx)) for idx in entry_indexes]
+
     def to_json(self):
-        return {
-            "entries": [entry.to_json() for entry in self._entries.values()]
-        }
+        return {"entries": list(self.iter_json())}
+
+    def iter_json(self) -> Iterator[Dict]:
+        """
+        Записи кошелька в виде словарей Json, по одной, без сборки
+        списка всех записей.
+        """
+        storage = self._storage
+        for date, category, amount, description in zip(
+            storage.dates,
+            storage.categories,
+            storage.amounts,
+            storage.descriptions,
+        ):
+            yield {
+                "date": datetime.date.fromordinal(date).isoformat(),
+                "category": category,
+                "amount": from_cents(amount),
+                "description": storage.strings[description],
+            }
 
     @staticmethod
-    def from_json(wallet_data: Dict) -> Optional["Wallet"]:
+    def from_json(
+        wallet_data: Dict,
+        strict: bool = True,
+    ) -> Optional["Wallet"]:
+        """
+        Создать кошелёк из данных Json вида {"entries": [...]}.
+
+        Args:
+            wallet_data (Dict): данные кошелька.
+            strict (bool): отклонить данные целиком, если хотя бы одна
+                           запись некорректна, иначе пропустить
+                           некорректные записи (см. load_entries).
+
+        Returns:
+            Wallet или None в случае некорректных данных.
+        """
         try:
             entries = wallet_data.get("entries")
-            if entries:
-                entries = [
-                    WalletEntry(
-                        date=datetime.date.fromisoformat(entry["date"]),
-                        category=EntryCategory(entry["category"]),
-                        amount=entry["amount"],
-                        description=entry["description"],
-                    )
-                    for entry in entries
-                ]
-
-            return Wallet(entries)
-        except ValueError:
+        except AttributeError:
             return
+
+        wallet, _ = Wallet.load_entries(entries or [], strict=strict)
+        return wallet
+
+    @staticmethod
+    def from_entries(
+        entries: Iterable[Any],
+        batch_size: int = LOAD_BATCH_SIZE,
+    ) -> Optional["Wallet"]:
+        """
+        Создать кошелёк из потока записей.
+
+        Записи проверяются и переносятся в хранилище блоками по batch_size,
+        поэтому поток не нужно целиком держать в памяти. Индексы
+        строятся один раз после загрузки всех записей.
+
+        Args:
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+            batch_size (int): размер блока записей.
+
+        Returns:
+            Wallet или None в случае некорректных данных.
+        """
+        wallet, _ = Wallet.load_entries(entries, batch_size, strict=True)
+        return wallet
+
+    @staticmethod
+    def load_entries(
+        entries: Iterable[Any],
+        batch_size: int = LOAD_BATCH_SIZE,
+        strict: bool = False,
+    ) -> Tuple[Optional["Wallet"], BulkInsertReport]:
+        """
+        Создать кошелёк из потока записей, собрав ошибки записей.
+
+        Записи проверяются блоками по batch_size с кэшем разобранных
+        дат (см. EntryDecoder), корректные записи загружаются за один
+        проход по потоку. Ошибка чтения самого потока отклоняет данные
+        и в нестрогом режиме.
+
+        Args:
+            entries (Iterable[Any]): записи WalletEntry или словари
+                                     с полями записи.
+            batch_size (int): размер блока записей.
+            strict (bool): отклонить данные при первой некорректной
+                           записи.
+
+        Returns:
+            Tuple[Optional[Wallet], BulkInsertReport]: кошелёк или None
+            в случае некорректных данных, количество загруженных записей
+            и ошибки по номерам записей.
+        """
+        wallet = Wallet()
+        report = BulkInsertReport(first_index=0)
+        decoder = EntryDecoder()
+        row_number = 0
+        try:
+            entries = iter(entries)
+            while True:
+                batch = list(islice(entries, batch_size))
+                if not batch:
+                    break
+                rows = decoder.decode(batch, row_number, report.errors)
+                if strict and report.errors:
+                    return None, report
+                wallet._storage.extend(rows)
+                row_number += len(batch)
+        except (TypeError, ValueError):
+            return None, report
+
+        report.added = len(wallet._storage)
+        wallet._indexed = False
+        wallet._index_entries(0, report.added)
+        return wallet, report
+
+    @staticmethod
+    def from_storage(
+        storage: ColumnarStorage,
+        totals: Dict[EntryCategory, int],
+    ) -> "Wallet":
+        """
+        Создать кошелёк поверх готового хранилища записей.
+
+        Индексы строятся при первом обращении к ним, поэтому создание
+        не требует просмотра записей.
+
+        Args:
+            storage (ColumnarStorage): хранилище записей.
+            totals (Dict[EntryCategory, int]): суммы по категориям
+                                               в копейках.
+
+        Returns:
+            Wallet
+        """
+        wallet = Wallet()
+        wallet._storage = storage
+        wallet._total.update(totals)
+        wallet._indexed = False
+        return wallet
@@ -1,9 +1,27 @@
-from typing import Callable, Dict
+from contextlib import nullcontext
+from functools import cached_property
+import os.path
+from typing import Callable, ContextManager, Dict, Optional
 
 from menu.main_menu import MainMenu, MenuOptions
 from menu.entries_menu import EntriesMenu
+from utils.autosave import WalletAutosaver
+from utils.binary_handler import BinaryHandler, is_binary_path
+from utils.journal import WalletJournal
 from utils.json_handler import JsonHandler
+from utils.metrics import Metrics, Profiler
+from utils.snapshot_cache import SnapshotCache
+from utils.wallet_files import (
+    load_json_wallet,
+    save_json_wallet,
+    save_wallet_file,
+)
+from wallet.cursor import WalletCursor
 from wallet.entry import WalletEntry
+from wallet.partitioned_wallet import (
+    PartitionError, PartitionedWallet, is_partitioned_path,
+)
+from wallet.sqlite_wallet import SqliteWallet, is_sqlite_path
 from wallet.wallet import Wallet
 
 
@@ -11,15 +29,65 @@ class WalletHandler:
     """ Класс, отвечающий за работу с кошельком. """
     wallet: Wallet = None
     json_handler: JsonHandler
-    actions: Dict[MenuOptions, Callable]
-
-    def __init__(self, default_filepath: str):
+    binary_handler: BinaryHandler
+    use_journal: bool
+    journal: Optional[WalletJournal] = None
+    metrics: Optional[Metrics] = None
+    metrics_path: str
+    profiler: Optional[Profiler] = None
+    autosaver: Optional[WalletAutosaver] = None
+    snapshot_cache: Optional[SnapshotCache] = None
+
+    def __init__(
+        self,
+        default_filepath: str,
+        use_journal: bool = False,
+        metrics: Optional[Metrics] = None,
+        metrics_path: str = '',
+        profile: bool = False,
+        autosave_delay: Optional[float] = None,
+        use_cache: bool = False,
+    ):
         """
         Args:
              default_filepath (str): пусть для сохранения/загрузки
                                      кошелька по умолчанию.
+             use_journal (bool): записывать изменения кошелька в журнал
+                                 рядом с файлом вместо полной перезаписи.
+             metrics (Optional[Metrics]): сбор статистики операций,
+                                          None - без статистики.
+             metrics_path (str): путь Json файла, в который статистика
+                                 сохраняется при выходе.
+             profile (bool): профилировать сеанс с помощью cProfile
+                             и tracemalloc.
+             autosave_delay (Optional[float]): пауза после изменения
+                                               кошелька перед фоновым
+                                               автосохранением в секундах,
+                                               None - без автосохранения.
+             use_cache (bool): загружать Json кошельки из кэша снимков
+                               рядом с файлом.
         """
-        self.actions = {
+        self.json_handler = JsonHandler(default_filepath)
+        self.binary_handler = BinaryHandler(default_filepath)
+        if use_cache:
+            self.snapshot_cache = SnapshotCache(self.binary_handler)
+        self.wallet_path = ""
+        self.use_journal = use_journal
+        self.metrics_path = metrics_path
+        if autosave_delay is not None:
+            self.autosaver = WalletAutosaver(
+                self._write_wallet,
+                autosave_delay,
+            )
+        if profile:
+            self.profiler = Profiler()
+        if metrics:
+            self._enable_metrics(metrics)
+
+    @cached_property
+    def actions(self) -> Dict[MenuOptions, Callable]:
+        """ Действия пунктов меню, составляются при первом обращении. """
+        return {
             MenuOptions.ShowBalance: self._show_balance,
             MenuOptions.AddEntry: self._add_entry,
             MenuOptions.EditEntry: self._edit_entry,
@@ -30,20 +98,96 @@ class WalletHandler:
             MenuOptions.LoadDefault: self._load_default_wallet,
             MenuOptions.LoadSelected: self._load_selected_wallet,
             MenuOptions.New: self._create_new_wallet,
+            MenuOptions.ShowRollups: self._show_rollups,
+            MenuOptions.Stats: self._show_stats,
         }
 
-        self.json_handler = JsonHandler(default_filepath)
-        self.wallet_path = ""
-
     def run(self) -> None:
         """ Запуск основного рабочего цикла. """
 
+        if self.profiler:
+            self.profiler.start()
+
         while True:
             user_choice = MainMenu.get_user_menu_choice(self.wallet is None)
             if user_choice == MenuOptions.Quit:
+                self._stop_autosave()
+                self._close_journal()
+                self._close_wallet()
                 break
 
-            self.actions[user_choice]()
+            try:
+                self.actions[user_choice]()
+            except PartitionError as error:
+                # Раздел не загружен, и кошелёк остался без изменений.
+                MainMenu.print_message(
+                    f"Не удалось прочитать кошелёк. {error}"
+                )
+
+        if self.metrics_path:
+            self._save_metrics(self.metrics_path)
+
+    def _enable_metrics(self, metrics: Metrics) -> None:
+        """
+        Включить сбор статистики действий меню, кошелька и файлов.
+
+        Args:
+            metrics (Metrics): получатель статистики.
+        """
+        self.metrics = metrics
+        self.actions = {
+            option: metrics.timed(f"action.{option.name}", action)
+            for option, action in self.actions.items()
+        }
+        metrics.instrument_handler(self.json_handler, "json.")
+        metrics.instrument_handler(self.binary_handler, "binary.")
+        if self.wallet is not None:
+            metrics.instrument_wallet(self.wallet)
+
+    def _set_wallet(self, wallet: Wallet) -> None:
+        """ Сделать кошелёк текущим. """
+        self._close_wallet()
+        if self.metrics:
+            self.metrics.instrument_wallet(wallet)
+        self.wallet = wallet
+
+    def _close_wallet(self) -> None:
+        """ Закрыть соединение текущего кошелька SQLite. """
+        if isinstance(self.wallet, SqliteWallet):
+            self.wallet.close()
+
+    def _show_stats(self) -> None:
+        """
+        Скрытое действие: показать и сохранить статистику сеанса.
+
+        Если статистика не собиралась, сбор включается.
+        """
+        if not self.metrics:
+            self._enable_metrics(Metrics())
+            MainMenu.print_message("Сбор статистики включён.")
+            return
+
+        MainMenu.print_message("\n".join(self.metrics.summary()))
+        path = MainMenu.get_export_path()
+        if path:
+            self._save_metrics(path)
+
+    def _save_metrics(self, path: str) -> None:
+        """
+        Сохранить статистику и результаты профилирования в Json файл.
+
+        Args:
+            path (str): путь к файлу.
+        """
+        extra = {}
+        if self.profiler:
+            extra["profile"] = self.profiler.stop()
+
+        metrics = self.metrics or Metrics()
+        if metrics.save(path, extra):
+            MainMenu.print_message(f"Статистика сохранена {path}")
+        else:
+            MainMenu.print_message(f"Не удалось сохранить статистику {path}")
 
     def _show_balance(self) -> None:
         """ Показать баланс кошелька. """
@@ -59,6 +203,21 @@ class WalletHandler:
             )
         )
 
+    def _show_rollups(self) -> None:
+        """ Показать доходы и расходы кошелька по периодам. """
+        if not self.wallet:
+            return
+
+        if not len(self.wallet):
+            MainMenu.print_message("Нет записей для отчёта.")
+            return
+
+        period = MainMenu.get_rollup_period()
+        if not period:
+            return
+
+        MainMenu.show_rollup(self.wallet.rollup(period))
+
     def _add_entry(self) -> None:
         """ Добавление записи в кошелёк. """
         if not self.wallet:
@@ -71,7 +230,8 @@ class WalletHandler:
 
         new_entry = WalletEntry(**entry_data)
 
-        self.wallet.add_entry(new_entry)
+        with self._wallet_lock():
+            self.wallet.add_entry(new_entry)
         MainMenu.print_message("Новая запись добавлена.")
 
     def _edit_entry(self) -> None:
@@ -93,7 +253,8 @@ class WalletHandler:
         updated_data = EntriesMenu.get_data_to_edit_entry(entry)
 
         updated_entry = WalletEntry(**updated_data)
-        self.wallet[entry_idx] = updated_entry
+        with self._wallet_lock():
+            self.wallet[entry_idx] = updated_entry
         MainMenu.print_message(
             f"Запись номер {entry_idx} обновлена.",
         )
@@ -128,8 +289,7 @@ class WalletHandler:
             MainMenu.print_message("Нет записей для отображения.")
             return
 
-        entries = self.wallet[0:]
-        EntriesMenu.show_entries(entries)
+        EntriesMenu.show_entries(WalletCursor(self.wallet))
 
     def _save_current_wallet(self) -> None:
         """ Сохранение текущего кошелька по ранее открытому пути. """
@@ -156,12 +316,30 @@ class WalletHandler:
         if not self.wallet:
             return
 
-        if self.json_handler.save_json(
-            self.wallet.to_json(),
-            path,
-        ):
+        journal = self.journal
+        if journal and journal.wallet is self.wallet and \
+                journal.snapshot_path == self._target_path(path):
+            # Изменения уже записаны в журнал, снимок перезаписывается
+            # только при периодическом уплотнении журнала.
+            journal.sync()
+            MainMenu.print_message(
+                "Кошелёк сохранён {path}".format(path=path),
+            )
+            return
+
+        autosaver = self.autosaver
+        if autosaver and autosaver.wallet is self.wallet and \
+                autosaver.path == self._target_path(path):
+            saved = autosaver.flush(force=True)
+        else:
+            saved = self._write_wallet(self.wallet, path)
+
+        if saved:
             message = "Кошелёк сохранён {path}"
             self.wallet_path = path
+            if self.use_journal and self._is_json_path(path):
+                self._open_journal(path).attach(self.wallet)
+            self._start_autosave(path)
         else:
             message = "Не удалось сохранить кошелёк {path}"
 
@@ -171,6 +349,73 @@ class WalletHandler:
                 )
             )
 
+    def _write_wallet(self, wallet: Wallet, path: str) -> bool:
+        """
+        Записать кошелёк в файл в формате, определяемом расширением.
+
+        Args:
+            wallet (Wallet): кошелёк для сохранения.
+            path (str): путь к файлу, пустая строка - путь по умолчанию.
+
+        Returns:
+            bool: было ли сохранение успешным.
+        """
+        if is_binary_path(path):
+            return self.binary_handler.save_wallet(wallet, path)
+        if is_sqlite_path(path) or is_partitioned_path(path):
+            return save_wallet_file(wallet, path)
+        return save_json_wallet(
+            self.json_handler,
+            wallet,
+            self._target_path(path),
+            self.snapshot_cache,
+        )
+
+    def _target_path(self, path: str) -> str:
+        """ Путь к файлу кошелька с учётом пути по умолчанию. """
+        return path or self.json_handler.default_path
+
+    def _wallet_lock(self) -> ContextManager:
+        """ Блокировка для изменения кошелька при автосохранении. """
+        return self.autosaver.lock if self.autosaver else nullcontext()
+
+    def _start_autosave(self, path: str) -> None:
+        """
+        Начать автосохранение текущего кошелька в файл.
+
+        Кошельки SQLite сохраняют изменения сразу, изменения
+        кошелька с журналом записываются в журнал, а кошелёк по месяцам
+        сохраняет только изменённые разделы, поэтому для них
+        автосохранение снимками не выполняется.
+
+        Args:
+            path (str): путь к файлу кошелька.
+        """
+        if not self.autosaver:
+            return
+
+        if is_sqlite_path(path) or is_partitioned_path(path) or \
+                (self.use_journal and self._is_json_path(path)):
+            self._stop_autosave()
+            return
+
+        self.autosaver.attach(self.wallet, self._target_path(path))
+
+    def _stop_autosave(self) -> None:
+        """ Сохранить оставшиеся изменения и остановить автосохранение. """
+        if self.autosaver and not self.autosaver.detach():
+            MainMenu.print_message(
+                "Не удалось автоматически сохранить кошелёк {path}".format(
+                    path=self.autosaver.path,
+                )
+            )
+
+    @staticmethod
+    def _is_json_path(path: str) -> bool:
+        """ Является ли путь путём к Json файлу кошелька. """
+        return not is_binary_path(path) and not is_sqlite_path(path) \
+            and not is_partitioned_path(path)
+
     def _load_default_wallet(self) -> None:
         """ Загрузка кошелька по умолчанию. """
         self._load_wallet()
@@ -187,19 +432,66 @@ class WalletHandler:
         Args:
             path (str): путь файла для загрузки.
         """
-        wallet_data = self.json_handler.load_json(path)
-        if not wallet_data:
-            MainMenu.print_message(
-                "Не удалось загрузить кошелёк. Не удалось прочитать файл."
+        if self.autosaver:
+            self.autosaver.flush()
+
+        if is_binary_path(path):
+            wallet = self.binary_handler.load_wallet(path)
+            if wallet is None:
+                MainMenu.print_message(
+                    "Не удалось загрузить кошелёк. Не удалось прочитать файл."
+                )
+                return
+        elif is_sqlite_path(path):
+            wallet = SqliteWallet.open(path)
+            if wallet is None:
+                MainMenu.print_message(
+                    "Не удалось загрузить кошелёк. Не удалось прочитать файл."
+                )
+                return
+        elif is_partitioned_path(path):
+            wallet = PartitionedWallet.open(path)
+            if wallet is None:
+                MainMenu.print_message(
+                    "Не удалось загрузить кошелёк. Не удалось прочитать "
+                    "манифест."
+                )
+                return
+        else:
+            target_path = self._target_path(path)
+            if not os.path.exists(target_path):
+                MainMenu.print_message(
+                    "Не удалось загрузить кошелёк. Не удалось прочитать файл."
+                )
+                return
+            errors = []
+            wallet = load_json_wallet(
+                self.json_handler,
+                target_path,
+                self.snapshot_cache,
+                errors,
             )
-            return
-
-        wallet = Wallet.from_json(wallet_data)
+            if wallet is not None and errors and \
+                    not MainMenu.confirm_skip_invalid(errors):
+                MainMenu.print_message("Загрузка кошелька отменена.")
+                return
+
+        if wallet and self.use_journal and self._is_json_path(path):
+            journal = WalletJournal(self.json_handler, path)
+            if not journal.replay(wallet):
+                MainMenu.print_message(
+                    "Не удалось загрузить кошелёк. Журнал изменений повреждён."
+                )
+                return
+            self._close_journal()
+            journal.attach(wallet)
+            self.journal = journal
 
         if wallet:
-            self.wallet = wallet
+            self._set_wallet(wallet)
             if path:
                 self.wallet_path = path
+            self._start_autosave(path)
             MainMenu.print_message("Кошелёк загружен.")
         else:
             MainMenu.print_message(
@@ -208,6 +500,25 @@ class WalletHandler:
 
     def _create_new_wallet(self) -> None:
         """ Создание нового кошелька. """
-        self.wallet = Wallet()
+        self._stop_autosave()
+        self._close_journal()
+        self._set_wallet(Wallet())
         self.wallet_path = ''
         MainMenu.print_message("Создан новый кошелёк.")
+
+    def _open_journal(self, path: str) -> WalletJournal:
+        """
+        Закрыть текущий журнал и создать журнал для файла кошелька.
+
+        Args:
+            path (str): путь к файлу кошелька.
+        """
+        self._close_journal()
+        self.journal = WalletJournal(self.json_handler, path)
+        return self.journal
+
+    def _close_journal(self) -> None:
+        """ Сбросить на диск и закрыть журнал текущего кошелька. """
+        if self.journal:
+            self.journal.detach()
+            self.journal = None
@@ -0,0 +1,281 @@
+import datetime
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from utils import filters
+from utils.wallet_files import load_wallet_file
+from wallet.entry import EntryCategory, WalletEntry, from_cents
+from wallet.rollups import RollupPeriod
+from wallet.wallet import SearchField, Wallet
+
+if TYPE_CHECKING:
+    from wallet.query import Query
+
+# Кошельки, загруженные в процессе-исполнителе, по путям к файлам.
+_WALLETS: Dict[str, Wallet] = {}
+
+LARGEST_SEARCHES = (SearchField.LargestSpends, SearchField.LargestIncomes)
+
+
+@dataclass
+class WalletSummary:
+    """ Итоги одного кошелька рабочей области, суммы в копейках. """
+    count: int
+    income: int
+    spending: int
+
+
+def _load(path: str) -> Optional[WalletSummary]:
+    """ Загрузить кошелёк в процессе-исполнителе. """
+    wallet = load_wallet_file(path)
+    if wallet is None:
+        return
+    _WALLETS[path] = wallet
+    totals = wallet.totals
+    return WalletSummary(
+        count=len(wallet),
+        income=totals[EntryCategory.Income],
+        spending=totals[EntryCategory.Spend],
+    )
+
+
+def _call(path: str, method: str, args: Tuple) -> Any:
+    """ Вызвать метод кошелька в процессе-исполнителе. """
+    return getattr(_WALLETS[path], method)(*args)
+
+
+def _search(path: str, method: str, args: Tuple) -> List[Tuple]:
+    """
+    Выполнить поиск в процессе-исполнителе.
+
+    Найденные записи передаются компактными кортежами полей, а не
+    объектами WalletEntry.
+    """
+    return [
+        (
+            entry_index,
+            entry.date.toordinal(),
+            entry.category,
+            entry.cents,
+            entry.description,
+        )
+        for entry_index, entry in _call(path, method, args)
+    ]
+
+
+class WalletWorkspace:
+    """
+    Рабочая область из нескольких кошельков.
+
+    Кошельки загружаются параллельно в процессах-исполнителях и
+    остаются в них: каждый кошелёк закреплён за одним процессом, а
+    операции над всеми кошельками выполняются параллельно. В основной
+    процесс передаются только итоги и найденные записи, а не все
+    записи кошельков.
+    """
+    paths: List[str]
+    summaries: Dict[str, WalletSummary]
+    errors: List[str]
+    _shards: List[ProcessPoolExecutor]
+    _owners: Dict[str, ProcessPoolExecutor]
+
+    def __init__(self, paths: Sequence[str], processes: Optional[int] = None):
+        """
+        Args:
+            paths (Sequence[str]): пути к файлам кошельков.
+            processes (Optional[int]): количество процессов,
+                                       по умолчанию - по числу ядер.
+        """
+        self.paths = list(
+            dict.fromkeys(os.path.abspath(path) for path in paths)
+        )
+        self.summaries = {}
+        self.errors = []
+        processes = min(processes or os.cpu_count() or 1, len(self.paths))
+        self._shards = [
+            ProcessPoolExecutor(max_workers=1)
+            for _ in range(max(processes, 1))
+        ]
+        self._owners = {}
+
+    def __enter__(self) -> "WalletWorkspace":
+        try:
+            self.load()
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load(self) -> List[str]:
+        """
+        Загрузить кошельки.
+
+        Ошибки загрузки и сбои процессов-исполнителей не прерывают
+        загрузку остальных кошельков.
+
+        Returns:
+            List[str]: пути к файлам, которые не удалось загрузить.
+        """
+
+        futures = {}
+        for number, path in enumerate(self.paths):
+            shard = self._shards[number % len(self._shards)]
+            self._owners[path] = shard
+            futures[path] = shard.submit(_load, path)
+
+        for path, future in futures.items():
+            try:
+                summary = future.result()
+            except Exception:
+                summary = None
+            if summary is None:
+                del self._owners[path]
+                self.errors.append(path)
+            else:
+                self.summaries[path] = summary
+        return self.errors
+
+    def close(self) -> None:
+        """ Завершить процессы-исполнители. """
+        for shard in self._shards:
+            shard.shutdown()
+        self._owners.clear()
+
+    @property
+    def total_income(self) -> float:
+        """ Сумма доходов всех кошельков. """
+        return from_cents(
+            sum(summary.income for summary in self.summaries.values())
+        )
+
+    @property
+    def total_spending(self) -> float:
+        """ Сумма расходов всех кошельков. """
+        return from_cents(
+            sum(summary.spending for summary in self.summaries.values())
+        )
+
+    @property
+    def balance(self) -> float:
+        """ Баланс всех кошельков. """
+        return from_cents(
+            sum(
+                summary.income - summary.spending
+                for summary in self.summaries.values()
+            )
+        )
+
+    def balances(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Доходы и расходы каждого кошелька за период.
+
+        Args:
+            start (Optional[datetime.date]): начало периода включительно,
+                                             None - без ограничения.
+            end (Optional[datetime.date]): конец периода включительно,
+                                           None - без ограничения.
+
+        Returns:
+            Dict[str, Tuple[float, float]]: доходы и расходы по путям
+            к файлам кошельков.
+        """
+        if start is None and end is None:
+            return {
+                path: (
+                    from_cents(summary.income),
+                    from_cents(summary.spending),
+                )
+                for path, summary in self.summaries.items()
+            }
+
+        incomes = self._map(_call, "income_between", start, end)
+        spendings = self._map(_call, "spending_between", start, end)
+        return {path: (incomes[path], spendings[path]) for path in incomes}
+
+    def rollup(self, period: RollupPeriod) -> List[Tuple[str, float, float]]:
+        """
+        Доходы и расходы всех кошельков по периодам.
+
+        Args:
+            period (RollupPeriod): период группировки.
+
+        Returns:
+            List[Tuple[str, float, float]]: подпись периода, сумма доходов
+            и сумма расходов, упорядоченные по времени.
+        """
+        merged = {}
+        for rows in self._map(_call, "rollup", period).values():
+            for label, income, spending in rows:
+                total = merged.setdefault(label, [0.0, 0.0])
+                total[0] += income
+                total[1] += spending
+
+        return [
+            (label, round(income, 2), round(spending, 2))
+            for label, (income, spending) in sorted(merged.items())
+        ]
+
+    def find_entries(
+        self,
+        search_field: SearchField,
+        value: Any,
+    ) -> List[Tuple[str, int, WalletEntry]]:
+        """
+        Поиск записей во всех кошельках.
+
+        Args:
+            search_field (SearchField): поле, по которому производится поиск.
+            value: искомое значение.
+
+        Returns:
+            List[Tuple[str, int, WalletEntry]]: путь к файлу кошелька,
+            номер записи в нём и запись. Наибольшие доходы и расходы
+            отбираются среди всех кошельков, остальные записи
+            упорядочены по кошелькам.
+        """
+        entries = self._search("find_entries", search_field, value)
+        if search_field in LARGEST_SEARCHES:
+            entries.sort(key=lambda item: -item[2].cents)
+            entries = entries[:filters.parse_count(value) or 0]
+        return entries
+
+    def query(self, query: "Query") -> List[Tuple[str, int, WalletEntry]]:
+        """
+        Выполнить составной запрос во всех кошельках.
+
+        Args:
+            query (Query): запрос из условий wallet.query.
+
+        Returns:
+            List[Tuple[str, int, WalletEntry]]: путь к файлу кошелька,
+            номер записи в нём и запись.
+        """
+        return self._search("query", query)
+
+    def _search(
+        self,
+        method: str,
+        *args: Any,
+    ) -> List[Tuple[str, int, WalletEntry]]:
+        return [
+            (path, row[0], WalletEntry.from_row(row[1:]))
+            for path, rows in self._map(_search, method, *args).items()
+            for row in rows
+        ]
+
+    def _map(self, function: Any, method: str, *args: Any) -> Dict[str, Any]:
+        """ Вызвать метод каждого загруженного кошелька параллельно. """
+        futures: Dict[str, Future] = {
+            path: shard.submit(function, path, method, args)
+            for path, shard in self._owners.items()
+        }
+        return {path: future.result() for path, future in futures.items()}